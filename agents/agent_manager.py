@@ -1,9 +1,9 @@
 
 import numpy as np
 from sklearn.decomposition import PCA
-from statsmodels.tsa.arima.model import ARIMA
 from django.core.cache import cache
 from financial_data.models import RevenuesView, SalesBudgetsView, OpportunityBookView
+from agents.agents.forecast_engine import ForecastEngine
 
 class AgentManager:
     @staticmethod
@@ -42,11 +42,12 @@ class AgentManager:
 
     @staticmethod
     def agent_pred_globale(enterprise_id, year):
-        revenues = RevenuesView.objects.filter(enterprise_id=enterprise_id).order_by('year', 'month')
-        data = [r.real for r in revenues]
-        model = ARIMA(data, order=(1,1,1))
-        results = model.fit()
-        forecast = results.forecast(steps=12)
+        # Stored Holt-Winters models: no fit on the request path.
+        forecasts = ForecastEngine.forecast(enterprise_id, year=year)
+        forecast = np.array([
+            sum((f or {}).get(str(year), {}).get(month, 0) for f in forecasts.values())
+            for month in range(1, 13)
+        ])
         
         sales_budget = SalesBudgetsView.objects.filter(enterprise_id=enterprise_id, year=year)
         opportunities = OpportunityBookView.objects.filter(enterprise_id=enterprise_id, year=year)
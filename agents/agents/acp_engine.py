@@ -0,0 +1,242 @@
+import numpy as np
+
+
+def _json_values(values):
+    """Convert an array to nested lists of floats, with non-finite values
+    mapped to None as ``safe_float`` does."""
+    return [
+        [float(v) if np.isfinite(v) else None for v in row]
+        if isinstance(row, np.ndarray)
+        else (float(row) if np.isfinite(row) else None)
+        for row in values
+    ]
+
+
+class ACPEngine:
+    """Vectorized ACP analytics over monthly (years x 12) matrices.
+
+    Industry matrices have shape (years, 12). Enterprise matrices have shape
+    (enterprises, years, 12) so that a whole batch of peers is scored with the
+    same array operations; a single enterprise is a batch of one. Missing
+    months are NaN.
+    """
+
+    def __init__(
+        self, years, industry_real, industry_budget, enterprise_real, enterprise_budget
+    ):
+        self.years = list(years)
+        self.industry_real = np.asarray(industry_real, dtype=float)
+        self.industry_budget = np.asarray(industry_budget, dtype=float)
+        self.enterprise_real = np.asarray(enterprise_real, dtype=float)
+        self.enterprise_budget = np.asarray(enterprise_budget, dtype=float)
+        if self.enterprise_real.ndim == 2:
+            self.enterprise_real = self.enterprise_real[np.newaxis]
+            self.enterprise_budget = self.enterprise_budget[np.newaxis]
+
+        self.industry_complete = ~np.isnan(self.industry_real).any(axis=-1)
+        self.industry_real_total = np.nansum(self.industry_real, axis=-1)
+        self.industry_budget_total = np.nansum(self.industry_budget, axis=-1)
+        self.enterprise_complete = ~np.isnan(self.enterprise_real).any(axis=-1)
+        self.enterprise_real_total = np.nansum(self.enterprise_real, axis=-1)
+        self.enterprise_budget_total = np.nansum(self.enterprise_budget, axis=-1)
+
+    @staticmethod
+    def industry_matrices(aggregated_data):
+        """Build the industry (years x 12) real and budget matrices from the
+        ``aggregated_data`` structure returned by the ACP agent."""
+
+        def to_matrix(key):
+            return np.array(
+                [
+                    [
+                        np.nan if month["value"] is None else month["value"]
+                        for month in aggregated_data[key][year]
+                    ]
+                    for year in aggregated_data["years"]
+                ],
+                dtype=float,
+            ).reshape(len(aggregated_data["years"]), 12)
+
+        return to_matrix("aggregatedAverageReals"), to_matrix(
+            "aggregatedAverageBudgets"
+        )
+
+    def _by_year(self, values, valid):
+        """Map per-(enterprise, year) values to one {year: value} dict per
+        enterprise, using None where ``valid`` is False."""
+        return [
+            {
+                year: value if ok else None
+                for year, value, ok in zip(self.years, enterprise_values, enterprise_valid)
+            }
+            for enterprise_values, enterprise_valid in zip(values, valid)
+        ]
+
+    def anomalies(self):
+        real = self.enterprise_real
+        valid = (
+            self.enterprise_complete
+            & self.industry_complete
+            & (np.nan_to_num(real) != 0).any(axis=-1)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z_scores = (real - real.mean(axis=-1, keepdims=True)) / real.std(
+                axis=-1, keepdims=True
+            )
+        flagged = np.abs(z_scores) > 2
+        months = [
+            [np.flatnonzero(year_flags).tolist() for year_flags in enterprise_flags]
+            for enterprise_flags in flagged
+        ]
+        return self._by_year(months, valid)
+
+    def risk_assessment(self):
+        real = self.enterprise_real
+        valid = (
+            self.enterprise_complete
+            & self.industry_complete
+            & (np.nan_to_num(real) != 0).any(axis=-1)
+            & (np.nan_to_num(self.industry_real) != 0).any(axis=-1)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            enterprise_mean = real.mean(axis=-1)
+            enterprise_volatility = np.where(
+                enterprise_mean != 0, real.std(axis=-1) / enterprise_mean, np.nan
+            )
+            industry_mean = self.industry_real.mean(axis=-1)
+            industry_volatility = np.where(
+                industry_mean != 0,
+                self.industry_real.std(axis=-1) / industry_mean,
+                np.nan,
+            )
+            relative_risk = np.where(
+                np.isfinite(industry_volatility) & (industry_volatility != 0),
+                enterprise_volatility / industry_volatility,
+                np.nan,
+            )
+        enterprise_volatility = _json_values(enterprise_volatility)
+        industry_volatility = _json_values(industry_volatility)
+        relative_risk = _json_values(relative_risk)
+        assessments = [
+            [
+                {
+                    "enterprise_volatility": enterprise_volatility[e][y],
+                    "industry_volatility": industry_volatility[y],
+                    "relative_risk": relative_risk[e][y],
+                }
+                for y in range(len(self.years))
+            ]
+            for e in range(len(enterprise_volatility))
+        ]
+        return self._by_year(assessments, valid)
+
+    def performance_evaluation(self):
+        valid = (
+            (self.enterprise_budget_total != 0)
+            & (self.industry_budget_total != 0)
+            & (self.industry_real_total != 0)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            enterprise_accuracy = _json_values(
+                self.enterprise_real_total / self.enterprise_budget_total
+            )
+            industry_accuracy = _json_values(
+                self.industry_real_total / self.industry_budget_total
+            )
+            relative_performance = _json_values(
+                self.enterprise_real_total / self.industry_real_total
+            )
+        evaluations = [
+            [
+                {
+                    "enterprise_budget_accuracy": enterprise_accuracy[e][y],
+                    "industry_budget_accuracy": industry_accuracy[y],
+                    "relative_performance": relative_performance[e][y],
+                }
+                for y in range(len(self.years))
+            ]
+            for e in range(len(enterprise_accuracy))
+        ]
+        return self._by_year(evaluations, valid)
+
+    def market_share(self):
+        valid = np.broadcast_to(
+            self.industry_real_total > 0, self.enterprise_real_total.shape
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shares = _json_values(self.enterprise_real_total / self.industry_real_total)
+        return self._by_year(shares, valid)
+
+    def adjusted_budgets(self, pca_coefficients):
+        annual_budget = self.enterprise_budget_total
+        coefficients = [
+            (i, abs(c)) for i, c in enumerate(pca_coefficients or []) if c is not None
+        ]
+        sum_abs_coef = sum(c for _, c in coefficients)
+        valid = (annual_budget > 0) & bool(pca_coefficients) & (sum_abs_coef > 0)
+
+        months = [i + 1 for i, _ in coefficients]
+        weights = np.array([c for _, c in coefficients], dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            adjusted = (annual_budget[..., np.newaxis] * weights) / sum_abs_coef
+        budgets = [
+            [
+                [
+                    {
+                        "month": month,
+                        "adjusted_budget": value if np.isfinite(value) else None,
+                    }
+                    for month, value in zip(months, year_values.tolist())
+                ]
+                for year_values in enterprise_values
+            ]
+            for enterprise_values in adjusted
+        ]
+        return self._by_year(budgets, valid)
+
+    def trend_analysis(self):
+        totals = self.industry_real_total
+        year_index = {year: i for i, year in enumerate(self.years)}
+        previous = np.array(
+            [year_index.get(year - 1, -1) for year in self.years], dtype=int
+        )
+        has_previous = (previous >= 0) & (np.arange(len(self.years)) > 0)
+        previous_totals = np.where(has_previous, totals[previous], np.nan)
+
+        quarters = np.nansum(
+            self.industry_real.reshape(len(self.years), 4, 3), axis=-1
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            yoy_growth = np.where(
+                previous_totals != 0, (totals - previous_totals) / previous_totals, np.nan
+            )
+            qoq_growth = np.where(
+                quarters[:, :-1] != 0,
+                (quarters[:, 1:] - quarters[:, :-1]) / quarters[:, :-1],
+                np.nan,
+            )
+
+        return {
+            year: {
+                "year_over_year_growth": yoy,
+                "quarter_over_quarter_growth": qoq,
+            }
+            for year, yoy, qoq in zip(
+                self.years, _json_values(yoy_growth), _json_values(qoq_growth)
+            )
+        }
+
+    def analyze(self, pca_coefficients):
+        """Run every enterprise-level analysis and return one result dict per
+        enterprise in the batch."""
+        per_enterprise = {
+            "anomalies": self.anomalies(),
+            "risk_assessment": self.risk_assessment(),
+            "performance_evaluation": self.performance_evaluation(),
+            "adjusted_budgets": self.adjusted_budgets(pca_coefficients),
+            "market_share": self.market_share(),
+        }
+        return [
+            {key: values[e] for key, values in per_enterprise.items()}
+            for e in range(self.enterprise_real.shape[0])
+        ]
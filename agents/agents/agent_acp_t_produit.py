@@ -2,16 +2,38 @@ import numpy as np
 import pandas as pd
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
+from django.conf import settings
+from django.core.cache import caches
 from django.db.models import Sum, Avg, StdDev
+from agents.models import DataVersion
 from financial_data.models import RevenuesView, EnterpriseIndustryView
-from scipy import stats
-from statsmodels.tsa.seasonal import seasonal_decompose
+from .acp_engine import ACPEngine
+from .industry_benchmarks import IndustryBenchmarks
+from .seasonality_profiles import SeasonalityProfiles
+from .streaming_pca import StreamingPCA
 from collections import defaultdict
 from datetime import datetime
+import hashlib
 import traceback
 from decimal import Decimal
 
 
+MONTHS = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+
+
 def safe_float(value):
     try:
         float_value = float(value)
@@ -31,41 +53,127 @@ class AgentACP_T_produit:
             if not target_enterprise.industry_type_label:
                 return {"error": "Unable to determine industry type for the enterprise"}
 
-            related_enterprises = EnterpriseIndustryView.objects.filter(
-                industry_type_label=target_enterprise.industry_type_label,
-                enterprise_active=True,
+            industry = AgentACP_T_produit._analyze_industry(
+                target_enterprise.industry_type_id,
+                target_enterprise.industry_type_label,
+                description,
             )
+            if "error" in industry:
+                return {"error": industry["error"]}
 
-            aggregated_data = AgentACP_T_produit._get_aggregated_data(
-                related_enterprises, description
+            enterprise_analysis, trend_analysis = (
+                AgentACP_T_produit._analyze_enterprises(
+                    industry, [target_enterprise.enterprise_id], description
+                )
             )
+            enterprise_analysis = enterprise_analysis[0]
 
-            if isinstance(aggregated_data, dict) and "error" in aggregated_data:
-                return {"error": aggregated_data["error"]}
+        except Exception as e:
+            error_traceback = traceback.format_exc()
+            return {
+                "error": f"Error during data analysis: {str(e)}",
+                "traceback": error_traceback,
+            }
 
-            pca_result, pca_coefficients = AgentACP_T_produit._perform_pca(
-                aggregated_data
-            )
-            seasonal_trends = AgentACP_T_produit._identify_seasonal_trends(
-                aggregated_data
-            )
-            anomalies = AgentACP_T_produit._detect_anomalies(
-                target_enterprise.enterprise_id, aggregated_data, description
-            )
-            risk_assessment = AgentACP_T_produit._assess_risk(
-                target_enterprise.enterprise_id, aggregated_data, description
-            )
-            performance_evaluation = AgentACP_T_produit._evaluate_performance(
-                target_enterprise.enterprise_id, aggregated_data, description
-            )
-            adjusted_budgets = AgentACP_T_produit._adjust_budgets(
-                enterprise_id, aggregated_data, pca_coefficients, description
-            )
-            trend_analysis = AgentACP_T_produit._analyze_trends(
-                aggregated_data)
-            market_share = AgentACP_T_produit._estimate_market_share(
-                target_enterprise.enterprise_id, aggregated_data, description
-            )
+        return {
+            "industry_type": target_enterprise.industry_type_label,
+            "aggregated_data": industry["aggregated_data"],
+            "pca_coefficients": industry["pca_result"],
+            "seasonal_trends": industry["seasonal_trends"],
+            "anomalies": enterprise_analysis["anomalies"],
+            "risk_assessment": enterprise_analysis["risk_assessment"],
+            "performance_evaluation": enterprise_analysis["performance_evaluation"],
+            "adjusted_budgets": enterprise_analysis["adjusted_budgets"],
+            "trend_analysis": trend_analysis,
+            "market_share": enterprise_analysis["market_share"],
+        }
+
+    @staticmethod
+    def execute_batch(description, industry_type_id=None, enterprise_ids=None):
+        """Run the ACP analysis for every active enterprise of an industry, or
+        for an explicit list of enterprises (restricted to the industry when
+        both are given). Industry-level work (aggregation, PCA, seasonality,
+        trends) runs once per industry and the enterprise-level analyses are
+        vectorized across the batch. Explicit ids are analysed once each and
+        reported in request order."""
+        try:
+            targets = EnterpriseIndustryView.objects.all()
+            if enterprise_ids is not None:
+                enterprise_ids = list(dict.fromkeys(enterprise_ids))
+                targets = targets.filter(enterprise_id__in=enterprise_ids)
+            else:
+                targets = targets.filter(
+                    industry_type_id=industry_type_id, enterprise_active=True
+                )
+
+            result = {"description": description, "industries": {}, "results": {}}
+
+            by_industry = defaultdict(list)
+            found = set()
+            for target in targets:
+                if target.enterprise_id in found:
+                    continue
+                found.add(target.enterprise_id)
+                if (
+                    industry_type_id is not None
+                    and target.industry_type_id != industry_type_id
+                ):
+                    result["results"][target.enterprise_id] = {
+                        "error": f"Enterprise with ID {target.enterprise_id} does "
+                        f"not belong to industry type {industry_type_id}."
+                    }
+                    continue
+                by_industry[
+                    (target.industry_type_id, target.industry_type_label)
+                ].append(target.enterprise_id)
+
+            for enterprise_id in set(enterprise_ids or []) - found:
+                result["results"][enterprise_id] = {
+                    "error": f"Enterprise with ID {enterprise_id} does not exist."
+                }
+
+            for (industry_id, industry_label), members in by_industry.items():
+                if not industry_label:
+                    for enterprise_id in members:
+                        result["results"][enterprise_id] = {
+                            "error": "Unable to determine industry type for the enterprise"
+                        }
+                    continue
+
+                industry = AgentACP_T_produit._analyze_industry(
+                    industry_id, industry_label, description
+                )
+                if "error" in industry:
+                    result["industries"][industry_id] = {"error": industry["error"]}
+                    for enterprise_id in members:
+                        result["results"][enterprise_id] = {"error": industry["error"]}
+                    continue
+
+                enterprise_analyses, trend_analysis = (
+                    AgentACP_T_produit._analyze_enterprises(
+                        industry, members, description
+                    )
+                )
+                result["industries"][industry_id] = {
+                    "industry_type": industry_label,
+                    "aggregated_data": industry["aggregated_data"],
+                    "pca_coefficients": industry["pca_result"],
+                    "seasonal_trends": industry["seasonal_trends"],
+                    "trend_analysis": trend_analysis,
+                }
+                for enterprise_id, enterprise_analysis in zip(
+                    members, enterprise_analyses
+                ):
+                    result["results"][enterprise_id] = {
+                        "industry_type_id": industry_id,
+                        **enterprise_analysis,
+                    }
+
+            if enterprise_ids is not None:
+                result["results"] = {
+                    enterprise_id: result["results"][enterprise_id]
+                    for enterprise_id in enterprise_ids
+                }
 
         except Exception as e:
             error_traceback = traceback.format_exc()
@@ -74,114 +182,202 @@ class AgentACP_T_produit:
                 "traceback": error_traceback,
             }
 
+        return result
+
+    @staticmethod
+    def _analyze_industry(industry_type_id, industry_type_label, description):
+        """Industry-level part of the analysis, cached per (industry,
+        description, data version)."""
+        data_version = DataVersion.current(DataVersion.INDUSTRY, industry_type_id)
+        cache_key = "acp_industry_{}_{}_v{}".format(
+            industry_type_id,
+            hashlib.md5(description.encode()).hexdigest(),
+            data_version,
+        )
+        industry = caches["agents"].get(cache_key)
+        if industry is None:
+            industry = AgentACP_T_produit._compute_industry(
+                industry_type_id, industry_type_label, description, data_version
+            )
+            if "error" not in industry:
+                caches["agents"].set(cache_key, industry)
+        return industry
+
+    @staticmethod
+    def _compute_industry(
+        industry_type_id, industry_type_label, description, data_version=None
+    ):
+        # Prefer the precomputed industry benchmarks while they are current
+        # and fall back to aggregating the live revenue rows.
+        monthly_averages = IndustryBenchmarks.monthly_averages(
+            industry_type_id, description, data_version
+        )
+        if monthly_averages:
+            aggregated_data = AgentACP_T_produit._build_aggregated_data(
+                monthly_averages
+            )
+        else:
+            related_enterprises = EnterpriseIndustryView.objects.filter(
+                industry_type_label=industry_type_label,
+                enterprise_active=True,
+            )
+            aggregated_data = AgentACP_T_produit._get_aggregated_data(
+                related_enterprises, description
+            )
+
+        if "error" in aggregated_data:
+            return {"error": aggregated_data["error"]}
+
+        pca_result, pca_coefficients = AgentACP_T_produit._perform_pca(
+            aggregated_data,
+            AgentACP_T_produit._get_streaming_pca_model(industry_type_id, description),
+        )
+        seasonal_trends = AgentACP_T_produit._identify_seasonal_trends(
+            aggregated_data, SeasonalityProfiles.get(industry_type_id, description)
+        )
+        industry_real, industry_budget = ACPEngine.industry_matrices(aggregated_data)
+
         return {
-            "industry_type": target_enterprise.industry_type_label,
             "aggregated_data": aggregated_data,
-            "pca_coefficients": pca_result,
+            "pca_result": pca_result,
+            "pca_coefficients": pca_coefficients,
             "seasonal_trends": seasonal_trends,
-            "anomalies": anomalies,
-            "risk_assessment": risk_assessment,
-            "performance_evaluation": performance_evaluation,
-            "adjusted_budgets": adjusted_budgets,
-            "trend_analysis": trend_analysis,
-            "market_share": market_share,
+            "industry_real": industry_real,
+            "industry_budget": industry_budget,
         }
 
+    @staticmethod
+    def _analyze_enterprises(industry, enterprise_ids, description):
+        years = industry["aggregated_data"]["years"]
+        enterprise_matrices = AgentACP_T_produit._get_enterprise_matrices(
+            enterprise_ids, description, years
+        )
+        engine = ACPEngine(
+            years,
+            industry["industry_real"],
+            industry["industry_budget"],
+            enterprise_matrices["real"],
+            enterprise_matrices["budget"],
+        )
+        return engine.analyze(industry["pca_coefficients"]), engine.trend_analysis()
+
     @staticmethod
     def _get_aggregated_data(related_enterprises, description):
-        data = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
-        enterprise_count = defaultdict(int)
-        current_year = datetime.now().year
+        # One grouped query for the whole industry: the related enterprises
+        # are joined as a subquery instead of being fetched one by one.
+        monthly_averages = (
+            RevenuesView.objects.filter(
+                enterprise_id__in=related_enterprises.values("enterprise_id"),
+                description=description,
+            )
+            .values("year", "month")
+            .annotate(
+                average_real=Avg("real_income"),
+                average_budget=Avg("expected_income"),
+            )
+        )
+        return AgentACP_T_produit._build_aggregated_data(monthly_averages)
 
-        for enterprise in related_enterprises:
+    @staticmethod
+    def _build_aggregated_data(monthly_averages):
+        current_year = datetime.now().year
+        years = set()
+        reals = defaultdict(lambda: [0.0] * 12)
+        budgets = defaultdict(lambda: [0.0] * 12)
+        for row in monthly_averages:
             try:
-                revenues = RevenuesView.objects.filter(
-                    enterprise_id=enterprise.enterprise_id, description=description
-                )
-                for revenue in revenues:
-                    try:
-                        year = int(revenue.year)
-                        month = int(revenue.month)
-                        if year <= current_year:
-                            enterprise_count[year] += 1
-                            data["real"][year][month].append(
-                                safe_float(revenue.real_income)
-                            )
-                            data["budget"][year][month].append(
-                                safe_float(revenue.expected_income)
-                            )
-                    except (ValueError, TypeError, AttributeError) as e:
-                        print(
-                            f"Error processing revenue data for enterprise {
-                                enterprise.enterprise_id}: {e}"
-                        )
-                        continue
-            except Exception as e:
-                print(
-                    f"Error retrieving revenue data for enterprise {
-                        enterprise.enterprise_id}: {e}"
-                )
+                year = int(row["year"])
+                month = int(row["month"])
+            except (ValueError, TypeError) as e:
+                print(f"Error processing aggregated revenue data: {e}")
                 continue
-
-        if not enterprise_count:
+            if year > current_year:
+                continue
+            years.add(year)
+            if 1 <= month <= 12:
+                if row["average_real"] is not None:
+                    reals[year][month - 1] = safe_float(row["average_real"])
+                if row["average_budget"] is not None:
+                    budgets[year][month - 1] = safe_float(row["average_budget"])
+
+        if not years:
             return {"error": "No valid revenue data found for the related enterprises"}
 
         aggregated_data = {
-            "years": sorted(
-                [year for year in enterprise_count.keys() if year <= current_year]
-            ),
+            "years": sorted(years),
             "aggregatedAverageReals": {},
             "aggregatedAverageBudgets": {},
         }
 
-        months = [
-            "January",
-            "February",
-            "March",
-            "April",
-            "May",
-            "June",
-            "July",
-            "August",
-            "September",
-            "October",
-            "November",
-            "December",
-        ]
-
         for year in aggregated_data["years"]:
-            aggregated_data["aggregatedAverageReals"][year] = []
-            aggregated_data["aggregatedAverageBudgets"][year] = []
-            for month in range(1, 13):
-                real_values = [v for v in data["real"]
-                               [year][month] if v is not None]
-                budget_values = [
-                    v for v in data["budget"][year][month] if v is not None
-                ]
-                aggregated_data["aggregatedAverageReals"][year].append(
-                    {
-                        "month": months[month - 1],
-                        "value": safe_float(
-                            sum(real_values) /
-                            len(real_values) if real_values else 0
-                        ),
-                    }
-                )
-                aggregated_data["aggregatedAverageBudgets"][year].append(
-                    {
-                        "month": months[month - 1],
-                        "value": safe_float(
-                            sum(budget_values) / len(budget_values)
-                            if budget_values
-                            else 0
-                        ),
-                    }
-                )
+            aggregated_data["aggregatedAverageReals"][year] = [
+                {"month": MONTHS[i], "value": value}
+                for i, value in enumerate(reals[year])
+            ]
+            aggregated_data["aggregatedAverageBudgets"][year] = [
+                {"month": MONTHS[i], "value": value}
+                for i, value in enumerate(budgets[year])
+            ]
 
         return aggregated_data
 
     @staticmethod
-    def _perform_pca(aggregated_data):
+    def _get_enterprise_matrices(enterprise_ids, description, years):
+        """Load the enterprises' monthly real and budget income as dense
+        (enterprises x years x 12) arrays aligned on ``enterprise_ids`` and
+        ``years``; missing months are NaN."""
+        enterprise_index = {
+            enterprise_id: i for i, enterprise_id in enumerate(enterprise_ids)
+        }
+        year_index = {year: i for i, year in enumerate(years)}
+        shape = (len(enterprise_ids), len(years), 12)
+        enterprise_matrices = {
+            "real": np.full(shape, np.nan),
+            "budget": np.full(shape, np.nan),
+        }
+
+        monthly_totals = (
+            RevenuesView.objects.filter(
+                enterprise_id__in=enterprise_ids, description=description
+            )
+            .values("enterprise_id", "year", "month")
+            .annotate(real=Sum("real_income"), budget=Sum("expected_income"))
+        )
+        for row in monthly_totals:
+            try:
+                e = enterprise_index[row["enterprise_id"]]
+                y = year_index[int(row["year"])]
+                m = int(row["month"]) - 1
+            except (KeyError, ValueError, TypeError):
+                continue
+            if not 0 <= m < 12:
+                continue
+            for key in ("real", "budget"):
+                value = safe_float(row[key])
+                if value is not None:
+                    enterprise_matrices[key][e, y, m] = value
+
+        return enterprise_matrices
+
+    @staticmethod
+    def _get_streaming_pca_model(industry_type_id, description):
+        """Persisted streaming PCA model of the industry, fitted on the fly
+        once the peer group reaches ``ACP_STREAMING_PCA_MIN_ENTERPRISES``."""
+        pca_model = StreamingPCA.load(industry_type_id, description)
+        min_enterprises = settings.ACP_STREAMING_PCA_MIN_ENTERPRISES
+        if (
+            pca_model is None
+            and min_enterprises is not None
+            and EnterpriseIndustryView.objects.filter(
+                industry_type_id=industry_type_id, enterprise_active=True
+            ).count()
+            >= min_enterprises
+        ):
+            pca_model = StreamingPCA.fit(industry_type_id, description)
+        return pca_model
+
+    @staticmethod
+    def _perform_pca(aggregated_data, pca_model=None):
         data_matrix = []
         for year in aggregated_data["years"]:
             year_data = [
@@ -195,11 +391,19 @@ class AgentACP_T_produit:
         if not data_matrix or len(data_matrix) < 2:
             return [], []
 
-        scaler = StandardScaler()
-        normalized_data = scaler.fit_transform(data_matrix)
+        if pca_model is not None:
+            # The components were fitted on individual enterprise-years, so
+            # the industry years are only projected, never refitted.
+            data_matrix = [year_data for year_data in data_matrix if len(year_data) == 12]
+            if not data_matrix:
+                return [], []
+            pca_result = StreamingPCA.transform(pca_model, data_matrix)
+        else:
+            scaler = StandardScaler()
+            normalized_data = scaler.fit_transform(data_matrix)
 
-        pca = PCA(n_components=1)
-        pca_result = pca.fit_transform(normalized_data)
+            pca = PCA(n_components=1)
+            pca_result = pca.fit_transform(normalized_data)
 
         coefficients = pca_result[:, 0]
         sum_abs_coefficients = np.sum(np.abs(coefficients))
@@ -213,235 +417,14 @@ class AgentACP_T_produit:
         ]
 
     @staticmethod
-    def _identify_seasonal_trends(aggregated_data):
+    def _identify_seasonal_trends(aggregated_data, seasonality_profile):
+        # The precomputed profile comes from an additive decomposition of the
+        # whole multi-year series, so every year shares the same index.
         seasonal_trends = {}
         for year in aggregated_data["years"]:
-            values = [
-                safe_float(month["value"])
-                for month in aggregated_data["aggregatedAverageReals"][year]
-            ]
-            values = [v for v in values if v is not None]
-            if len(values) >= 24 and any(values):
-                decomposition = seasonal_decompose(
-                    values, model="additive", period=12)
-                seasonal_trends[year] = [
-                    safe_float(v) for v in decomposition.seasonal.tolist()
-                ]
-            else:
-                seasonal_trends[year] = None
-        return seasonal_trends
-
-    @staticmethod
-    def _detect_anomalies(enterprise_id, aggregated_data, description):
-        enterprise_data = RevenuesView.objects.filter(
-            enterprise_id=enterprise_id, description=description
-        )
-        anomalies = {}
-        for year in aggregated_data["years"]:
-            enterprise_values = [
-                safe_float(revenue.real_income)
-                for revenue in enterprise_data.filter(year=str(year))
-            ]
-            enterprise_values = [v for v in enterprise_values if v is not None]
-            industry_values = [
-                safe_float(month["value"])
-                for month in aggregated_data["aggregatedAverageReals"][year]
-            ]
-            industry_values = [v for v in industry_values if v is not None]
-            if (
-                len(enterprise_values) == 12
-                and len(industry_values) == 12
-                and any(enterprise_values)
-            ):
-                z_scores = stats.zscore(enterprise_values)
-                anomalies[year] = [
-                    i for i, z in enumerate(z_scores) if abs(z) > 2]
-            else:
-                anomalies[year] = None
-        return anomalies
-
-    @staticmethod
-    def _assess_risk(enterprise_id, aggregated_data, description):
-        enterprise_data = RevenuesView.objects.filter(
-            enterprise_id=enterprise_id, description=description
-        )
-        risk_assessment = {}
-        for year in aggregated_data["years"]:
-            enterprise_values = [
-                safe_float(revenue.real_income)
-                for revenue in enterprise_data.filter(year=str(year))
-            ]
-            enterprise_values = [v for v in enterprise_values if v is not None]
-            industry_values = [
-                safe_float(month["value"])
-                for month in aggregated_data["aggregatedAverageReals"][year]
-            ]
-            industry_values = [v for v in industry_values if v is not None]
-            if (
-                len(enterprise_values) == 12
-                and len(industry_values) == 12
-                and any(enterprise_values)
-                and any(industry_values)
-            ):
-                enterprise_volatility = safe_float(
-                    np.std(enterprise_values) / np.mean(enterprise_values)
-                    if np.mean(enterprise_values) != 0
-                    else None
-                )
-                industry_volatility = safe_float(
-                    np.std(industry_values) / np.mean(industry_values)
-                    if np.mean(industry_values) != 0
-                    else None
-                )
-                relative_risk = safe_float(
-                    enterprise_volatility / industry_volatility
-                    if industry_volatility and industry_volatility != 0
-                    else None
-                )
-                risk_assessment[year] = {
-                    "enterprise_volatility": enterprise_volatility,
-                    "industry_volatility": industry_volatility,
-                    "relative_risk": relative_risk,
-                }
-            else:
-                risk_assessment[year] = None
-        return risk_assessment
-
-    @staticmethod
-    def _evaluate_performance(enterprise_id, aggregated_data, description):
-        enterprise_data = RevenuesView.objects.filter(
-            enterprise_id=enterprise_id, description=description
-        )
-        performance_evaluation = {}
-        for year in aggregated_data["years"]:
-            enterprise_real = sum(
-                safe_float(revenue.real_income) or 0
-                for revenue in enterprise_data.filter(year=str(year))
-            )
-            enterprise_budget = sum(
-                safe_float(revenue.expected_income) or 0
-                for revenue in enterprise_data.filter(year=str(year))
-            )
-            industry_real = sum(
-                safe_float(month["value"]) or 0
-                for month in aggregated_data["aggregatedAverageReals"][year]
-            )
-            industry_budget = sum(
-                safe_float(month["value"]) or 0
-                for month in aggregated_data["aggregatedAverageBudgets"][year]
-            )
-
-            if enterprise_budget != 0 and industry_budget != 0 and industry_real != 0:
-                performance_evaluation[year] = {
-                    "enterprise_budget_accuracy": safe_float(
-                        enterprise_real / enterprise_budget
-                    ),
-                    "industry_budget_accuracy": safe_float(
-                        industry_real / industry_budget
-                    ),
-                    "relative_performance": safe_float(enterprise_real / industry_real),
-                }
-            else:
-                performance_evaluation[year] = None
-        return performance_evaluation
-
-    @staticmethod
-    def _analyze_trends(aggregated_data):
-        trend_analysis = {}
-        for year in aggregated_data["years"]:
-            real_values = [
-                safe_float(month["value"])
-                for month in aggregated_data["aggregatedAverageReals"][year]
-            ]
-            real_values = [v for v in real_values if v is not None]
-
-            yoy_growth = None
-            if year > aggregated_data["years"][0]:
-                prev_year_values = [
-                    safe_float(month["value"])
-                    for month in aggregated_data["aggregatedAverageReals"][year - 1]
-                ]
-                prev_year_values = [
-                    v for v in prev_year_values if v is not None]
-                if prev_year_values and sum(prev_year_values) != 0:
-                    yoy_growth = safe_float(
-                        (sum(real_values) - sum(prev_year_values))
-                        / sum(prev_year_values)
-                    )
-
-            quarterly_growth = []
-            for i in range(1, 4):
-                current_quarter = sum(real_values[i * 3: (i + 1) * 3])
-                previous_quarter = sum(real_values[(i - 1) * 3: i * 3])
-                if previous_quarter != 0:
-                    qoq_growth = safe_float(
-                        (current_quarter - previous_quarter) / previous_quarter
-                    )
-                    quarterly_growth.append(qoq_growth)
-                else:
-                    quarterly_growth.append(None)
-
-            trend_analysis[year] = {
-                "year_over_year_growth": yoy_growth,
-                "quarter_over_quarter_growth": quarterly_growth,
-            }
-
-        return trend_analysis
-
-    @staticmethod
-    def _estimate_market_share(enterprise_id, aggregated_data, description):
-        enterprise_data = RevenuesView.objects.filter(
-            enterprise_id=enterprise_id, description=description
-        )
-        market_share = {}
-        for year in aggregated_data["years"]:
-            enterprise_revenue = sum(
-                safe_float(revenue.real_income) or 0
-                for revenue in enterprise_data.filter(year=str(year))
+            seasonal_trends[year] = (
+                [safe_float(v) for v in seasonality_profile["seasonal_index"]]
+                if seasonality_profile
+                else None
             )
-            industry_revenue = sum(
-                safe_float(month["value"]) or 0
-                for month in aggregated_data["aggregatedAverageReals"][year]
-            )
-
-            if industry_revenue > 0:
-                market_share[year] = safe_float(
-                    enterprise_revenue / industry_revenue)
-            else:
-                market_share[year] = None
-
-        return market_share
-
-    @staticmethod
-    def _adjust_budgets(enterprise_id, aggregated_data, pca_coefficients, description):
-        enterprise_data = RevenuesView.objects.filter(
-            enterprise_id=enterprise_id, description=description
-        )
-        adjusted_budgets = {}
-
-        for year in aggregated_data["years"]:
-            annual_budget = sum(
-                safe_float(revenue.expected_income) or 0
-                for revenue in enterprise_data.filter(year=str(year))
-            )
-
-            if annual_budget > 0 and pca_coefficients:
-                monthly_adjusted_budgets = []
-                sum_abs_coef = sum(abs(c)
-                                   for c in pca_coefficients if c is not None)
-                if sum_abs_coef > 0:
-                    for i, coef in enumerate(pca_coefficients):
-                        if coef is not None:
-                            adjusted_budget = safe_float(
-                                (annual_budget * abs(coef)) / sum_abs_coef
-                            )
-                            monthly_adjusted_budgets.append(
-                                {"month": i + 1, "adjusted_budget": adjusted_budget}
-                            )
-                    adjusted_budgets[year] = monthly_adjusted_budgets
-                else:
-                    adjusted_budgets[year] = None
-            else:
-                adjusted_budgets[year] = None
-
-        return adjusted_budgets
+        return seasonal_trends
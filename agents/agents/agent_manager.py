@@ -1,12 +1,12 @@
-from .validation_agent import ValidationAgent
+from .validation_snapshots import ValidationSnapshots
 from .agent_acp_t_produit import AgentACP_T_produit
 from .web_revenu_hypo_agent import WebRevenuHypoAgent
-from .pred_globale_agent import PredGlobaleAgent
+from .forecast_engine import ForecastEngine
 
 class AgentManager:
     @staticmethod
     def agent_validation(enterprise_id):
-        return ValidationAgent.execute(enterprise_id)
+        return ValidationSnapshots.get(enterprise_id)
 
     @staticmethod
     def agent_acp_t_produit(industry_type):
@@ -18,4 +18,4 @@ class AgentManager:
 
     @staticmethod
     def agent_pred_globale(enterprise_id, year):
-        return PredGlobaleAgent.execute(enterprise_id, year)
\ No newline at end of file
+        return ForecastEngine.forecast(enterprise_id, year=year)
\ No newline at end of file
@@ -0,0 +1,240 @@
+from collections import defaultdict
+
+from django.db.models import (
+    Avg,
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    IntegerField,
+    Q,
+    Sum,
+    Window,
+)
+from django.db.models.functions import Cast, Lag, NullIf
+
+from financial_data.models import (
+    OpportunityBookView,
+    OrderBookView,
+    RevenuesView,
+    SalesBudgetsView,
+)
+
+
+def _float(expression):
+    return Cast(expression, FloatField())
+
+
+def _yearly_growth(aggregate, partition_by):
+    """(value - previous year's value) / previous year's value, computed in
+    SQL with LAG() over the integer year; NULL for the first year and when the
+    previous value is zero."""
+    previous = Window(
+        Lag(NullIf(_float(aggregate), 0.0)),
+        partition_by=partition_by,
+        order_by=F("year_int").asc(),
+    )
+    return ExpressionWrapper(
+        (_float(aggregate) - previous) / previous, output_field=FloatField()
+    )
+
+
+class EnterpriseDataProfile:
+    """Per-month and per-year aggregates of an enterprise's revenue, sales
+    budget, order book and opportunity data since ``since_year``.
+
+    Each source view is read with a grouped query (grouped by enterprise too
+    when profiles are built in batch), plus a yearly query for the revenue and
+    sales budget growth; money columns come back as floats and year-over-year
+    variations are computed by the database. Everything the ValidationAgent
+    reports is derived from these rows in memory.
+    """
+
+    SOURCES = (
+        "revenue",
+        "revenue_yearly",
+        "sales_budget",
+        "sales_budget_yearly",
+        "order_book",
+        "opportunity",
+    )
+
+    def __init__(self, enterprise_id, since_year, rows=None):
+        self.enterprise_id = enterprise_id
+        self.since_year = since_year
+        if rows is None:
+            querysets = EnterpriseDataProfile._querysets([enterprise_id], since_year)
+            rows = {source: list(querysets[source]) for source in self.SOURCES}
+        self.revenue = rows["revenue"]
+        self.revenue_yearly = rows["revenue_yearly"]
+        self.sales_budget = rows["sales_budget"]
+        self.sales_budget_yearly = rows["sales_budget_yearly"]
+        self.order_book = rows["order_book"]
+        self.opportunity = rows["opportunity"]
+
+    @staticmethod
+    def for_enterprises(enterprise_ids, since_year):
+        """Profiles of several enterprises, in the order given, from one query
+        per source grouped by enterprise."""
+        querysets = EnterpriseDataProfile._querysets(
+            enterprise_ids, since_year, per_enterprise=True
+        )
+        rows = {
+            enterprise_id: {source: [] for source in EnterpriseDataProfile.SOURCES}
+            for enterprise_id in enterprise_ids
+        }
+        for source, queryset in querysets.items():
+            for row in queryset:
+                rows[row.pop("enterprise_id")][source].append(row)
+        return [
+            EnterpriseDataProfile(enterprise_id, since_year, rows[enterprise_id])
+            for enterprise_id in enterprise_ids
+        ]
+
+    @staticmethod
+    def _querysets(enterprise_ids, since_year, per_enterprise=False):
+        group_by = ["enterprise_id"] if per_enterprise else []
+        partition_by = [F("enterprise_id")] if per_enterprise else None
+
+        def rows(model):
+            # Years are stored as text: compare them as integers.
+            return model.objects.annotate(
+                year_int=Cast("year", IntegerField())
+            ).filter(enterprise_id__in=enterprise_ids, year_int__gte=since_year)
+
+        real_income = _float("real_income")
+        revenue = (
+            rows(RevenuesView)
+            .values(*group_by, "year", "month")
+            .annotate(
+                rows=Count("revenue_id"),
+                real_income_count=Count("real_income"),
+                real_income_sum=_float(Sum("real_income")),
+                real_income_squares=Sum(real_income * real_income),
+                performance_count=Count("income_performance"),
+                performance_sum=_float(Sum("income_performance")),
+            )
+            .order_by(*group_by, "year", "month")
+        )
+        revenue_yearly = (
+            rows(RevenuesView)
+            .values(*group_by, "year_int")
+            .annotate(
+                growth=_yearly_growth(Sum("real_income"), partition_by),
+                performance_growth=_yearly_growth(
+                    Avg("income_performance"), partition_by
+                ),
+            )
+            .order_by(*group_by, "year_int")
+        )
+
+        nonzero = ~Q(budget=0) & ~Q(real=0)
+        sales_budget = (
+            rows(SalesBudgetsView)
+            .values(*group_by, "year", "month")
+            .annotate(
+                rows=Count("sales_budget_id"),
+                nonzero_rows=Count("sales_budget_id", filter=nonzero),
+                accuracy_sum=Sum(
+                    ExpressionWrapper(F("real") / F("budget"), output_field=FloatField()),
+                    filter=nonzero,
+                ),
+            )
+            .order_by(*group_by, "year", "month")
+        )
+        sales_budget_yearly = (
+            rows(SalesBudgetsView)
+            .filter(nonzero)
+            .values(*group_by, "year_int")
+            .annotate(growth=_yearly_growth(Sum("budget"), partition_by))
+            .order_by(*group_by, "year_int")
+        )
+
+        order_book = (
+            rows(OrderBookView)
+            .values(*group_by, "year", "year_int")
+            .annotate(
+                rows=Count("enterprise"),
+                value_count=Count("total_order_value"),
+                total=_float(Sum("total_order_value")),
+                growth=_yearly_growth(Sum("total_order_value"), partition_by),
+            )
+            .order_by(*group_by, "year_int")
+        )
+
+        opportunity = (
+            rows(OpportunityBookView)
+            .values(*group_by, "year", "year_int")
+            .annotate(
+                rows=Count("enterprise"),
+                value_count=Count("total_opportunity_value"),
+                total=_float(Sum("total_opportunity_value")),
+                growth=_yearly_growth(Sum("total_opportunity_value"), partition_by),
+            )
+            .order_by(*group_by, "year_int")
+        )
+
+        return {
+            "revenue": revenue,
+            "revenue_yearly": revenue_yearly,
+            "sales_budget": sales_budget,
+            "sales_budget_yearly": sales_budget_yearly,
+            "order_book": order_book,
+            "opportunity": opportunity,
+        }
+
+    @staticmethod
+    def years_count(rows, count_field="rows"):
+        return len({row["year"] for row in rows if row[count_field]})
+
+    @staticmethod
+    def months_count(rows):
+        return len({(row["year"], row["month"]) for row in rows if row["rows"]})
+
+    @staticmethod
+    def growths(rows, growth_field="growth"):
+        """Year-over-year variations computed by the database, skipping the
+        years without one."""
+        return [row[growth_field] for row in rows if row[growth_field] is not None]
+
+    def revenue_monthly_stats(self):
+        """Mean and population standard deviation of real income per calendar
+        month, across years."""
+        moments = defaultdict(lambda: [0, 0.0, 0.0])
+        for row in self.revenue:
+            month = moments[row["month"]]
+            month[0] += row["real_income_count"]
+            month[1] += row["real_income_sum"] or 0.0
+            month[2] += row["real_income_squares"] or 0.0
+        stats = []
+        for month, (count, total, squares) in sorted(moments.items()):
+            if not count:
+                continue
+            mean = total / count
+            stats.append(
+                {
+                    "month": month,
+                    "avg_revenue": mean,
+                    "std_dev": max(squares / count - mean * mean, 0.0) ** 0.5,
+                }
+            )
+        return stats
+
+    def revenue_avg_performance(self):
+        count = sum(row["performance_count"] for row in self.revenue)
+        if not count:
+            return None
+        return sum(row["performance_sum"] or 0 for row in self.revenue) / count
+
+    def sales_budget_accuracy(self):
+        count = sum(row["nonzero_rows"] for row in self.sales_budget)
+        if not count:
+            return None
+        return sum(row["accuracy_sum"] or 0 for row in self.sales_budget) / count
+
+    @staticmethod
+    def average(rows):
+        count = sum(row["value_count"] for row in rows)
+        if not count:
+            return None
+        return sum(row["total"] or 0 for row in rows) / count
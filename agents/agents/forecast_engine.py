@@ -0,0 +1,305 @@
+import hashlib
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.db import connection
+from django.db.models import FloatField, IntegerField, Sum
+from django.db.models.functions import Cast
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+from agents.models import ForecastModel
+from financial_data.models import EnterpriseIndustryView, RevenuesView
+
+SEASONAL_PERIODS = 12
+# Shorter series get no model; from two full years on, the model is seasonal.
+MIN_OBSERVATIONS = 4
+MIN_SEASONAL_OBSERVATIONS = 2 * SEASONAL_PERIODS
+
+
+class MonthlySeries:
+    """Contiguous monthly real income from (first_year, first_month) on;
+    months missing in between are interpolated."""
+
+    def __init__(self, first_year, first_month, values):
+        self.first_year = first_year
+        self.first_month = first_month
+        self.values = values
+
+    @staticmethod
+    def from_months(months):
+        """Build a series from a {(year, month): income} mapping."""
+        (first_year, first_month), (last_year, last_month) = min(months), max(months)
+        length = (last_year - first_year) * 12 + last_month - first_month + 1
+        values = np.full(length, np.nan)
+        for (year, month), income in months.items():
+            values[(year - first_year) * 12 + month - first_month] = income
+        missing = np.isnan(values)
+        if missing.any():
+            values[missing] = np.interp(
+                np.flatnonzero(missing), np.flatnonzero(~missing), values[~missing]
+            )
+        return MonthlySeries(first_year, first_month, values)
+
+    def month_at(self, index):
+        months = self.first_month - 1 + index
+        return self.first_year + months // 12, months % 12 + 1
+
+    def fingerprint(self, length=None):
+        values = self.values[:length]
+        return hashlib.sha1(
+            f"{self.first_year}-{self.first_month}:".encode()
+            + np.round(values, 6).tobytes()
+        ).hexdigest()
+
+
+class ForecastEngine:
+    """Holt-Winters forecasts of enterprise revenue per description.
+
+    Models are fitted once per (enterprise, description) series and persisted
+    in ``ForecastModel`` with the state after the last observed month. When
+    later months are appended to an unchanged history, the state is rolled
+    forward with the stored parameters instead of refitting; any other change
+    to the series triggers a refit. ``refresh`` brings many series up to date,
+    fitting them in a process pool; ``forecast`` never fits: it only rolls
+    stored models forward and runs the forecast recursion.
+    """
+
+    @staticmethod
+    def forecast(enterprise_id, description=None, year=None, steps=12):
+        """Forecast the months following the last observed one, as
+        {description: {"year": {month: income}}} (None for a description
+        without a current model: never fitted, or history changed since its
+        fit, until ``refresh`` fits it). With ``year``, forecast up to
+        December of that year and keep only its months."""
+        series = ForecastEngine.series([enterprise_id], description)
+        models = ForecastEngine._sync(series, fit=False)
+
+        forecasts = {}
+        for (_, desc), monthly in series.items():
+            model = models.get((enterprise_id, desc))
+            if model is None:
+                forecasts[desc] = None
+                continue
+            last = len(monthly.values) - 1
+            horizon = steps
+            if year is not None:
+                last_year, last_month = monthly.month_at(last)
+                horizon = (year - last_year) * 12 + 12 - last_month
+            predicted = ForecastEngine._predict(
+                model.params, model.state, max(horizon, 0)
+            )
+            by_year = {}
+            for step, value in enumerate(predicted, start=1):
+                forecast_year, month = monthly.month_at(last + step)
+                if year is None or forecast_year == year:
+                    by_year.setdefault(str(forecast_year), {})[month] = value
+            forecasts[desc] = by_year
+        return forecasts
+
+    @staticmethod
+    def refresh(enterprise_ids=None, full=False, processes=None):
+        """Bring the models of the given (default: all active) enterprises up
+        to date. Returns the number of series refitted, rolled forward and
+        left as they were."""
+        if enterprise_ids is None:
+            enterprise_ids = EnterpriseIndustryView.objects.filter(
+                enterprise_active=True
+            ).values_list("enterprise_id", flat=True)
+        series = ForecastEngine.series(set(enterprise_ids))
+        counts = {}
+        ForecastEngine._sync(series, full=full, processes=processes, counts=counts)
+        return counts
+
+    @staticmethod
+    def series(enterprise_ids, description=None):
+        """Monthly real income per (enterprise, description), from one
+        grouped query."""
+        revenues = RevenuesView.objects.filter(
+            enterprise_id__in=enterprise_ids, description__isnull=False
+        )
+        if description is not None:
+            revenues = revenues.filter(description=description)
+        rows = (
+            revenues.annotate(year_int=Cast("year", IntegerField()))
+            .filter(year_int__isnull=False, month__gte=1, month__lte=12)
+            .values("enterprise_id", "description", "year_int", "month")
+            .annotate(income=Cast(Sum("real_income"), FloatField()))
+            .order_by()
+        )
+        months = {}
+        for row in rows:
+            if row["income"] is not None:
+                key = (row["enterprise_id"], row["description"])
+                months.setdefault(key, {})[(row["year_int"], row["month"])] = row[
+                    "income"
+                ]
+        return {
+            key: MonthlySeries.from_months(values)
+            for key, values in sorted(months.items())
+        }
+
+    @staticmethod
+    def _sync(series, full=False, processes=None, counts=None, fit=True):
+        """Persisted models of the given series, refitted or rolled forward
+        where the series changed since they were stored. Without ``fit``,
+        series that need a fit are left without a model."""
+        counts = {} if counts is None else counts
+        counts.update(fitted=0, updated=0, unchanged=0, unfitted=0)
+        stored = {
+            (model.enterprise_id, model.description): model
+            for model in ForecastModel.objects.filter(
+                enterprise_id__in={enterprise_id for enterprise_id, _ in series}
+            )
+        }
+
+        current, changed, to_fit = {}, [], []
+        for key, monthly in series.items():
+            model = stored.get(key)
+            if len(monthly.values) < MIN_OBSERVATIONS:
+                continue
+            if model is not None and not full:
+                if model.fingerprint == monthly.fingerprint():
+                    current[key] = model
+                    counts["unchanged"] += 1
+                    continue
+                if (
+                    (model.first_year, model.first_month)
+                    == (monthly.first_year, monthly.first_month)
+                    and model.n_observations < len(monthly.values)
+                    and model.fingerprint == monthly.fingerprint(model.n_observations)
+                ):
+                    # Only new months: roll the state forward.
+                    model.state = ForecastEngine._update(
+                        model.params,
+                        model.state,
+                        monthly.values[model.n_observations :],
+                    )
+                    ForecastEngine._stamp(model, monthly)
+                    current[key] = model
+                    changed.append(model)
+                    counts["updated"] += 1
+                    continue
+            if fit:
+                to_fit.append(key)
+            else:
+                counts["unfitted"] += 1
+
+        values = [series[key].values for key in to_fit]
+        if processes and processes > 1 and len(values) > 1:
+            with ProcessPoolExecutor(processes) as pool:
+                fits = list(
+                    pool.map(
+                        fit_holt_winters,
+                        values,
+                        chunksize=max(1, len(values) // (processes * 4)),
+                    )
+                )
+        else:
+            fits = list(map(fit_holt_winters, values))
+
+        for key, fit in zip(to_fit, fits):
+            if fit is None:
+                continue
+            model = ForecastModel(enterprise_id=key[0], description=key[1], **fit)
+            ForecastEngine._stamp(model, series[key])
+            current[key] = model
+            changed.append(model)
+            counts["fitted"] += 1
+
+        ForecastModel.objects.bulk_create(
+            changed,
+            batch_size=500,
+            update_conflicts=True,
+            # MySQL updates on any unique key and rejects an explicit target.
+            unique_fields=(
+                ["enterprise_id", "description"]
+                if connection.features.supports_update_conflicts_with_target
+                else None
+            ),
+            update_fields=[
+                "n_observations",
+                "first_year",
+                "first_month",
+                "last_year",
+                "last_month",
+                "fingerprint",
+                "params",
+                "state",
+                "sse",
+                "fitted_at",
+            ],
+        )
+        return current
+
+    @staticmethod
+    def _stamp(model, monthly):
+        model.n_observations = len(monthly.values)
+        model.first_year, model.first_month = monthly.first_year, monthly.first_month
+        model.last_year, model.last_month = monthly.month_at(len(monthly.values) - 1)
+        model.fingerprint = monthly.fingerprint()
+
+    @staticmethod
+    def _update(params, state, values):
+        """Additive damped Holt-Winters recursions over new observations."""
+        alpha, beta, phi = params["alpha"], params["beta"], params["phi"]
+        gamma = params["gamma"]
+        level, trend = state["level"], state["trend"]
+        seasonal = list(state["seasonal"]) if state["seasonal"] is not None else None
+        for value in values:
+            season = seasonal[0] if seasonal is not None else 0.0
+            new_level = alpha * (value - season) + (1 - alpha) * (level + phi * trend)
+            new_trend = beta * (new_level - level) + (1 - beta) * phi * trend
+            if seasonal is not None:
+                seasonal = seasonal[1:] + [
+                    gamma * (value - level - phi * trend) + (1 - gamma) * season
+                ]
+            level, trend = new_level, new_trend
+        return {"level": level, "trend": trend, "seasonal": seasonal}
+
+    @staticmethod
+    def _predict(params, state, steps):
+        phi = params["phi"]
+        damping = np.cumsum(phi ** np.arange(1, steps + 1))
+        predicted = state["level"] + damping * state["trend"]
+        if state["seasonal"] is not None:
+            predicted = predicted + np.resize(state["seasonal"], steps)
+        return predicted.tolist()
+
+
+def fit_holt_winters(values):
+    """Fit an additive damped-trend model, seasonal from two years of data
+    on; returns ForecastModel fields, or None when the fit fails."""
+    seasonal = len(values) >= MIN_SEASONAL_OBSERVATIONS
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            fit = ExponentialSmoothing(
+                values,
+                trend="add",
+                damped_trend=True,
+                seasonal="add" if seasonal else None,
+                seasonal_periods=SEASONAL_PERIODS if seasonal else None,
+            ).fit()
+    except (ValueError, np.linalg.LinAlgError):
+        return None
+
+    params = {
+        "alpha": float(fit.params["smoothing_level"]),
+        "beta": float(fit.params["smoothing_trend"]),
+        "gamma": float(fit.params["smoothing_seasonal"]) if seasonal else 0.0,
+        "phi": float(fit.params["damping_trend"]),
+    }
+    if not all(np.isfinite(value) for value in params.values()):
+        return None
+    return {
+        "params": params,
+        "state": {
+            "level": float(fit.level[-1]),
+            "trend": float(fit.trend[-1]),
+            "seasonal": (
+                fit.season[-SEASONAL_PERIODS:].tolist() if seasonal else None
+            ),
+        },
+        "sse": float(fit.sse),
+    }
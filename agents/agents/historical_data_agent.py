@@ -6,7 +6,7 @@ from financial_data.models import (
     SalesBudgetsView,
     EnterpriseIndustryView,
 )
-from .validation_agent import ValidationAgent
+from .validation_snapshots import ValidationSnapshots
 from django.utils import timezone
 
 
@@ -26,8 +26,8 @@ class HistoricalDataAgent:
                 "historical_data": {},
             }
 
-        # Run the ValidationAgent to check data validity
-        validation_result = ValidationAgent.execute(enterprise_id)
+        # Read the (persisted) ValidationAgent result to check data validity
+        validation_result = ValidationSnapshots.get(enterprise_id)
 
         # Check if ValidationAgent returned an error
         if "error" in validation_result:
@@ -0,0 +1,83 @@
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+_executor = None
+_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+class HypothesisAnalyses:
+    """Narrative analyses of WebRevenuHypoAgent predictions, written off the
+    request path.
+
+    ``submit`` hands ``generate_analysis`` to a thread pool (the work is one
+    LLM round trip, through the process-wide client) and returns an id at
+    once; the analysis view returns the job status, and the text once the job
+    is done. Jobs and results are kept in the cache for
+    ``HYPOTHESIS_ANALYSIS_TIMEOUT`` seconds.
+    """
+
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
+    @staticmethod
+    def submit(agent, *args):
+        """Queue ``agent.generate_analysis(*args)``; returns the job id."""
+        analysis_id = uuid.uuid4().hex
+        HypothesisAnalyses._store(analysis_id, {"status": HypothesisAnalyses.PENDING})
+        HypothesisAnalyses._executor().submit(
+            HypothesisAnalyses._run, analysis_id, agent, args
+        )
+        return analysis_id
+
+    @staticmethod
+    def get(analysis_id):
+        """{"status": ...} of a job, with its "analysis" once done or its
+        "error" if it failed; None for an unknown or expired id."""
+        return caches["shared"].get(HypothesisAnalyses._key(analysis_id))
+
+    @staticmethod
+    def _run(analysis_id, agent, args):
+        try:
+            job = {
+                "status": HypothesisAnalyses.DONE,
+                "analysis": agent.generate_analysis(*args),
+            }
+        except Exception as e:
+            logger.error(f"Hypothesis analysis {analysis_id} failed: {str(e)}")
+            job = {"status": HypothesisAnalyses.FAILED, "error": str(e)}
+        try:
+            HypothesisAnalyses._store(analysis_id, job)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _store(analysis_id, job):
+        caches["shared"].set(
+            HypothesisAnalyses._key(analysis_id),
+            job,
+            settings.HYPOTHESIS_ANALYSIS_TIMEOUT,
+        )
+
+    @staticmethod
+    def _key(analysis_id):
+        return f"hypothesis_analysis_{analysis_id}"
+
+    @staticmethod
+    def _executor():
+        global _executor
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    settings.HYPOTHESIS_ANALYSIS_WORKERS,
+                    thread_name_prefix="hypothesis-analysis",
+                )
+            return _executor
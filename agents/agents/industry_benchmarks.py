@@ -0,0 +1,213 @@
+import hashlib
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, IntegerField, StdDev, Sum
+from django.db.models.functions import Cast
+
+from agents.models import DataVersion, IndustryBenchmark, IndustryBenchmarkSource
+from financial_data.models import EnterpriseIndustryView, RevenuesView
+
+from .seasonality_profiles import SeasonalityProfiles
+
+
+class IndustryBenchmarks:
+    """Precomputed per-industry monthly statistics of real and expected income.
+
+    ``refresh`` rebuilds only the (industry, description) benchmarks, and their
+    seasonality profiles, touched by enterprises whose revenue lines changed
+    since the previous run; readers
+    fetch at most years x 12 rows per industry and description.
+
+    Benchmarks are stamped with the industry data version they were checked
+    against; once the data changes (and the version is bumped on write) they
+    are not served until the next refresh.
+    """
+
+    @staticmethod
+    def monthly_averages(industry_type_id, description, data_version=None):
+        """Benchmark rows in the shape of the ACP live aggregation; empty when
+        the benchmarks are behind the industry data version."""
+        if data_version is None:
+            data_version = DataVersion.current(DataVersion.INDUSTRY, industry_type_id)
+        return list(
+            IndustryBenchmark.objects.filter(
+                industry_type_id=industry_type_id,
+                description=description,
+                data_version=data_version,
+            )
+            .values(
+                "year",
+                "month",
+                average_real=F("real_mean"),
+                average_budget=F("expected_mean"),
+            )
+            .order_by("year", "month")
+        )
+
+    @staticmethod
+    def refresh(full=False):
+        industries = dict(
+            EnterpriseIndustryView.objects.filter(enterprise_active=True).values_list(
+                "enterprise_id", "industry_type_id"
+            )
+        )
+        # Read before the data is fingerprinted: a write after this point
+        # bumps the version past the stamp and the benchmark is not served.
+        versions = DataVersion.current_many(DataVersion.INDUSTRY, industries.values())
+
+        current = {}
+        fingerprints = (
+            RevenuesView.objects.filter(
+                enterprise_id__in=EnterpriseIndustryView.objects.filter(
+                    enterprise_active=True
+                ).values("enterprise_id")
+            )
+            .values("enterprise_id", "description")
+            .annotate(
+                rows=Count("revenue_id"),
+                real=Sum("real_income"),
+                expected=Sum("expected_income"),
+                weighted_real=Sum(F("month") * F("real_income")),
+                yearly_real=Sum(Cast("year", IntegerField()) * F("real_income")),
+            )
+        )
+        for row in fingerprints:
+            industry_type_id = industries.get(row["enterprise_id"])
+            if industry_type_id is None or not row["description"]:
+                continue
+            checksum = hashlib.sha1(
+                f"{industry_type_id}|{row['rows']}|{row['real']}|"
+                f"{row['expected']}|{row['weighted_real']}|{row['yearly_real']}".encode()
+            ).hexdigest()
+            current[(row["enterprise_id"], row["description"])] = (
+                industry_type_id,
+                checksum,
+            )
+
+        stored = {
+            (source.enterprise_id, source.description): (
+                source.industry_type_id,
+                source.checksum,
+            )
+            for source in IndustryBenchmarkSource.objects.all()
+        }
+
+        changed = {
+            key
+            for key in current.keys() | stored.keys()
+            if full or current.get(key) != stored.get(key)
+        }
+
+        affected = defaultdict(set)
+        for key in changed:
+            for state in (current.get(key), stored.get(key)):
+                if state is not None:
+                    affected[state[0]].add(key[1])
+
+        benchmarks_written = 0
+        for industry_type_id, descriptions in affected.items():
+            benchmarks = IndustryBenchmarks._compute(industry_type_id, descriptions)
+            with transaction.atomic():
+                IndustryBenchmark.objects.filter(
+                    industry_type_id=industry_type_id, description__in=descriptions
+                ).delete()
+                IndustryBenchmark.objects.bulk_create(benchmarks)
+            benchmarks_written += len(benchmarks)
+            SeasonalityProfiles.refresh(industry_type_id, descriptions, bump=False)
+
+        changed_enterprises = {enterprise_id for enterprise_id, _ in changed}
+        with transaction.atomic():
+            IndustryBenchmarkSource.objects.filter(
+                enterprise_id__in=changed_enterprises
+            ).delete()
+            IndustryBenchmarkSource.objects.bulk_create(
+                [
+                    IndustryBenchmarkSource(
+                        enterprise_id=enterprise_id,
+                        description=description,
+                        industry_type_id=industry_type_id,
+                        checksum=checksum,
+                    )
+                    for (enterprise_id, description), (
+                        industry_type_id,
+                        checksum,
+                    ) in current.items()
+                    if enterprise_id in changed_enterprises
+                ]
+            )
+
+        # Results derived from the old data are keyed by version and become
+        # unreachable once the versions move on.
+        DataVersion.bump(DataVersion.ENTERPRISE, changed_enterprises)
+        DataVersion.bump(DataVersion.INDUSTRY, affected)
+
+        # Every industry has now been checked against its data: stamp its
+        # benchmarks with the version read at the start (bumped once more for
+        # the industries rebuilt above).
+        stamps = defaultdict(list)
+        for industry_type_id, version in versions.items():
+            stamps[version + (industry_type_id in affected)].append(industry_type_id)
+        for version, industry_type_ids in stamps.items():
+            IndustryBenchmark.objects.filter(
+                industry_type_id__in=industry_type_ids
+            ).update(data_version=version)
+
+        return {
+            "changed_enterprises": sorted(changed_enterprises),
+            "industries_refreshed": sorted(affected),
+            "benchmarks_written": benchmarks_written,
+        }
+
+    @staticmethod
+    def _compute(industry_type_id, descriptions):
+        monthly_stats = (
+            RevenuesView.objects.filter(
+                enterprise_id__in=EnterpriseIndustryView.objects.filter(
+                    industry_type_id=industry_type_id, enterprise_active=True
+                ).values("enterprise_id"),
+                description__in=descriptions,
+            )
+            .values("description", "year", "month")
+            .annotate(
+                real_count=Count("real_income"),
+                real_sum=Sum("real_income"),
+                real_mean=Avg("real_income"),
+                real_std=StdDev("real_income"),
+                expected_count=Count("expected_income"),
+                expected_sum=Sum("expected_income"),
+                expected_mean=Avg("expected_income"),
+                expected_std=StdDev("expected_income"),
+            )
+        )
+
+        benchmarks = []
+        for row in monthly_stats:
+            try:
+                year = int(row["year"])
+            except (ValueError, TypeError):
+                continue
+            benchmarks.append(
+                IndustryBenchmark(
+                    industry_type_id=industry_type_id,
+                    description=row["description"],
+                    year=year,
+                    month=row["month"],
+                    **{
+                        field: (
+                            float(row[field]) if row[field] is not None else None
+                        )
+                        for field in (
+                            "real_sum",
+                            "real_mean",
+                            "real_std",
+                            "expected_sum",
+                            "expected_mean",
+                            "expected_std",
+                        )
+                    },
+                    real_count=row["real_count"],
+                    expected_count=row["expected_count"],
+                )
+            )
+        return benchmarks
@@ -0,0 +1,253 @@
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from langchain.prompts import PromptTemplate
+
+from agents.models import IndustryIntelligence
+
+from .llm_clients import LLMClients
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+EXTRACTION_PROMPT = PromptTemplate(
+    input_variables=["industry_type", "prediction_year", "content"],
+    template="""
+            As a financial analyst, extract key information about the {industry_type} industry for the year {prediction_year} from the following content:
+
+            {content}
+
+            Provide the following information:
+            1. Estimated average annual revenue for a company in this industry in {prediction_year}
+            2. Projected industry growth rate for {prediction_year}
+            3. Key trends affecting the industry in {prediction_year} (comma-separated list)
+            4. Potential challenges or risks for {prediction_year} (comma-separated list)
+            5. Seasonality factors for {prediction_year} (comma-separated list of 12 numbers, one for each month, or 'N/A' if not applicable)
+
+            Format your response as a JSON object with keys: average_revenue, growth_rate, trends, challenges, seasonality.
+            Use "N/A" if you can't find specific information for any field.
+            """,
+)
+
+_executor = None
+_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+class IndustryIntelligenceStore:
+    """Industry research shared by the web agents of every worker.
+
+    Researching an industry means scraping search results and having the LLM
+    extract the industry data from them; both are stored in
+    ``IndustryIntelligence`` per (industry type, year). Callers that only need
+    the search snippets (``content``) store them without the extraction, which
+    ``get`` adds on its first read. Research younger than
+    ``INDUSTRY_INTELLIGENCE_TTL`` is served as is. Older research is still
+    served for ``INDUSTRY_INTELLIGENCE_STALE_TTL`` more seconds while one
+    worker, the one that claims the row, researches it again in the
+    background. Missing or expired research is done on the request path by
+    the worker that claims the row (a placeholder row is inserted for missing
+    research); other requests poll the row until it is stored. A claim
+    expires after ``INDUSTRY_INTELLIGENCE_REFRESH_LEASE`` so that a failed
+    research is retried. A failed search is served as empty content and not
+    stored.
+    """
+
+    @staticmethod
+    def get(industry_type, year, llm):
+        """{"content": search snippets, "data": extracted industry data}."""
+        return IndustryIntelligenceStore._get(industry_type, year, llm, extract=True)
+
+    @staticmethod
+    def content(industry_type, year, llm):
+        """Search snippets on the industry, without waiting for the LLM
+        extraction when they have to be scraped."""
+        return IndustryIntelligenceStore._get(
+            industry_type, year, llm, extract=False
+        )["content"]
+
+    @staticmethod
+    def _get(industry_type, year, llm, extract):
+        record = IndustryIntelligence.objects.filter(
+            industry_type=industry_type, year=year, researched_at__isnull=False
+        ).first()
+        if record is not None and (record.data is not None or not extract):
+            age = IndustryIntelligenceStore._age(record)
+            if age < settings.INDUSTRY_INTELLIGENCE_TTL:
+                return IndustryIntelligenceStore._entry(record)
+            if age < (
+                settings.INDUSTRY_INTELLIGENCE_TTL
+                + settings.INDUSTRY_INTELLIGENCE_STALE_TTL
+            ):
+                IndustryIntelligenceStore._revalidate(record, llm)
+                return IndustryIntelligenceStore._entry(record)
+        return IndustryIntelligenceStore._refresh(industry_type, year, llm, extract)
+
+    @staticmethod
+    def _age(record):
+        return (timezone.now() - record.researched_at).total_seconds()
+
+    @staticmethod
+    def _entry(record):
+        return {"content": record.content, "data": record.data}
+
+    @staticmethod
+    def _refresh(industry_type, year, llm, extract):
+        """Research the industry once the row is claimed (only extract its
+        data when current snippets are stored), or wait for the worker that
+        claimed it to store its research."""
+        while True:
+            record, _ = IndustryIntelligence.objects.get_or_create(
+                industry_type=industry_type,
+                year=year,
+                defaults={"content": "", "data": None, "researched_at": None},
+            )
+            current = (
+                record.researched_at is not None
+                and IndustryIntelligenceStore._age(record)
+                < settings.INDUSTRY_INTELLIGENCE_TTL
+            )
+            if current and (record.data is not None or not extract):
+                return IndustryIntelligenceStore._entry(record)
+            if IndustryIntelligenceStore._claim(record):
+                return IndustryIntelligenceStore._research(
+                    industry_type,
+                    year,
+                    llm if extract else None,
+                    content=record.content if current else None,
+                )
+            time.sleep(settings.INDUSTRY_INTELLIGENCE_POLL_INTERVAL)
+
+    @staticmethod
+    def _revalidate(record, llm):
+        """Refresh stale research in the background, unless another worker
+        has claimed it."""
+        if IndustryIntelligenceStore._claim(record):
+            IndustryIntelligenceStore._executor().submit(
+                IndustryIntelligenceStore._refresh_in_background,
+                record.industry_type,
+                record.year,
+                llm,
+            )
+
+    @staticmethod
+    def _claim(record):
+        """Claim the row for a research, unless it has been researched since
+        ``record`` was read or another worker's claim is still running."""
+        now = timezone.now()
+        lease = timedelta(seconds=settings.INDUSTRY_INTELLIGENCE_REFRESH_LEASE)
+        return (
+            IndustryIntelligence.objects.filter(
+                pk=record.pk, researched_at=record.researched_at
+            )
+            .filter(
+                Q(refresh_started_at__isnull=True)
+                | Q(refresh_started_at__lt=now - lease)
+            )
+            .update(refresh_started_at=now)
+        )
+
+    @staticmethod
+    def _research(industry_type, year, llm, content=None):
+        """Scrape the search results (unless ``content`` is given), extract
+        the industry data from them with ``llm`` (unless None) and store
+        them, releasing the claim."""
+        rows = IndustryIntelligence.objects.filter(
+            industry_type=industry_type, year=year
+        )
+        fields = {}
+        try:
+            if content is None:
+                content = search(industry_type, year)
+                if content is None:
+                    rows.update(refresh_started_at=None)
+                    return {"content": "", "data": {}}
+                fields = {"content": content, "researched_at": timezone.now()}
+            data = None
+            if llm is not None:
+                data = extract(industry_type, year, content, llm)
+        except BaseException:
+            # Let the next request retry at once rather than after the lease.
+            rows.update(refresh_started_at=None)
+            raise
+        rows.update(data=data, refresh_started_at=None, **fields)
+        return {"content": content, "data": data}
+
+    @staticmethod
+    def _refresh_in_background(industry_type, year, llm):
+        try:
+            IndustryIntelligenceStore._research(industry_type, year, llm)
+        except Exception as e:
+            logger.warning(
+                f"Refreshing industry research for {industry_type} {year} failed: {str(e)}"
+            )
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _executor():
+        global _executor
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    settings.INDUSTRY_INTELLIGENCE_REFRESH_WORKERS,
+                    thread_name_prefix="industry-intelligence",
+                )
+            return _executor
+
+
+def search(industry_type, year):
+    """Snippets of the search results on the industry for the year, or None
+    when the search fails (search engines often answer scrapers with 429 or
+    503)."""
+    query = f"{industry_type} industry trends statistics financial analysis forecast {year}"
+    url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
+    try:
+        response = LLMClients.http().get(url, headers=HEADERS, timeout=10)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logger.warning(f"Industry search for {industry_type} {year} failed: {str(e)}")
+        return None
+    soup = BeautifulSoup(response.text, "html.parser")
+    snippets = [result.get_text() for result in soup.select(".g")]
+    return " ".join(snippets[:10])
+
+
+def extract(industry_type, year, content, llm):
+    """Industry data for the year extracted from search snippets with
+    ``llm``."""
+    response = LLMClients.invoke(
+        llm,
+        EXTRACTION_PROMPT.format(
+            industry_type=industry_type, prediction_year=year, content=content
+        ),
+    )
+
+    try:
+        data = json.loads(response)
+    except json.JSONDecodeError:
+        data = {}
+        patterns = {
+            "average_revenue": r'"average_revenue":\s*"([^"]+)"',
+            "growth_rate": r'"growth_rate":\s*"([^"]+)"',
+            "trends": r'"trends":\s*"([^"]+)"',
+            "challenges": r'"challenges":\s*"([^"]+)"',
+            "seasonality": r'"seasonality":\s*"([^"]+)"',
+        }
+        for key, pattern in patterns.items():
+            match = re.search(pattern, response)
+            data[key] = match.group(1) if match else "N/A"
+    return data
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.db import close_old_connections, connection
+from langchain_google_genai import GoogleGenerativeAI
+from requests.adapters import HTTPAdapter
+
+from .single_flight import SingleFlight
+
+_clients = {}
+_session = None
+_slots = None
+_executor = None
+_pid = None
+_lock = threading.Lock()
+
+
+class LLMClients:
+    """LLM and HTTP clients shared by the web agents of a worker process.
+
+    Building a ``GoogleGenerativeAI`` reconfigures ``google.generativeai`` and
+    drops its service client, so an agent built per request paid for a new
+    channel and TLS handshake on every call. The registry builds one client
+    per (model, API key) on first use and hands that same client to every
+    agent; search pages are fetched through one keep-alive ``requests.Session``
+    with a pool of ``LLM_HTTP_POOL_SIZE`` connections per host. ``invoke``
+    holds at most ``LLM_MAX_CONCURRENCY`` LLM calls in flight per process.
+
+    Everything is rebuilt after a fork, as sockets and channels must not be
+    shared with the parent.
+    """
+
+    @staticmethod
+    def get(model, google_api_key):
+        with _lock:
+            LLMClients._for_this_process()
+            llm = _clients.get((model, google_api_key))
+            if llm is None:
+                llm = GoogleGenerativeAI(model=model, google_api_key=google_api_key)
+                _clients[(model, google_api_key)] = llm
+            return llm
+
+    @staticmethod
+    def http():
+        global _session
+        with _lock:
+            LLMClients._for_this_process()
+            if _session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=settings.LLM_HTTP_POOL_SIZE,
+                    pool_maxsize=settings.LLM_HTTP_POOL_SIZE,
+                )
+                _session = requests.Session()
+                _session.mount("https://", adapter)
+                _session.mount("http://", adapter)
+            return _session
+
+    @staticmethod
+    def invoke(llm, prompt):
+        """``llm.invoke(prompt)``, once a concurrency slot is free. Concurrent
+        calls with the same model and prompt share one call."""
+
+        def call():
+            with LLMClients._slots():
+                return llm.invoke(prompt)
+
+        return SingleFlight.run(("llm", llm.model, prompt), call)
+
+    @staticmethod
+    async def ainvoke(llm, prompt):
+        """Awaitable ``invoke``. The Gemini client has no native async call
+        (its ``ainvoke`` runs the blocking call in an executor), so the call
+        runs through ``invoke`` in a thread of the registry's pool, keeping
+        the concurrency limit and the coalescing. The pool outlives event
+        loops, and has ``LLM_ASYNC_WORKERS`` threads, more than the calls in
+        flight: a call its caller stopped waiting for keeps a thread, not the
+        calls queued after it."""
+        return await asyncio.get_running_loop().run_in_executor(
+            LLMClients._executor(), LLMClients._invoke_in_pool, llm, prompt
+        )
+
+    @staticmethod
+    def _invoke_in_pool(llm, prompt):
+        # The coalescing goes through the database cache: the pool threads
+        # live on, so they must not keep a connection that may go stale.
+        close_old_connections()
+        try:
+            return LLMClients.invoke(llm, prompt)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _slots():
+        global _slots
+        with _lock:
+            LLMClients._for_this_process()
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(settings.LLM_MAX_CONCURRENCY)
+            return _slots
+
+    @staticmethod
+    def _executor():
+        global _executor
+        with _lock:
+            LLMClients._for_this_process()
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    settings.LLM_ASYNC_WORKERS, thread_name_prefix="llm"
+                )
+            return _executor
+
+    @staticmethod
+    def _for_this_process():
+        global _session, _slots, _executor, _pid
+        if _pid != os.getpid():
+            _clients.clear()
+            _session = _slots = _executor = None
+            _pid = os.getpid()
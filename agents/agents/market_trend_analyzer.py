@@ -1,14 +1,16 @@
+import asyncio
 import logging
-from typing import List, Dict, Tuple, Any, Optional
-import requests
-from bs4 import BeautifulSoup
+from typing import List, Dict, Tuple, Any, Optional, Union
 from datetime import datetime
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import GoogleGenerativeAI
 import os
 from dotenv import load_dotenv
 import re
-from django.core.cache import cache
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .industry_intelligence import IndustryIntelligenceStore
+from .llm_clients import LLMClients
 
 load_dotenv()
 
@@ -26,19 +28,15 @@ class MarketTrendAnalyzer:
         google_api_key: Optional[str] = None,
         num_trends: int = 5,
         num_stats: int = 5,
-        cache_timeout: int = 3600,
     ):
         self.logger = logging.getLogger(__name__)
         if google_api_key is None:
             google_api_key = os.getenv("GOOGLE_API_KEY")
         if not google_api_key:
             raise ValueError("GOOGLE_API_KEY not found in environment variables")
-        self.llm = GoogleGenerativeAI(
-            model="gemini-1.5-flash", google_api_key=google_api_key
-        )
+        self.llm = LLMClients.get("gemini-1.5-flash", google_api_key)
         self.num_trends = num_trends
         self.num_stats = num_stats
-        self.cache_timeout = cache_timeout
 
     def analyze_market_trends(
         self, industry_type: str, current_year: int, next_year: int
@@ -51,58 +49,142 @@ class MarketTrendAnalyzer:
             hypothesis, explanation = self._generate_hypothesis_and_explanation(
                 industry_type, current_year, next_year, content
             )
+            return self._analysis(trends, statistics, hypothesis, explanation)
+        except Exception as e:
+            self.logger.error(
+                f"Unexpected error in analyze_market_trends: {str(e)}", exc_info=True
+            )
+            return self._generate_fallback_analysis(
+                industry_type, current_year, next_year
+            )
 
-            clean_trends = [clean_text(trend) for trend in trends if trend]
-            clean_statistics = [clean_text(stat) for stat in statistics if stat]
-            clean_hypothesis = clean_text(hypothesis)
-            clean_explanation = clean_text(explanation)
+    async def aanalyze_market_trends(
+        self,
+        industry_type: str,
+        current_year: int,
+        next_year: int,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """``analyze_market_trends`` with the trends and the hypothesis
+        requested concurrently, all within ``timeout`` seconds (default
+        ``MARKET_TRENDS_TIMEOUT``). A part not ready by then gets the same
+        fallback as a failed LLM call."""
+        if timeout is None:
+            timeout = settings.MARKET_TRENDS_TIMEOUT
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            content = await asyncio.wait_for(
+                sync_to_async(self._fetch_industry_data)(
+                    industry_type, current_year, next_year
+                ),
+                timeout,
+            )
+            trends_and_stats = asyncio.ensure_future(
+                self._aextract_trends_and_stats(
+                    content, industry_type, current_year, next_year
+                )
+            )
+            hypothesis_and_explanation = asyncio.ensure_future(
+                self._agenerate_hypothesis_and_explanation(
+                    industry_type, current_year, next_year, content
+                )
+            )
+            await asyncio.wait(
+                [trends_and_stats, hypothesis_and_explanation],
+                timeout=max(deadline - loop.time(), 0),
+            )
 
-            return {
-                "trends": clean_trends[: self.num_trends],
-                "statistics": clean_statistics[: self.num_stats],
-                "hypothesis": self._extract_numeric_hypothesis(clean_hypothesis),
-                "explanation": clean_explanation,
-            }
+            trends, statistics = [], []
+            if trends_and_stats.done():
+                trends, statistics = trends_and_stats.result()
+            else:
+                trends_and_stats.cancel()
+                self.logger.warning("Market trends not ready before the deadline")
+            if hypothesis_and_explanation.done():
+                hypothesis, explanation = hypothesis_and_explanation.result()
+            else:
+                hypothesis_and_explanation.cancel()
+                self.logger.warning("Growth hypothesis not ready before the deadline")
+                hypothesis, explanation = self._fallback_hypothesis(
+                    industry_type, current_year, next_year
+                )
+            return self._analysis(trends, statistics, hypothesis, explanation)
         except Exception as e:
             self.logger.error(
-                f"Unexpected error in analyze_market_trends: {str(e)}", exc_info=True
+                f"Unexpected error in aanalyze_market_trends: {str(e)}",
+                exc_info=True,
             )
             return self._generate_fallback_analysis(
                 industry_type, current_year, next_year
             )
 
+    def _analysis(
+        self,
+        trends: List[str],
+        statistics: List[str],
+        hypothesis: Union[str, float],
+        explanation: str,
+    ) -> Dict[str, Any]:
+        clean_trends = [clean_text(trend) for trend in trends if trend]
+        clean_statistics = [clean_text(stat) for stat in statistics if stat]
+        if isinstance(hypothesis, str):
+            hypothesis = self._extract_numeric_hypothesis(clean_text(hypothesis))
+            explanation = clean_text(explanation)
+
+        return {
+            "trends": clean_trends[: self.num_trends],
+            "statistics": clean_statistics[: self.num_stats],
+            "hypothesis": hypothesis,
+            "explanation": explanation,
+        }
+
     def _fetch_industry_data(
         self, industry_type: str, current_year: int, next_year: int
     ) -> str:
-        # Sanitize industry_type for use in cache key
-        sanitized_industry_type = re.sub(r"[^\w]+", "_", industry_type)
-        cache_key = (
-            f"industry_data_{sanitized_industry_type}_{current_year}_{next_year}"
-        )
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cached_data
-
         try:
-            query = f"{industry_type} industry trends statistics financial analysis {current_year} {next_year} forecast"
-            url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
-            snippets = [result.get_text() for result in soup.select(".g")]
-            fetched_data = " ".join(snippets[:10])
-            cache.set(cache_key, fetched_data, self.cache_timeout)
-            return fetched_data
-        except requests.RequestException as e:
+            content = IndustryIntelligenceStore.content(
+                industry_type, next_year, self.llm
+            )
+            if content:
+                return content
+        except Exception as e:
             self.logger.warning(f"Failed to fetch market trends: {str(e)}")
-            return f"Unable to fetch real-time data. Analyzing general trends for {industry_type} industry for {current_year}-{next_year}."
+        return f"Unable to fetch real-time data. Analyzing general trends for {industry_type} industry for {current_year}-{next_year}."
 
     def _extract_trends_and_stats(
         self, content: str, industry_type: str, current_year: int, next_year: int
     ) -> Tuple[List[str], List[str]]:
+        prompt = self._trends_and_stats_prompt(
+            content, industry_type, current_year, next_year
+        )
+        try:
+            return self._split_trends_and_stats(LLMClients.invoke(self.llm, prompt))
+        except Exception as e:
+            self.logger.error(
+                f"Error in _extract_trends_and_stats: {str(e)}", exc_info=True
+            )
+            return [], []
+
+    async def _aextract_trends_and_stats(
+        self, content: str, industry_type: str, current_year: int, next_year: int
+    ) -> Tuple[List[str], List[str]]:
+        prompt = self._trends_and_stats_prompt(
+            content, industry_type, current_year, next_year
+        )
+        try:
+            return self._split_trends_and_stats(
+                await LLMClients.ainvoke(self.llm, prompt)
+            )
+        except Exception as e:
+            self.logger.error(
+                f"Error in _aextract_trends_and_stats: {str(e)}", exc_info=True
+            )
+            return [], []
+
+    def _trends_and_stats_prompt(
+        self, content: str, industry_type: str, current_year: int, next_year: int
+    ) -> str:
         prompt = PromptTemplate(
             input_variables=[
                 "content",
@@ -146,31 +228,50 @@ class MarketTrendAnalyzer:
             Second list: Statistics
             """,
         )
+        return prompt.format(
+            content=content,
+            industry_type=industry_type,
+            current_year=current_year,
+            next_year=next_year,
+            num_trends=self.num_trends,
+            num_stats=self.num_stats,
+        )
+
+    def _split_trends_and_stats(self, response: str) -> Tuple[List[str], List[str]]:
+        all_points = [
+            point.strip() for point in response.strip().split("\n") if point.strip()
+        ]
+        return all_points[: self.num_trends], all_points[self.num_trends :]
+
+    def _generate_hypothesis_and_explanation(
+        self, industry_type: str, current_year: int, next_year: int, content: str
+    ) -> Tuple[Union[str, float], str]:
+        prompt = self._hypothesis_prompt(industry_type, current_year, next_year, content)
         try:
-            chain = prompt | self.llm
-            response = chain.invoke(
-                {
-                    "content": content,
-                    "industry_type": industry_type,
-                    "current_year": current_year,
-                    "next_year": next_year,
-                    "num_trends": self.num_trends,
-                    "num_stats": self.num_stats,
-                }
-            )
-            all_points = [
-                point.strip() for point in response.strip().split("\n") if point.strip()
-            ]
-            return all_points[: self.num_trends], all_points[self.num_trends :]
+            return self._split_hypothesis(LLMClients.invoke(self.llm, prompt))
         except Exception as e:
             self.logger.error(
-                f"Error in _extract_trends_and_stats: {str(e)}", exc_info=True
+                f"Error in _generate_hypothesis_and_explanation: {str(e)}",
+                exc_info=True,
             )
-            return [], []
+            return self._fallback_hypothesis(industry_type, current_year, next_year)
 
-    def _generate_hypothesis_and_explanation(
+    async def _agenerate_hypothesis_and_explanation(
         self, industry_type: str, current_year: int, next_year: int, content: str
-    ) -> Tuple[str, str]:
+    ) -> Tuple[Union[str, float], str]:
+        prompt = self._hypothesis_prompt(industry_type, current_year, next_year, content)
+        try:
+            return self._split_hypothesis(await LLMClients.ainvoke(self.llm, prompt))
+        except Exception as e:
+            self.logger.error(
+                f"Error in _agenerate_hypothesis_and_explanation: {str(e)}",
+                exc_info=True,
+            )
+            return self._fallback_hypothesis(industry_type, current_year, next_year)
+
+    def _hypothesis_prompt(
+        self, industry_type: str, current_year: int, next_year: int, content: str
+    ) -> str:
         prompt = PromptTemplate(
             input_variables=["industry_type", "current_year", "next_year", "content"],
             template="""
@@ -186,27 +287,26 @@ class MarketTrendAnalyzer:
             Explanation: [Your explanation here]
             """,
         )
-        try:
-            chain = prompt | self.llm
-            response = chain.invoke(
-                {
-                    "industry_type": industry_type,
-                    "current_year": current_year,
-                    "next_year": next_year,
-                    "content": content,
-                }
-            )
-            hypothesis, explanation = response.split("Explanation:")
-            return hypothesis.replace("Hypothesis:", "").strip(), explanation.strip()
-        except Exception as e:
-            self.logger.error(
-                f"Error in _generate_hypothesis_and_explanation: {str(e)}",
-                exc_info=True,
-            )
-            return (
-                f"0% growth for {industry_type} in {next_year}",
-                f"Insufficient data to project growth from {current_year} to {next_year}.",
-            )
+        return prompt.format(
+            industry_type=industry_type,
+            current_year=current_year,
+            next_year=next_year,
+            content=content,
+        )
+
+    def _split_hypothesis(self, response: str) -> Tuple[str, str]:
+        hypothesis, explanation = response.split("Explanation:")
+        return hypothesis.replace("Hypothesis:", "").strip(), explanation.strip()
+
+    def _fallback_hypothesis(
+        self, industry_type: str, current_year: int, next_year: int
+    ) -> Tuple[float, str]:
+        # Numeric already: the LLM text parsing would read the year as the
+        # growth figure.
+        return (
+            0.0,
+            f"Insufficient data to project growth for {industry_type} from {current_year} to {next_year}.",
+        )
 
     def _extract_numeric_hypothesis(self, hypothesis: str) -> float:
         try:
@@ -1,11 +1,13 @@
 import pandas as pd
 import numpy as np
-from django.db.models import Sum
+from django.db.models import Count, FloatField, Sum
+from django.db.models.functions import Cast
 from financial_data.models import RevenuesView, EnterpriseIndustryView, Enterprise
 from decimal import Decimal
-import matplotlib.pyplot as plt
 import traceback
-from .validation_agent import ValidationAgent
+from .prediction_charts import PredictionCharts
+from .seasonality_profiles import SeasonalityProfiles
+from .validation_snapshots import ValidationSnapshots
 import json
 from urllib.parse import unquote
 import logging
@@ -16,259 +18,305 @@ logger = logging.getLogger(__name__)
 
 class PredGlobaleAgent:
     @staticmethod
-    def execute(enterprise_id, description=None, growth_rate=0.05):
+    def execute(
+        enterprise_id, description=None, growth_rate=0.05, include_seasonality=False
+    ):
+        history = {}
         try:
-            # First, check if the enterprise exists and get its name
-            enterprise = Enterprise.objects.filter(id=enterprise_id).first()
-            if not enterprise:
-                logger.error(f"Enterprise with ID {
-                             enterprise_id} does not exist.")
-                return {
-                    "error": f"Enterprise with ID {enterprise_id} does not exist.",
-                    "data_validity": None,
-                }
-
-            enterprise_name = enterprise.name
-
-            # Validate the enterprise data first
-            validation_result = ValidationAgent.execute(enterprise_id)
-
-            if not validation_result["validations"]["revenue"]:
-                logger.error(
-                    f"Insufficient revenue data for analysis for enterprise {
-                        enterprise_id}"
-                )
-                return {
-                    "error": "Insufficient revenue data for analysis",
-                    "data_validity": validation_result["validations"],
-                }
-
-            # Set the prediction year to next year
-            prediction_year = datetime.now().year + 1
-            current_year = prediction_year - 1
-            last_year = current_year - 1
-
-            # Fetch historical revenue data
-            revenues = RevenuesView.objects.filter(enterprise_id=enterprise_id)
-            logger.info(
-                f"Found {revenues.count()} revenue records for enterprise {
-                    enterprise_id}"
+            history = PredGlobaleAgent._history(enterprise_id, description)
+            if "error" in history:
+                return history
+
+            prediction_year = history["prediction_year"]
+            results = PredGlobaleAgent._forecast(
+                history["monthly_income"], prediction_year, growth_rate
             )
-            print(f"Found {revenues[0]} revenue records for enterprise {
-                  enterprise_id}")
-
-            # If a description is provided, filter the revenues by that description
-            if description:
-                description = unquote(description.strip('"'))
-                revenues = revenues.filter(description__iexact=description)
-                logger.info(
-                    f"Filtered to {revenues.count()} records for description '{
-                        description}'"
-                )
 
-            if not revenues.exists():
-                logger.error(
-                    f"No revenue data found for enterprise_id {
-                        enterprise_id} and description '{description}'"
+            logger.info(f"Prediction completed for enterprise {enterprise_id}")
+            result = {
+                "enterprise_id": enterprise_id,
+                "enterprise_name": history["enterprise_name"],
+                "prediction_year": prediction_year,
+                "results": results,
+                "data_validity": history["data_validity"],
+                "growth_rate": growth_rate,
+            }
+            if include_seasonality:
+                result["seasonality"] = SeasonalityProfiles.monthly_factors(
+                    enterprise_id, results.keys()
                 )
-                return {
-                    "error": f"No revenue data found for enterprise_id {enterprise_id} and description '{description}'",
-                    "data_validity": validation_result["validations"],
-                }
-
-            # Log available descriptions
-            available_descriptions = revenues.values_list(
-                "description", flat=True
-            ).distinct()
-            logger.info(
-                f"Available descriptions for enterprise {
-                    enterprise_id}: {list(available_descriptions)}"
-            )
+            return result
 
-            data = pd.DataFrame(
-                list(revenues.values("year", "month", "real_income", "description"))
-            )
+        except Exception as e:
+            return PredGlobaleAgent._unexpected_error("execute", e, history)
 
-            # Ensure 'year' is an integer and 'real_income' is float
-            data["year"] = pd.to_numeric(
-                data["year"], errors="coerce").astype("Int64")
-            data["real_income"] = pd.to_numeric(
-                data["real_income"], errors="coerce")
+    @staticmethod
+    def sweep(enterprise_id, growth_rates, description=None):
+        """Predictions for several growth rates from a single fetch: the
+        base year of every description is computed once and each rate is
+        applied to it in one broadcast over (rates x descriptions x months).
+        """
+        history = {}
+        try:
+            history = PredGlobaleAgent._history(enterprise_id, description)
+            if "error" in history:
+                return history
 
-            # Drop rows with NaN values
-            data = data.dropna()
+            prediction_year = history["prediction_year"]
+            return {
+                "enterprise_id": enterprise_id,
+                "enterprise_name": history["enterprise_name"],
+                "prediction_year": prediction_year,
+                "growth_rates": list(growth_rates),
+                "results": PredGlobaleAgent._sweep(
+                    history["monthly_income"], prediction_year, growth_rates
+                ),
+                "data_validity": history["data_validity"],
+            }
 
-            if data.empty:
-                logger.error(
-                    f"No valid data available after cleaning for enterprise {
-                        enterprise_id}"
-                )
-                return {
-                    "error": "No valid data available after cleaning",
-                    "data_validity": validation_result["validations"],
-                }
-
-            # Rename columns to match the original code
-            data = data.rename(
-                columns={
-                    "year": "Year",
-                    "month": "Month",
-                    "real_income": "RealIncome",
-                    "description": "Description",
-                }
-            )
+        except Exception as e:
+            return PredGlobaleAgent._unexpected_error("sweep", e, history)
 
-            # Group data by Year, Month, and Description, summing up the RealIncome for each group
-            monthly_income = (
-                data.groupby(["Year", "Month", "Description"])["RealIncome"]
-                .sum()
-                .unstack(level=["Month", "Description"])
+    @staticmethod
+    def _history(enterprise_id, description=None):
+        """Monthly income per (Month, Description) of the years before the
+        prediction year, with the enterprise name and data validity; or an
+        error result."""
+        # First, check if the enterprise exists and get its name
+        enterprise = Enterprise.objects.filter(id=enterprise_id).first()
+        if not enterprise:
+            logger.error(f"Enterprise with ID {enterprise_id} does not exist.")
+            return {
+                "error": f"Enterprise with ID {enterprise_id} does not exist.",
+                "data_validity": None,
+            }
+
+        # Validate the enterprise data first
+        validation_result = ValidationSnapshots.get(enterprise_id)
+
+        if not validation_result["validations"]["revenue"]:
+            logger.error(
+                f"Insufficient revenue data for analysis for enterprise {enterprise_id}"
             )
+            return {
+                "error": "Insufficient revenue data for analysis",
+                "data_validity": validation_result["validations"],
+            }
 
-            # Filter the data for years before the prediction year
-            data_before_prediction = monthly_income[
-                monthly_income.index < prediction_year
-            ]
+        # Set the prediction year to next year
+        prediction_year = datetime.now().year + 1
 
-            if data_before_prediction.empty:
-                logger.error(
-                    f"No historical data available for prediction for enterprise {
-                        enterprise_id}"
-                )
-                return {
-                    "error": "No historical data available for prediction",
-                    "data_validity": validation_result["validations"],
-                }
-
-            results = {}
-
-            for desc in data_before_prediction.columns.get_level_values(
-                "Description"
-            ).unique():
-                description_data = data_before_prediction.xs(
-                    desc, axis=1, level="Description"
-                )
+        # Fetch historical revenue data: one query, summed per year, month
+        # and description by the database.
+        revenues = RevenuesView.objects.filter(enterprise_id=enterprise_id)
 
-                if len(description_data) >= 2:
-                    current_year_data = description_data.iloc[-1]
-                    previous_year_data = description_data.iloc[-2]
-
-                    # If current year is all zeros, use previous year as base
-                    if (current_year_data == 0).all():
-                        base_prediction = previous_year_data
-                    else:
-                        base_prediction = current_year_data
-
-                    # Apply growth rate
-                    predicted_distribution = base_prediction * \
-                        (1 + growth_rate)
-
-                else:
-                    # Not enough historical data, use the only available year with growth
-                    predicted_distribution = description_data.iloc[-1] * (
-                        1 + growth_rate
-                    )
-
-                # Round and convert to int
-                predicted_distribution = predicted_distribution.round().astype(int)
-
-                results[desc] = {
-                    str(prediction_year): predicted_distribution.to_dict(),
-                    str(current_year): (
-                        description_data.iloc[-1].to_dict()
-                        if not description_data.empty
-                        else None
-                    ),
-                    str(last_year): (
-                        description_data.iloc[-2].to_dict()
-                        if len(description_data) > 1
-                        else None
-                    ),
-                }
+        # If a description is provided, filter the revenues by that description
+        if description:
+            description = unquote(description.strip('"'))
+            revenues = revenues.filter(description__iexact=description)
 
-            logger.info(f"Prediction completed for enterprise {enterprise_id}")
+        data = PredGlobaleAgent._fetch_monthly_income(revenues)
+
+        logger.info(
+            "Found %s revenue records for enterprise %s (descriptions: %s)",
+            int(data["Records"].sum()),
+            enterprise_id,
+            list(data["Description"].dropna().unique()),
+        )
+
+        if data.empty:
+            logger.error(
+                "No revenue data found for enterprise_id %s and description '%s'",
+                enterprise_id,
+                description,
+            )
             return {
-                "enterprise_id": enterprise_id,
-                "enterprise_name": enterprise_name,
-                "prediction_year": prediction_year,
-                "results": results,
+                "error": f"No revenue data found for enterprise_id {enterprise_id} and description '{description}'",
                 "data_validity": validation_result["validations"],
-                "growth_rate": growth_rate,
             }
 
-        except Exception as e:
+        # Drop rows with NaN values
+        data = data.drop(columns="Records").dropna().astype({"Year": "int64"})
+
+        if data.empty:
             logger.error(
-                f"Unexpected error in PredGlobaleAgent.execute: {str(e)}")
-            logger.error(traceback.format_exc())
+                "No valid data available after cleaning for enterprise %s",
+                enterprise_id,
+            )
             return {
-                "error": f"An unexpected error occurred: {str(e)}",
-                "traceback": traceback.format_exc(),
-                "data_validity": (
-                    validation_result["validations"]
-                    if "validation_result" in locals()
-                    else None
-                ),
+                "error": "No valid data available after cleaning",
+                "data_validity": validation_result["validations"],
             }
 
-    @staticmethod
-    def plot_prediction(result):
-        if "error" in result:
-            print(f"Error: {result['error']}")
-            return
-
-        for description, data in result["results"].items():
-            plt.figure(figsize=(14, 7))
-
-            prediction_year = result["prediction_year"]
-            predicted_data = pd.Series(data[str(prediction_year)])
-            current_year_data = (
-                pd.Series(data[str(prediction_year - 1)])
-                if data[str(prediction_year - 1)]
-                else None
-            )
-            last_year_data = (
-                pd.Series(data[str(prediction_year - 2)])
-                if data[str(prediction_year - 2)]
-                else None
+        # Group data by Year, Month, and Description, summing up the RealIncome for each group
+        monthly_income = (
+            data.groupby(["Year", "Month", "Description"])["RealIncome"]
+            .sum()
+            .unstack(level=["Month", "Description"])
+        )
+
+        # Filter the data for years before the prediction year
+        data_before_prediction = monthly_income[monthly_income.index < prediction_year]
+
+        if data_before_prediction.empty:
+            logger.error(
+                f"No historical data available for prediction for enterprise {enterprise_id}"
             )
+            return {
+                "error": "No historical data available for prediction",
+                "data_validity": validation_result["validations"],
+            }
 
-            if last_year_data is not None and not last_year_data.empty:
-                plt.plot(
-                    last_year_data.index,
-                    last_year_data.values,
-                    label=f"{prediction_year - 2}",
-                    marker="o",
-                )
+        return {
+            "enterprise_name": enterprise.name,
+            "prediction_year": prediction_year,
+            "monthly_income": data_before_prediction,
+            "data_validity": validation_result["validations"],
+        }
 
-            if current_year_data is not None and not current_year_data.empty:
-                plt.plot(
-                    current_year_data.index,
-                    current_year_data.values,
-                    label=f"{prediction_year - 1}",
-                    marker="o",
-                )
+    @staticmethod
+    def _unexpected_error(method, error, history):
+        logger.error(f"Unexpected error in PredGlobaleAgent.{method}: {str(error)}")
+        logger.error(traceback.format_exc())
+        return {
+            "error": f"An unexpected error occurred: {str(error)}",
+            "traceback": traceback.format_exc(),
+            "data_validity": history.get("data_validity"),
+        }
 
-            plt.plot(
-                predicted_data.index,
-                predicted_data.values,
-                label=f"Predicted {prediction_year}",
-                marker="o",
-                linestyle="--",
-            )
+    @staticmethod
+    def _bases(monthly_income):
+        """Lay ``monthly_income`` (one row per year, (Month, Description)
+        columns) out as a (descriptions x years x months) tensor and pick the
+        base of each description: its last year, or the year before when the
+        last year is all zeros."""
+        descriptions = list(
+            monthly_income.columns.get_level_values("Description").unique()
+        )
+        months = sorted(
+            monthly_income.columns.get_level_values("Month").unique().tolist()
+        )
+        grid = pd.MultiIndex.from_product(
+            [months, descriptions], names=["Month", "Description"]
+        )
+        n_years = len(monthly_income)
+        # (years, months x descriptions) -> (descriptions, years, months)
+        tensor = (
+            monthly_income.reindex(columns=grid)
+            .to_numpy(dtype=float)
+            .reshape(n_years, len(months), len(descriptions))
+            .transpose(2, 0, 1)
+        )
+        # Months are listed per description in column order, as unstack left
+        # them; months a description never had are left out.
+        positions = (
+            monthly_income.columns.get_indexer(grid)
+            .reshape(len(months), len(descriptions))
+            .T
+        )
+        present = positions >= 0
+        month_order = np.argsort(
+            np.where(present, positions, len(grid)), axis=1, kind="stable"
+        )[:, : len(months)]
+
+        current = tensor[:, -1, :]
+        previous = tensor[:, -2, :] if n_years >= 2 else None
+        base = current
+        if previous is not None:
+            # If current year is all zeros, use previous year as base
+            all_zeros = np.where(present, current == 0, True).all(axis=1)
+            base = np.where(all_zeros[:, None], previous, current)
+        return descriptions, months, month_order, present, current, previous, base
+
+    @staticmethod
+    def _grow(base, present, growth_rates):
+        """(rates x descriptions x months) predictions, rounded to integers."""
+        predicted = base[None] * (1 + np.asarray(growth_rates, dtype=float))[
+            :, None, None
+        ]
+        if not np.isfinite(predicted[:, present]).all():
+            raise ValueError("Cannot convert non-finite values (NA or inf) to integer")
+        return np.round(predicted).astype(int)
+
+    @staticmethod
+    def _forecast(monthly_income, prediction_year, growth_rate):
+        """Forecast every description at once, the growth rate being applied
+        to every base in one operation."""
+        descriptions, months, month_order, present, current, previous, base = (
+            PredGlobaleAgent._bases(monthly_income)
+        )
+        predicted = PredGlobaleAgent._grow(base, present, [growth_rate])[0]
+
+        def by_month(values, i):
+            return {
+                months[m]: values[m] for m in month_order[i] if present[i][m]
+            }
+
+        predicted, current = predicted.tolist(), current.tolist()
+        previous = previous.tolist() if previous is not None else None
+        present, month_order = present.tolist(), month_order.tolist()
+        return {
+            desc: {
+                str(prediction_year): by_month(predicted[i], i),
+                str(prediction_year - 1): by_month(current[i], i),
+                str(prediction_year - 2): (
+                    by_month(previous[i], i) if previous is not None else None
+                ),
+            }
+            for i, desc in enumerate(descriptions)
+        }
+
+    @staticmethod
+    def _sweep(monthly_income, prediction_year, growth_rates):
+        """Per description: its months, the two last years and one row of
+        predictions per growth rate, aligned on the months."""
+        descriptions, months, month_order, present, current, previous, base = (
+            PredGlobaleAgent._bases(monthly_income)
+        )
+        predicted = PredGlobaleAgent._grow(base, present, growth_rates)
+
+        results = {}
+        for i, desc in enumerate(descriptions):
+            order = [m for m in month_order[i] if present[i, m]]
+            results[desc] = {
+                "months": [months[m] for m in order],
+                str(prediction_year - 1): current[i, order].tolist(),
+                str(prediction_year - 2): (
+                    previous[i, order].tolist() if previous is not None else None
+                ),
+                "predictions": predicted[:, i, order].tolist(),
+            }
+        return results
 
-            plt.title(
-                f'Monthly Income Distribution for Enterprise {
-                    result["enterprise_id"]} ({result["enterprise_name"]})\nRevenue Type: {description}'
+    @staticmethod
+    def _fetch_monthly_income(revenues):
+        """Real income summed per (year, month, description) by the database,
+        as a typed frame: Year (nullable Int64, non-numeric years as NA),
+        Month (int64), Description, RealIncome (float64), Records (int64)."""
+        rows = (
+            revenues.values("year", "month", "description")
+            .annotate(
+                income=Cast(Sum("real_income"), FloatField()),
+                records=Count("revenue_id"),
             )
-            plt.xlabel("Month")
-            plt.ylabel("Income")
-            plt.xticks(range(1, 13))
-            plt.legend()
-            plt.grid(True)
-            plt.show()
-
-        print(
-            f"\nNote: These predictions are for the year {
-                result['prediction_year']}, based on historical data"
+            .order_by()
+        )
+        data = pd.DataFrame.from_records(
+            rows.values_list("year", "month", "description", "income", "records"),
+            columns=["Year", "Month", "Description", "RealIncome", "Records"],
         )
-        print(f"and using a growth rate of {result['growth_rate']*100}%")
+        # Years are stored as text; different spellings of the same year are
+        # merged once converted.
+        data["Year"] = pd.to_numeric(data["Year"], errors="coerce").astype("Int64")
+        data["Month"] = data["Month"].astype("int64")
+        data["RealIncome"] = data["RealIncome"].astype("float64")
+        data["Records"] = data["Records"].astype("int64")
+        return data
+
+    @staticmethod
+    def plot_prediction(result, fmt="png"):
+        """Queue the chart of a prediction result for rendering; returns the
+        chart file name, or None for an error result."""
+        if "error" in result:
+            return None
+        return PredictionCharts.submit(result, fmt)
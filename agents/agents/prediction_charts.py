@@ -0,0 +1,212 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from django.conf import settings
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+FORMATS = ("png", "svg")
+
+_executor = None
+_pruned_at = 0.0
+_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionCharts:
+    """Charts of PredGlobaleAgent results, rendered off the request path.
+
+    ``submit`` names the chart after a hash of the result and hands the
+    drawing to a process pool unless the file is already in
+    ``PREDICTION_CHARTS_DIR``; the API only returns the name, and the chart
+    view serves the file once it has been written. While it is rendered, a
+    ``<name>.pending`` marker next to it tells every worker that the chart is
+    on its way; a marker older than ``PREDICTION_CHART_PENDING_TIMEOUT`` is
+    left over from a crashed render and ignored. Charts not requested for
+    ``PREDICTION_CHART_MAX_AGE`` seconds are deleted, as are the least
+    recently requested ones beyond ``PREDICTION_CHART_MAX_FILES``.
+    """
+
+    @staticmethod
+    def submit(result, fmt="png"):
+        """Queue the chart of a prediction result; returns its file name."""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported chart format: {fmt}")
+        PredictionCharts._prune()
+        name = f"{PredictionCharts.key(result)}.{fmt}"
+        path = PredictionCharts.path(name)
+        try:
+            # Requested again: the chart is kept as recently used.
+            os.utime(path)
+            return name
+        except FileNotFoundError:
+            pass
+        if not PredictionCharts._claim(name):
+            return name
+        try:
+            future = PredictionCharts._submit(render, result, str(path), fmt)
+        except Exception:
+            PredictionCharts._marker(name).unlink(missing_ok=True)
+            raise
+        future.add_done_callback(lambda done: PredictionCharts._done(name, done))
+        return name
+
+    @staticmethod
+    def key(result):
+        payload = {
+            field: result[field]
+            for field in (
+                "enterprise_id",
+                "enterprise_name",
+                "prediction_year",
+                "growth_rate",
+                "results",
+            )
+        }
+        return hashlib.sha1(
+            json.dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    @staticmethod
+    def path(name):
+        return Path(settings.PREDICTION_CHARTS_DIR) / name
+
+    @staticmethod
+    def is_pending(name):
+        try:
+            age = time.time() - PredictionCharts._marker(name).stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return age < settings.PREDICTION_CHART_PENDING_TIMEOUT
+
+    @staticmethod
+    def _marker(name):
+        return PredictionCharts.path(f"{name}.pending")
+
+    @staticmethod
+    def _claim(name):
+        """Create the pending marker of a chart; False when another render of
+        it is under way, in this worker or another."""
+        os.makedirs(settings.PREDICTION_CHARTS_DIR, exist_ok=True)
+        marker = PredictionCharts._marker(name)
+        if not PredictionCharts.is_pending(name):
+            marker.unlink(missing_ok=True)
+        try:
+            os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+        return True
+
+    @staticmethod
+    def _prune():
+        """Delete expired charts, the oldest ones beyond the maximum count,
+        and the markers and partial files of crashed renders. Runs at most
+        once every ``PREDICTION_CHART_PRUNE_INTERVAL`` seconds per process."""
+        global _pruned_at
+        now = time.time()
+        with _lock:
+            if now - _pruned_at < settings.PREDICTION_CHART_PRUNE_INTERVAL:
+                return
+            _pruned_at = now
+
+        try:
+            entries = list(os.scandir(settings.PREDICTION_CHARTS_DIR))
+        except FileNotFoundError:
+            return
+        charts = []
+        for entry in entries:
+            try:
+                age = now - entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith((".pending", ".part")):
+                expired = age > settings.PREDICTION_CHART_PENDING_TIMEOUT
+            elif entry.name.rpartition(".")[2] in FORMATS:
+                expired = age > settings.PREDICTION_CHART_MAX_AGE
+                if not expired:
+                    charts.append((age, entry.path))
+            else:
+                continue
+            if expired:
+                Path(entry.path).unlink(missing_ok=True)
+
+        charts.sort()
+        for _, path in charts[settings.PREDICTION_CHART_MAX_FILES :]:
+            Path(path).unlink(missing_ok=True)
+
+    @staticmethod
+    def _done(name, future):
+        PredictionCharts._marker(name).unlink(missing_ok=True)
+        if future.exception() is not None:
+            logger.error(f"Rendering chart {name} failed: {future.exception()}")
+
+    @staticmethod
+    def _submit(*args):
+        global _executor
+        with _lock:
+            for attempt in range(2):
+                if _executor is None:
+                    _executor = ProcessPoolExecutor(settings.PREDICTION_CHART_WORKERS)
+                try:
+                    return _executor.submit(*args)
+                except BrokenProcessPool:
+                    # A worker died; start a fresh pool once.
+                    _executor = None
+                    if attempt:
+                        raise
+
+
+def render(result, path, fmt):
+    """Draw one panel per description with the Agg canvas (no pyplot state,
+    nothing left open) and write the file atomically."""
+    prediction_year = result["prediction_year"]
+    descriptions = list(result["results"].items())
+    figure = Figure(figsize=(14, 7 * max(len(descriptions), 1)))
+    FigureCanvasAgg(figure)
+
+    for index, (description, data) in enumerate(descriptions):
+        axes = figure.add_subplot(len(descriptions), 1, index + 1)
+        for year, label, style in (
+            (prediction_year - 2, f"{prediction_year - 2}", "-"),
+            (prediction_year - 1, f"{prediction_year - 1}", "-"),
+            (prediction_year, f"Predicted {prediction_year}", "--"),
+        ):
+            values = data.get(str(year))
+            if values:
+                months = sorted(values, key=int)
+                axes.plot(
+                    [int(month) for month in months],
+                    [values[month] for month in months],
+                    label=label,
+                    marker="o",
+                    linestyle=style,
+                )
+        axes.set_title(
+            "Monthly Income Distribution for Enterprise {} ({})\n"
+            "Revenue Type: {}".format(
+                result["enterprise_id"], result["enterprise_name"], description
+            )
+        )
+        axes.set_xlabel("Month")
+        axes.set_ylabel("Income")
+        axes.set_xticks(range(1, 13))
+        axes.legend()
+        axes.grid(True)
+
+    figure.suptitle(
+        "Predictions for {} based on historical data, growth rate {}%".format(
+            prediction_year, result["growth_rate"] * 100
+        )
+    )
+    figure.tight_layout()
+    partial = f"{path}.{os.getpid()}.part"
+    figure.savefig(partial, format=fmt)
+    os.replace(partial, path)
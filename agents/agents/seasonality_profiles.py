@@ -0,0 +1,173 @@
+import hashlib
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from django.core.cache import caches
+from django.db import transaction
+from statsmodels.tsa.seasonal import seasonal_decompose
+
+from agents.models import DataVersion, IndustryBenchmark, PCAModel, SeasonalityProfile
+from financial_data.models import EnterpriseIndustryView
+
+_MISSING = object()
+
+
+class SeasonalityProfiles:
+    """Seasonal index per industry and description.
+
+    ``refresh`` decomposes the concatenated multi-year series of industry
+    monthly means stored in ``IndustryBenchmark`` and persists the result;
+    ``get`` only reads it, through the agents cache, so statsmodels never runs
+    on the request path.
+    """
+
+    @staticmethod
+    def get(industry_type_id, description):
+        cache_key = "seasonality_{}_{}_v{}".format(
+            industry_type_id,
+            hashlib.md5(description.encode()).hexdigest(),
+            DataVersion.current(DataVersion.INDUSTRY, industry_type_id),
+        )
+        profile = caches["agents"].get(cache_key, _MISSING)
+        if profile is _MISSING:
+            profile = (
+                SeasonalityProfile.objects.filter(
+                    industry_type_id=industry_type_id, description=description
+                )
+                .values(
+                    "first_year",
+                    "last_year",
+                    "n_observations",
+                    "seasonal_index",
+                    "seasonal_factors",
+                )
+                .first()
+            )
+            caches["agents"].set(cache_key, profile)
+        return profile
+
+    @staticmethod
+    def monthly_factors(enterprise_id, descriptions):
+        """Seasonal factors by month (1-12) of the enterprise's industry for
+        each description, or None where the industry has no profile."""
+        industry_type_id = (
+            EnterpriseIndustryView.objects.filter(enterprise_id=enterprise_id)
+            .values_list("industry_type_id", flat=True)
+            .first()
+        )
+        factors = {}
+        for description in descriptions:
+            profile = (
+                SeasonalityProfiles.get(industry_type_id, description)
+                if industry_type_id is not None
+                else None
+            )
+            factors[description] = (
+                dict(zip(range(1, 13), profile["seasonal_factors"]))
+                if profile
+                else None
+            )
+        return factors
+
+    @staticmethod
+    def refresh(industry_type_id=None, descriptions=None, bump=True):
+        """Rebuild the profiles of one industry (optionally restricted to some
+        descriptions), or of every industry. Returns the number written.
+
+        The versions of the refreshed industries are bumped so that ``get``
+        stops serving the cached profiles; callers that bump them themselves
+        pass ``bump=False``."""
+        benchmarks = IndustryBenchmark.objects.all()
+        if industry_type_id is not None:
+            benchmarks = benchmarks.filter(industry_type_id=industry_type_id)
+        if descriptions is not None:
+            benchmarks = benchmarks.filter(description__in=descriptions)
+
+        series = defaultdict(list)
+        for row in benchmarks.values(
+            "industry_type_id", "description", "year", "month", "real_mean"
+        ):
+            series[(row["industry_type_id"], row["description"])].append(row)
+
+        profiles = []
+        for (industry, description), rows in series.items():
+            profile = SeasonalityProfiles._decompose(rows)
+            if profile is not None:
+                profiles.append(
+                    SeasonalityProfile(
+                        industry_type_id=industry, description=description, **profile
+                    )
+                )
+
+        with transaction.atomic():
+            stale = SeasonalityProfile.objects.all()
+            if industry_type_id is not None:
+                stale = stale.filter(industry_type_id=industry_type_id)
+            if descriptions is not None:
+                stale = stale.filter(description__in=descriptions)
+            industries = set(stale.values_list("industry_type_id", flat=True))
+            stale.delete()
+            SeasonalityProfile.objects.bulk_create(profiles)
+
+        industries |= {industry for industry, _ in series}
+        if industry_type_id is not None:
+            industries.add(industry_type_id)
+        if bump:
+            SeasonalityProfiles._bump(industries)
+        return len(profiles)
+
+    @staticmethod
+    def _bump(industry_type_ids):
+        # The industry data did not change: the benchmarks and PCA models
+        # current before the bump are moved along with it (a concurrent write
+        # still leaves them behind).
+        versions = DataVersion.current_many(DataVersion.INDUSTRY, industry_type_ids)
+        DataVersion.bump(DataVersion.INDUSTRY, industry_type_ids)
+        for industry_type_id, version in versions.items():
+            for model in (IndustryBenchmark, PCAModel):
+                model.objects.filter(
+                    industry_type_id=industry_type_id, data_version=version
+                ).update(data_version=version + 1)
+
+    @staticmethod
+    def _decompose(rows):
+        current_year = datetime.now().year
+        values = {
+            (row["year"], row["month"]): row["real_mean"]
+            for row in rows
+            if row["year"] <= current_year
+            and 1 <= row["month"] <= 12
+            and row["real_mean"] is not None
+        }
+        if len(values) < 24:
+            return None
+
+        years = sorted({year for year, _ in values})
+        first_year, last_year = years[0], years[-1]
+        # A contiguous monthly series starting in January, so that the first
+        # twelve seasonal values are the index of January..December. Gaps are
+        # interpolated.
+        index = pd.MultiIndex.from_product(
+            [range(first_year, last_year + 1), range(1, 13)]
+        )
+        monthly = (
+            pd.Series(values, dtype=float)
+            .reindex(index)
+            .interpolate(limit_direction="both")
+            .to_numpy()
+        )
+        level = monthly.mean()
+        if not np.isfinite(level) or level == 0:
+            return None
+
+        decomposition = seasonal_decompose(monthly, model="additive", period=12)
+        seasonal_index = decomposition.seasonal[:12]
+        return {
+            "first_year": first_year,
+            "last_year": last_year,
+            "n_observations": len(values),
+            "seasonal_index": seasonal_index.tolist(),
+            "seasonal_factors": (1 + seasonal_index / level).tolist(),
+        }
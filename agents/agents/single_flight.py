@@ -0,0 +1,77 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.core.cache import caches
+
+_flights = {}
+_lock = threading.Lock()
+
+
+class SingleFlight:
+    """Coalescing of identical concurrent calls.
+
+    ``run(key, func)`` calls ``func`` once for all the callers that ask for
+    the same key at the same time, and hands every one of them its result (or
+    its exception). Threads of a process wait on the leader's future. Across
+    workers, the leader holds a lock taken with ``add`` on the "shared"
+    cache; the leaders of other workers poll that cache for the result it
+    publishes, and take over if the lock is released without one (the call
+    failed) or expires after ``SINGLE_FLIGHT_LOCK_TIMEOUT``.
+    """
+
+    @staticmethod
+    def run(key, func):
+        digest = hashlib.sha1(json.dumps(key, default=str).encode()).hexdigest()
+        with _lock:
+            future = _flights.get(digest)
+            leader = future is None
+            if leader:
+                future = _flights[digest] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            result = SingleFlight._across_workers(digest, func)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with _lock:
+                del _flights[digest]
+
+    @staticmethod
+    def _across_workers(digest, func):
+        lock_key = f"single_flight_lock_{digest}"
+        result_key = f"single_flight_result_{digest}"
+        cache = caches["shared"]
+        while True:
+            token = uuid.uuid4().hex
+            if cache.add(lock_key, token, settings.SINGLE_FLIGHT_LOCK_TIMEOUT):
+                try:
+                    cache.delete(result_key)
+                    result = func()
+                    # Wrapped, so that a None result is told from a miss.
+                    cache.set(
+                        result_key, (result,), settings.SINGLE_FLIGHT_RESULT_TIMEOUT
+                    )
+                    return result
+                finally:
+                    if cache.get(lock_key) == token:
+                        cache.delete(lock_key)
+
+            while cache.get(lock_key) is not None:
+                published = cache.get(result_key)
+                if published is not None:
+                    return published[0]
+                time.sleep(settings.SINGLE_FLIGHT_POLL_INTERVAL)
+            published = cache.get(result_key)
+            if published is not None:
+                return published[0]
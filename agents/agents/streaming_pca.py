@@ -0,0 +1,133 @@
+import numpy as np
+from sklearn.decomposition import IncrementalPCA
+from sklearn.preprocessing import StandardScaler
+
+from agents.models import DataVersion, PCAModel
+from financial_data.models import EnterpriseIndustryView, RevenuesView
+
+
+class StreamingPCA:
+    """PCA of an industry's monthly revenue profiles that never holds the
+    whole peer group in memory.
+
+    Every (enterprise, description, year) with twelve months of real income is
+    one sample of twelve features. Samples are streamed from the database in
+    chunks and fed to ``StandardScaler.partial_fit`` on a first pass and to
+    ``IncrementalPCA.partial_fit`` on a second one, so memory is bounded by
+    ``batch_size`` rows. The fitted scaler and components are persisted in
+    ``PCAModel``; later requests only run ``transform``.
+    """
+
+    N_COMPONENTS = 1
+
+    @staticmethod
+    def load(industry_type_id, description):
+        """Return the persisted model fitted on the current industry data,
+        preferring a description-specific one over the all-descriptions one."""
+        version = DataVersion.current(DataVersion.INDUSTRY, industry_type_id)
+        models = {
+            model.description: model
+            for model in PCAModel.objects.filter(
+                industry_type_id=industry_type_id,
+                description__in=[description, ""],
+                data_version=version,
+            )
+        }
+        return models.get(description) or models.get("")
+
+    @staticmethod
+    def fit(industry_type_id, description=None, chunk_size=2000, batch_size=500):
+        """Fit and persist the model of an industry, on one description or on
+        every description when ``description`` is None. Returns the
+        ``PCAModel``, or None when there are fewer samples than needed."""
+        version = DataVersion.current(DataVersion.INDUSTRY, industry_type_id)
+
+        scaler = StandardScaler()
+        n_samples = 0
+        for batch in StreamingPCA._batches(
+            industry_type_id, description, chunk_size, batch_size
+        ):
+            scaler.partial_fit(batch)
+            n_samples += len(batch)
+        if n_samples < 12:
+            return None
+
+        # Keeping all twelve components makes the incremental SVD exact; only
+        # the leading ones are persisted. Each partial_fit needs at least
+        # twelve samples, so a short batch is merged into the pending one.
+        pca = IncrementalPCA(n_components=12)
+        pending = None
+        for batch in StreamingPCA._batches(
+            industry_type_id, description, chunk_size, max(batch_size, 12)
+        ):
+            if pending is not None:
+                if len(batch) < 12:
+                    pending = np.vstack([pending, batch])
+                    continue
+                pca.partial_fit(scaler.transform(pending))
+            pending = batch
+        pca.partial_fit(scaler.transform(pending))
+
+        model, _ = PCAModel.objects.update_or_create(
+            industry_type_id=industry_type_id,
+            description=description or "",
+            defaults={
+                "data_version": version,
+                "n_samples": n_samples,
+                "scaler_mean": scaler.mean_.tolist(),
+                "scaler_scale": scaler.scale_.tolist(),
+                "pca_mean": pca.mean_.tolist(),
+                "components": pca.components_[: StreamingPCA.N_COMPONENTS].tolist(),
+                "explained_variance_ratio": pca.explained_variance_ratio_[
+                    : StreamingPCA.N_COMPONENTS
+                ].tolist(),
+            },
+        )
+        return model
+
+    @staticmethod
+    def transform(model, data_matrix):
+        """Project (n, 12) monthly rows on the persisted components."""
+        data_matrix = np.asarray(data_matrix, dtype=float)
+        normalized = (data_matrix - np.asarray(model.scaler_mean)) / np.asarray(
+            model.scaler_scale
+        )
+        return (normalized - np.asarray(model.pca_mean)) @ np.asarray(
+            model.components
+        ).T
+
+    @staticmethod
+    def _batches(industry_type_id, description, chunk_size, batch_size):
+        """Yield (<= batch_size, 12) arrays of complete enterprise-years."""
+        revenues = RevenuesView.objects.filter(
+            enterprise_id__in=EnterpriseIndustryView.objects.filter(
+                industry_type_id=industry_type_id, enterprise_active=True
+            ).values("enterprise_id")
+        )
+        if description is not None:
+            revenues = revenues.filter(description=description)
+        rows = (
+            revenues.order_by("enterprise_id", "description", "year", "month")
+            .values_list("enterprise_id", "description", "year", "month", "real_income")
+            .iterator(chunk_size=chunk_size)
+        )
+
+        batch = []
+        current_key, current = None, None
+        for enterprise_id, row_description, year, month, real_income in rows:
+            key = (enterprise_id, row_description, year)
+            if key != current_key:
+                if current is not None and not np.isnan(current).any():
+                    batch.append(current)
+                    if len(batch) == batch_size:
+                        yield np.array(batch)
+                        batch = []
+                current_key, current = key, np.full(12, np.nan)
+            if 1 <= month <= 12 and real_income is not None:
+                current[month - 1] = np.nan_to_num(current[month - 1]) + float(
+                    real_income
+                )
+        if current is not None and not np.isnan(current).any():
+            batch.append(current)
+        if batch:
+            yield np.array(batch)
@@ -1,51 +1,125 @@
+import numpy as np
 import pandas as pd
-from decimal import Decimal, getcontext
+from decimal import Decimal
+from django.db.models import FloatField, Sum
+from django.db.models.functions import Cast
 from financial_data.models import RevenuesView
 from datetime import datetime
 
-# Set the precision for Decimal calculations
-getcontext().prec = 10
+from .seasonality_profiles import SeasonalityProfiles
+
+
+def _cents(values):
+    """Round money amounts to integer cents, half to even like Decimal; float
+    noise is rounded away first so that exact half cents stay ties."""
+    cents = np.round(np.asarray(values, dtype=float) * 100, 6)
+    return np.round(cents).astype(np.int64)
+
+
+def _decimal(cents):
+    return Decimal(int(cents)).scaleb(-2)
 
 
 class UnitBasedRevenuePrediction:
-    def __init__(self, enterprise_id, description, growth_rate=0.05):
+    """Next-year and multi-year revenue of one enterprise's revenue line from
+    the sold units and unit prices of its most recent year with sales.
+
+    Amounts are float64 arrays throughout; predictions for every month and
+    every horizon year are computed at once by broadcasting the base year over
+    the growth factors. They are rounded to cents only when serialized.
+
+    The monthly data is fetched and processed once per instance; every
+    prediction method reuses it.
+    """
+
+    def __init__(
+        self, enterprise_id, description, growth_rate=0.05, monthly_data=None
+    ):
         self.enterprise_id = enterprise_id
         self.description = description
-        self.growth_rate = Decimal(str(growth_rate))
+        self.growth_rate = float(growth_rate)
         self.current_year = datetime.now().year
         self.next_year = self.current_year + 1
+        self._monthly_data = monthly_data
+
+    @staticmethod
+    def predict_all(enterprise_id, growth_rate=0.05):
+        """Yield the ``get_prediction_data`` result of every description of
+        the enterprise, in description order. One query grouped by
+        (description, year, month) feeds a single prediction over all the
+        descriptions."""
+        current_year = datetime.now().year
+        monthly_data = UnitBasedRevenuePrediction._with_unit_price(
+            UnitBasedRevenuePrediction._monthly_frame(
+                RevenuesView.objects.filter(
+                    enterprise_id=enterprise_id,
+                    description__isnull=False,
+                    year__lte=current_year,
+                ),
+                "description",
+            )
+        )
+        codes, descriptions = pd.factorize(monthly_data["description"], sort=True)
+        next_year = current_year + 1
+        units, income, price = UnitBasedRevenuePrediction._predict_lines(
+            monthly_data, codes, len(descriptions), [next_year], float(growth_rate)
+        )
+        rows = monthly_data.drop(columns="description")
+        for line, indices in sorted(rows.groupby(codes).indices.items()):
+            agent = UnitBasedRevenuePrediction(
+                enterprise_id,
+                descriptions[line],
+                growth_rate,
+                monthly_data=rows.iloc[indices].reset_index(drop=True),
+            )
+            yield agent._prediction_data(
+                agent._prediction_records(
+                    [next_year], units[line], income[line], price[line]
+                )
+            )
 
     def fetch_data(self):
-        data = (
+        """Sold units and real income per (year, month), summed by the
+        database."""
+        return self._monthly_frame(
             RevenuesView.objects.filter(
                 enterprise_id=self.enterprise_id,
                 description=self.description,
                 year__lte=self.current_year,
             )
-            .values("year", "month", "real_sold_units", "real_income")
-            .order_by("year", "month")
         )
-        return pd.DataFrame(data)
+
+    @staticmethod
+    def _monthly_frame(revenues, *group_by):
+        rows = (
+            revenues.values(*group_by, "year", "month")
+            .annotate(
+                units=Cast(Sum("real_sold_units"), FloatField()),
+                income=Cast(Sum("real_income"), FloatField()),
+            )
+            .order_by(*group_by, "year", "month")
+            .values_list(*group_by, "year", "month", "units", "income")
+        )
+        return pd.DataFrame.from_records(
+            rows,
+            columns=[*group_by, "year", "month", "real_sold_units", "real_income"],
+        ).astype(
+            {"month": "int64", "real_sold_units": "float64", "real_income": "float64"}
+        )
 
     def process_data(self):
-        df = self.fetch_data()
-        monthly_data = (
-            df.groupby(["year", "month"])
-            .agg({"real_sold_units": "sum", "real_income": "sum"})
-            .reset_index()
-        )
-        monthly_data["unit_price"] = monthly_data.apply(
-            lambda row: (
-                Decimal(str(row["real_income"])) /
-                Decimal(str(row["real_sold_units"]))
-                if row["real_sold_units"] > 0
-                else (
-                    Decimal(str(row["real_income"]))
-                    if row["real_income"] > 0
-                    else Decimal("0")
-                )
-            ),
-            axis=1,
+        if self._monthly_data is None:
+            self._monthly_data = self._with_unit_price(self.fetch_data())
+        return self._monthly_data
+
+    @staticmethod
+    def _with_unit_price(monthly_data):
+        units = monthly_data["real_sold_units"].to_numpy()
+        income = monthly_data["real_income"].to_numpy()
+        # Income per unit sold; months without units keep their (positive)
+        # income as price.
+        monthly_data["unit_price"] = np.divide(
+            income, units, out=np.where(income > 0, income, 0.0), where=units > 0
         )
         return monthly_data
 
@@ -58,172 +132,220 @@ class UnitBasedRevenuePrediction:
 
     def predict_next_year_revenue(self):
         monthly_data = self.process_data()
-        base_year = self.find_most_recent_year_with_data(monthly_data)
-
-        predicted_data = []
-
-        if base_year is not None:
-            base_year_data = monthly_data[monthly_data["year"] == base_year]
-            for _, row in base_year_data.iterrows():
-                if row["real_sold_units"] > 0:
-                    predicted_units = int(
-                        Decimal(str(row["real_sold_units"]))
-                        * (Decimal("1") + self.growth_rate)
-                    )
-                    predicted_income = Decimal(
-                        str(predicted_units)) * row["unit_price"]
-                elif row["real_income"] > 0:
-                    predicted_units = 0
-                    predicted_income = Decimal(str(row["real_income"])) * (
-                        Decimal("1") + self.growth_rate
-                    )
-                else:
-                    predicted_units = 0
-                    predicted_income = Decimal("0")
-
-                predicted_data.append(
-                    {
-                        "year": self.next_year,
-                        "month": row["month"],
-                        "predicted_units": predicted_units,
-                        "predicted_income": round(predicted_income, 2),
-                        "predicted_unit_price": round(row["unit_price"], 2),
-                    }
-                )
+        return self._prediction_records(
+            [self.next_year], *self._predict(monthly_data, [self.next_year])
+        )
 
-        # If we have no data or incomplete data, fill in the missing months with zeros
-        existing_months = set(item["month"] for item in predicted_data)
-        for month in range(1, 13):
-            if month not in existing_months:
-                predicted_data.append(
-                    {
-                        "year": self.next_year,
-                        "month": month,
-                        "predicted_units": 0,
-                        "predicted_income": Decimal("0"),
-                        "predicted_unit_price": Decimal("0"),
-                    }
-                )
+    def predict_revenue_for_years(self, years):
+        monthly_data = self.process_data()
+        horizon = list(range(self.next_year, self.next_year + years))
+        return self._prediction_records(
+            horizon, *self._predict(monthly_data, horizon, compound=True)
+        )
 
-        # Sort the predictions by month
-        predicted_data.sort(key=lambda x: x["month"])
+    def _predict(self, monthly_data, years, compound=False):
+        units, income, price = self._predict_lines(
+            monthly_data,
+            np.zeros(len(monthly_data), dtype=np.int64),
+            1,
+            years,
+            self.growth_rate,
+            compound,
+        )
+        return units[0], income[0], price[0]
 
-        return predicted_data
+    @staticmethod
+    def _predict_lines(
+        monthly_data, lines, n_lines, years, growth_rate, compound=False
+    ):
+        """Predicted units, income and unit price as (lines, years, 12)
+        arrays, ``lines`` giving the revenue line of each row.
 
-    def predict_revenue_for_years(self, years):
+        The base of a line is its most recent year with units sold. Months of
+        the base year with units sold keep their unit price and grow their
+        units; months with only income grow their income. The growth is
+        compounded from the base year when ``compound`` is set, and applied
+        once otherwise. ``growth_rate`` may also hold one rate per entry of
+        ``years``. Months without base data are zero.
+        """
+        shape = (n_lines, len(years), 12)
+        units, income, price = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+
+        sold_units = monthly_data["real_sold_units"].groupby(
+            [lines, monthly_data["year"]]
+        ).sum()
+        sold_units = sold_units[sold_units > 0]
+        base_years = (
+            sold_units.index.to_frame(index=False, name=["line", "year"])
+            .groupby("line")["year"]
+            .max()
+        )
+        line_base_year = np.asarray(
+            base_years.reindex(range(n_lines)).to_numpy(), dtype=object
+        )
+
+        base = (
+            (monthly_data["year"].to_numpy(dtype=object) == line_base_year[lines])
+            & monthly_data["month"].between(1, 12).to_numpy()
+        )
+        if base.any():
+            rows = monthly_data[base]
+            base_lines = lines[base]
+            months = rows["month"].to_numpy() - 1
+            base_units = rows["real_sold_units"].to_numpy()[:, None]
+            base_income = rows["real_income"].to_numpy()[:, None]
+            base_price = rows["unit_price"].to_numpy()[:, None]
+
+            exponent = (
+                np.asarray(years)[None, :]
+                - rows["year"].astype(int).to_numpy()[:, None]
+                if compound
+                else np.ones((1, len(years)))
+            )
+            growth = (1 + growth_rate) ** exponent
+            sold = base_units > 0
+            # Rounding away float noise first keeps e.g. 20 * 1.15 at 23 units.
+            predicted_units = np.where(
+                sold, np.trunc(np.round(base_units * growth, 9)), 0.0
+            )
+            units[base_lines, :, months] = predicted_units
+            income[base_lines, :, months] = np.where(
+                sold,
+                predicted_units * base_price,
+                np.where(base_income > 0, base_income * growth, 0.0),
+            )
+            price[base_lines, :, months] = np.broadcast_to(
+                base_price, predicted_units.shape
+            )
+        return units.astype(np.int64), income, price
+
+    @staticmethod
+    def _prediction_records(years, units, income, price):
+        income, price = _cents(income).tolist(), _cents(price).tolist()
+        units = units.tolist()
+        return [
+            {
+                "year": year,
+                "month": month + 1,
+                "predicted_units": units[i][month],
+                "predicted_income": _decimal(income[i][month]),
+                "predicted_unit_price": _decimal(price[i][month]),
+            }
+            for i, year in enumerate(years)
+            for month in range(12)
+        ]
+
+    def sweep(self, growth_rates):
+        """Next-year predictions for several growth rates from one fetch, as
+        (rates x months) grids; the rates are broadcast over the base year."""
+        rates = np.asarray(growth_rates, dtype=float)
+        if not len(rates):
+            raise ValueError("At least one growth rate is required")
         monthly_data = self.process_data()
-        base_year = self.find_most_recent_year_with_data(monthly_data)
-        all_predictions = []
-
-        for year in range(self.next_year, self.next_year + years):
-            year_predictions = []
-            if base_year is not None:
-                base_year_data = monthly_data[monthly_data["year"]
-                                              == base_year]
-
-                # growth factor
-                year_growth = (Decimal("1") + self.growth_rate) ** Decimal(
-                    str(year - base_year)
-                )
-                for _, row in base_year_data.iterrows():
-                    if row["real_sold_units"] > 0:
-                        predicted_units = int(
-                            Decimal(str(row["real_sold_units"])) * year_growth
-                        )
-                        predicted_income = (
-                            Decimal(str(predicted_units)) * row["unit_price"]
-                        )
-                    elif row["real_income"] > 0:
-                        predicted_units = 0
-                        predicted_income = (
-                            Decimal(str(row["real_income"])) * year_growth
-                        )
-                    else:
-                        predicted_units = 0
-                        predicted_income = Decimal("0")
-
-                    year_predictions.append(
-                        {
-                            "year": year,
-                            "month": row["month"],
-                            "predicted_units": predicted_units,
-                            "predicted_income": round(predicted_income, 2),
-                            "predicted_unit_price": round(row["unit_price"], 2),
-                        }
-                    )
-
-            # Fill in any missing months with zeros
-            existing_months = set(item["month"] for item in year_predictions)
-            for month in range(1, 13):
-                if month not in existing_months:
-                    year_predictions.append(
-                        {
-                            "year": year,
-                            "month": month,
-                            "predicted_units": 0,
-                            "predicted_income": Decimal("0"),
-                            "predicted_unit_price": Decimal("0"),
-                        }
-                    )
-
-            # Sort the predictions by month and add to all_predictions
-            year_predictions.sort(key=lambda x: x["month"])
-            all_predictions.extend(year_predictions)
-
-        return all_predictions
+        units, income, price = self._predict_lines(
+            monthly_data,
+            np.zeros(len(monthly_data), dtype=np.int64),
+            1,
+            [self.next_year] * len(rates),
+            rates,
+        )
+        units, income = units[0], _cents(income[0])
+        return {
+            "enterprise_id": self.enterprise_id,
+            "description": self.description,
+            "next_year": self.next_year,
+            "growth_rates": rates.tolist(),
+            "months": list(range(1, 13)),
+            "predicted_units": units.tolist(),
+            "predicted_income": [
+                [_decimal(cents) for cents in row] for row in income.tolist()
+            ],
+            # Unit prices do not depend on the growth rate.
+            "predicted_unit_price": [
+                _decimal(cents) for cents in _cents(price[0, 0]).tolist()
+            ],
+            "total_predicted_units": units.sum(axis=1).tolist(),
+            "total_predicted_income": [
+                _decimal(cents) for cents in income.sum(axis=1).tolist()
+            ],
+        }
 
     def get_summary(self, years=5):
-        predictions = self.predict_revenue_for_years(years)
-        df = pd.DataFrame(predictions)
-        yearly_summary = (
-            df.groupby("year")
-            .agg(
-                {
-                    "predicted_units": "sum",
-                    "predicted_income": "sum",
-                    "predicted_unit_price": "mean",
-                }
-            )
-            .reset_index()
+        monthly_data = self.process_data()
+        horizon = list(range(self.next_year, self.next_year + years))
+        units, income, price = self._predict(monthly_data, horizon, compound=True)
+
+        yearly_units = units.sum(axis=1).tolist()
+        yearly_income = _cents(income).sum(axis=1)
+        yearly_price = _cents(price).mean(axis=1)
+        previous = np.concatenate([[0], yearly_income[:-1]])
+        growth = np.divide(
+            yearly_income - previous,
+            previous,
+            out=np.full(len(horizon), np.nan),
+            where=previous != 0,
         )
-        yearly_summary["year_over_year_growth"] = yearly_summary[
-            "predicted_income"
-        ].pct_change()
-        return yearly_summary.to_dict(orient="records")
+        growth[0] = np.nan
+        return [
+            {
+                "year": year,
+                "predicted_units": yearly_units[i],
+                "predicted_income": _decimal(yearly_income[i]),
+                "predicted_unit_price": _decimal(np.round(yearly_price[i])),
+                "year_over_year_growth": (
+                    None if np.isnan(growth[i]) else float(growth[i])
+                ),
+            }
+            for i, year in enumerate(horizon)
+        ]
+
+    def get_seasonality(self):
+        """Precomputed seasonal factors by month of the enterprise's industry
+        for this description, or None."""
+        return SeasonalityProfiles.monthly_factors(
+            self.enterprise_id, [self.description]
+        )[self.description]
 
     def get_prediction_data(self):
+        return self._prediction_data(self.predict_next_year_revenue())
+
+    def _prediction_data(self, next_year_prediction):
         monthly_data = self.process_data()
-        historical_data = monthly_data.to_dict(orient="records")
-        next_year_prediction = self.predict_next_year_revenue()
 
         total_predicted_units = sum(
             item["predicted_units"] for item in next_year_prediction
         )
         total_predicted_income = sum(
-            Decimal(str(item["predicted_income"])) for item in next_year_prediction
+            item["predicted_income"] for item in next_year_prediction
+        )
+        avg_predicted_unit_price = (
+            round(total_predicted_income / total_predicted_units, 2)
+            if total_predicted_units > 0
+            else _decimal(0)
         )
 
-        if total_predicted_units > 0:
-            avg_predicted_unit_price = total_predicted_income / Decimal(
-                str(total_predicted_units)
-            )
-        else:
-            avg_predicted_unit_price = Decimal("0")
-
-        for item in historical_data:
-            item["real_income"] = round(Decimal(str(item["real_income"])), 2)
-            item["unit_price"] = round(Decimal(str(item["unit_price"])), 2)
+        historical_data = monthly_data.assign(
+            real_income=list(map(_decimal, _cents(monthly_data["real_income"]))),
+            unit_price=list(map(_decimal, _cents(monthly_data["unit_price"]))),
+        ).to_dict(orient="records")
 
         return {
             "enterprise_id": self.enterprise_id,
             "description": self.description,
-            "growth_rate": float(self.growth_rate),
+            "growth_rate": self.growth_rate,
             "next_year": self.next_year,
             "historical_data": historical_data,
             "next_year_prediction": next_year_prediction,
             "prediction_summary": {
                 "total_predicted_units": total_predicted_units,
-                "total_predicted_income": round(total_predicted_income, 2),
-                "average_predicted_unit_price": round(avg_predicted_unit_price, 2),
+                "total_predicted_income": total_predicted_income,
+                "average_predicted_unit_price": avg_predicted_unit_price,
             },
         }
+
+    def get_report(self, years=5):
+        """History, next-year prediction and the multi-year summary, from a
+        single fetch."""
+        report = self.get_prediction_data()
+        report["summary"] = self.get_summary(years)
+        return report
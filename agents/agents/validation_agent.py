@@ -1,13 +1,21 @@
-from django.db.models import Count, Avg, Sum, F, ExpressionWrapper, fields, StdDev
-from financial_data.models import (
-    RevenuesView,
-    SalesBudgetsView,
-    OrderBookView,
-    OpportunityBookView,
-    EnterpriseIndustryView,
-)
+import django
+from concurrent.futures import ProcessPoolExecutor
+from financial_data.models import EnterpriseIndustryView
 from datetime import datetime
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal
+from .enterprise_data_profile import EnterpriseDataProfile
+
+
+def json_safe(value):
+    """Decimals from the database as floats, the way the API renders them, so
+    that results can be stored in JSON fields and streamed as JSON lines."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    return value
 
 
 class ValidationAgent:
@@ -18,93 +26,159 @@ class ValidationAgent:
         if not EnterpriseIndustryView.objects.filter(
             enterprise_id=enterprise_id
         ).exists():
-            return {
-                "error": f"Enterprise with ID {enterprise_id} does not exist.",
-                "enterprise_id": enterprise_id,
-                "validations": {},
-                "data_quality": {},
-                "overall_validation": False,
-                "recommendations": [
-                    "Enterprise does not exist. Please check the enterprise ID."
-                ],
-            }
+            return ValidationAgent._missing_enterprise(enterprise_id)
 
-        result = {
+        five_years_ago = datetime.now().year - 5
+
+        # One grouped query per source view; every check below is derived
+        # from the profile in memory.
+        return ValidationAgent.validate(
+            EnterpriseDataProfile(enterprise_id, five_years_ago)
+        )
+
+    @staticmethod
+    def execute_batch(
+        enterprise_ids=None, industry_type_id=None, processes=None, chunk_size=500
+    ):
+        """Validate many enterprises (all of them by default) and yield one
+        result per enterprise: known enterprises in id order, then an error
+        result for each requested id outside ``industry_type_id``, then one
+        for each requested id that does not exist. Repeated ids are validated
+        once.
+
+        Profiles are read ``chunk_size`` enterprises at a time with one query
+        per source view grouped by enterprise. With ``processes`` > 1 the
+        scoring of each chunk is spread over a process pool.
+        """
+        enterprises = EnterpriseIndustryView.objects.all()
+        if enterprise_ids is not None:
+            enterprises = enterprises.filter(enterprise_id__in=enterprise_ids)
+        elif industry_type_id is not None:
+            enterprises = enterprises.filter(industry_type_id=industry_type_id)
+        industries = dict(
+            enterprises.values_list("enterprise_id", "industry_type_id")
+        )
+        existing = sorted(
+            enterprise_id
+            for enterprise_id, industry in industries.items()
+            if industry_type_id is None or industry == industry_type_id
+        )
+        elsewhere = sorted(set(industries) - set(existing))
+        missing = sorted(set(enterprise_ids or []) - set(industries))
+
+        five_years_ago = datetime.now().year - 5
+        pool = (
+            ProcessPoolExecutor(processes, initializer=django.setup)
+            if processes and processes > 1
+            else None
+        )
+        try:
+            for start in range(0, len(existing), chunk_size):
+                profiles = EnterpriseDataProfile.for_enterprises(
+                    existing[start : start + chunk_size], five_years_ago
+                )
+                if pool is None:
+                    yield from map(ValidationAgent.validate, profiles)
+                else:
+                    yield from pool.map(
+                        ValidationAgent.validate,
+                        profiles,
+                        chunksize=max(1, len(profiles) // (processes * 4)),
+                    )
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        for enterprise_id in elsewhere:
+            yield ValidationAgent._error_result(
+                enterprise_id,
+                f"Enterprise with ID {enterprise_id} does not belong to "
+                f"industry type {industry_type_id}.",
+                "Enterprise belongs to another industry. Please check the "
+                "enterprise ID or the industry type ID.",
+            )
+        for enterprise_id in missing:
+            yield ValidationAgent._missing_enterprise(enterprise_id)
+
+    @staticmethod
+    def _missing_enterprise(enterprise_id):
+        return ValidationAgent._error_result(
+            enterprise_id,
+            f"Enterprise with ID {enterprise_id} does not exist.",
+            "Enterprise does not exist. Please check the enterprise ID.",
+        )
+
+    @staticmethod
+    def _error_result(enterprise_id, error, recommendation):
+        return {
+            "error": error,
             "enterprise_id": enterprise_id,
             "validations": {},
             "data_quality": {},
+            "overall_validation": False,
+            "recommendations": [recommendation],
+        }
+
+    @staticmethod
+    def validate(profile):
+        """Compute the validations, quality metrics and recommendations of an
+        enterprise from its data profile, without touching the database."""
+        five_years_ago = profile.since_year
+        result = {
+            "enterprise_id": profile.enterprise_id,
+            "validations": {},
+            "data_quality": {},
             "overall_validation": True,
             "recommendations": [],
         }
 
-        current_year = datetime.now().year
-        five_years_ago = str(current_year - 5)
-
         # Check Revenue Data
-        revenue_data = ValidationAgent._analyze_revenue_data(
-            enterprise_id, five_years_ago
-        )
+        revenue_data = ValidationAgent._analyze_revenue_data(profile)
         result["validations"]["revenue"] = revenue_data["valid"]
         result["data_quality"]["revenue"] = revenue_data["quality"]
 
         # Check if revenue is recurrent
-        recurrent_revenue = ValidationAgent._check_recurrent_revenue(
-            enterprise_id, five_years_ago
-        )
+        recurrent_revenue = ValidationAgent._check_recurrent_revenue(profile)
         result["validations"]["recurrent_revenue"] = recurrent_revenue["is_recurrent"]
         result["data_quality"]["recurrent_revenue"] = recurrent_revenue[
             "recurrence_score"
         ]
 
         # Check Sales Budget Data
-        sales_budget_data = ValidationAgent._analyze_sales_budget_data(
-            enterprise_id, five_years_ago
-        )
+        sales_budget_data = ValidationAgent._analyze_sales_budget_data(profile)
         result["validations"]["sales_budget"] = sales_budget_data["valid"]
         result["data_quality"]["sales_budget"] = sales_budget_data["quality"]
 
         # Check Order Book Data
-        order_book_data = ValidationAgent._analyze_order_book_data(
-            enterprise_id, five_years_ago
-        )
+        order_book_data = ValidationAgent._analyze_order_book_data(profile)
         result["validations"]["order_book"] = order_book_data["valid"]
         result["data_quality"]["order_book"] = order_book_data["quality"]
 
         # Check Opportunity Data
-        opportunity_data = ValidationAgent._analyze_opportunity_data(
-            enterprise_id, five_years_ago
-        )
+        opportunity_data = ValidationAgent._analyze_opportunity_data(profile)
         result["validations"]["opportunity"] = opportunity_data["valid"]
         result["data_quality"]["opportunity"] = opportunity_data["quality"]
 
         # Check Performance Data
-        performance_data = ValidationAgent._analyze_performance_data(
-            enterprise_id, five_years_ago
-        )
+        performance_data = ValidationAgent._analyze_performance_data(profile)
         result["validations"]["performance"] = performance_data["valid"]
         result["data_quality"]["performance"] = performance_data["quality"]
 
         # Check for monthly data
         result["validations"]["monthly_revenue"] = ValidationAgent._check_monthly_data(
-            RevenuesView, enterprise_id, five_years_ago
+            profile.revenue, five_years_ago
         )
         result["validations"]["monthly_sales_budget"] = (
-            ValidationAgent._check_monthly_data(
-                SalesBudgetsView, enterprise_id, five_years_ago
-            )
+            ValidationAgent._check_monthly_data(profile.sales_budget, five_years_ago)
         )
         result["validations"]["monthly_order_book"] = (
-            ValidationAgent._check_monthly_data(
-                OrderBookView, enterprise_id, five_years_ago
-            )
+            ValidationAgent._check_yearly_data(profile.order_book, five_years_ago)
         )
         result["validations"]["monthly_opportunity"] = (
-            ValidationAgent._check_monthly_data(
-                OpportunityBookView, enterprise_id, five_years_ago
-            )
+            ValidationAgent._check_yearly_data(profile.opportunity, five_years_ago)
         )
         result["validations"]["monthly_performance"] = (
-            ValidationAgent._check_monthly_performance(enterprise_id, five_years_ago)
+            ValidationAgent._check_monthly_data(profile.revenue, five_years_ago)
         )
 
         # Overall validation
@@ -115,22 +189,11 @@ class ValidationAgent:
         return result
 
     @staticmethod
-    def _analyze_revenue_data(enterprise_id, five_years_ago):
-        revenue_data = RevenuesView.objects.filter(
-            enterprise_id=enterprise_id, year__gte=five_years_ago
-        )
-        years_count = revenue_data.values("year").distinct().count()
-        months_count = revenue_data.values("year", "month").distinct().count()
-        yearly_revenue = (
-            revenue_data.values("year")
-            .annotate(
-                total_revenue=Sum("real_income")
-            )  # Changed from real_total_income to real_income
-            .order_by("year")
-        )
-        avg_yearly_growth = ValidationAgent._calculate_avg_growth(
-            yearly_revenue, "total_revenue"
-        )
+    def _analyze_revenue_data(profile):
+        years_count = profile.years_count(profile.revenue)
+        months_count = profile.months_count(profile.revenue)
+        revenue_growths = profile.growths(profile.revenue_yearly)
+        avg_yearly_growth = ValidationAgent._calculate_avg_growth(revenue_growths)
         return {
             "valid": years_count > 1,
             "quality": {
@@ -138,28 +201,17 @@ class ValidationAgent:
                 "months_available": months_count,
                 "avg_yearly_growth": avg_yearly_growth,
                 "data_consistency": ValidationAgent._check_data_consistency(
-                    yearly_revenue, "total_revenue"
+                    revenue_growths
                 ),
             },
         }
 
     @staticmethod
-    def _analyze_performance_data(enterprise_id, five_years_ago):
-        performance_data = RevenuesView.objects.filter(
-            enterprise_id=enterprise_id, year__gte=five_years_ago
-        )
-        years_count = performance_data.values("year").distinct().count()
-        avg_performance = (
-            performance_data.aggregate(Avg("income_performance"))[
-                "income_performance__avg"
-            ]
-            or 0
-        )
+    def _analyze_performance_data(profile):
+        years_count = profile.years_count(profile.revenue)
+        avg_performance = profile.revenue_avg_performance() or 0
         performance_consistency = ValidationAgent._check_data_consistency(
-            performance_data.values("year").annotate(
-                performance=Avg("income_performance")
-            ),
-            "performance",
+            profile.growths(profile.revenue_yearly, "performance_growth")
         )
         return {
             "valid": years_count > 1,
@@ -171,31 +223,11 @@ class ValidationAgent:
         }
 
     @staticmethod
-    def _check_monthly_performance(enterprise_id, five_years_ago):
-        performance_data = RevenuesView.objects.filter(
-            enterprise_id=enterprise_id, year__gte=five_years_ago
-        )
-        total_possible_months = (datetime.now().year - int(five_years_ago) + 1) * 12
-        months_with_data = performance_data.values("year", "month").distinct().count()
-        return (
-            months_with_data / total_possible_months >= 0.5
-        )  # Consider it monthly if at least 50% of months are present
-
-    @staticmethod
-    def _check_recurrent_revenue(enterprise_id, five_years_ago):
-        revenue_data = RevenuesView.objects.filter(
-            enterprise_id=enterprise_id, year__gte=five_years_ago
-        )
-
-        if not revenue_data.exists():
+    def _check_recurrent_revenue(profile):
+        if not profile.revenue:
             return {"is_recurrent": False, "recurrence_score": 0}
 
-        monthly_stats = revenue_data.values("month").annotate(
-            avg_revenue=Avg("real_income"),
-            std_dev=StdDev(
-                "real_income"
-            ),  # Changed from real_total_income to real_income
-        )
+        monthly_stats = profile.revenue_monthly_stats()
 
         if not monthly_stats:
             return {"is_recurrent": False, "recurrence_score": 0}
@@ -230,149 +262,82 @@ class ValidationAgent:
         return {"is_recurrent": is_recurrent, "recurrence_score": recurrence_score}
 
     @staticmethod
-    def _analyze_sales_budget_data(enterprise_id, five_years_ago):
-        sales_budget_data = SalesBudgetsView.objects.filter(
-            enterprise_id=enterprise_id, year__gte=five_years_ago
-        )
-        sales_budget_data = sales_budget_data.exclude(budget=Decimal("0E-30")).exclude(
-            real=Decimal("0E-30")
-        )
-        years_count = sales_budget_data.values("year").distinct().count()
+    def _analyze_sales_budget_data(profile):
+        # Only the rows where neither the budget nor the real value is zero.
+        years_count = profile.years_count(profile.sales_budget, "nonzero_rows")
         if years_count > 0:
-            budget_accuracy = (
-                sales_budget_data.aggregate(
-                    accuracy=ExpressionWrapper(
-                        Avg(F("real") / F("budget")), output_field=fields.FloatField()
-                    )
-                )["accuracy"]
-                or 0
-            )
+            budget_accuracy = profile.sales_budget_accuracy() or 0
         else:
             budget_accuracy = 0
-        yearly_budget = sales_budget_data.values("year").annotate(total=Sum("budget"))
         return {
             "valid": years_count > 1,
             "quality": {
                 "years_available": years_count,
                 "budget_accuracy": budget_accuracy,
                 "data_consistency": ValidationAgent._check_data_consistency(
-                    yearly_budget, "total"
+                    profile.growths(profile.sales_budget_yearly)
                 ),
             },
         }
 
     @staticmethod
-    def _analyze_order_book_data(enterprise_id, five_years_ago):
-        order_book_data = OrderBookView.objects.filter(
-            enterprise_id=enterprise_id, year__gte=five_years_ago
-        )
-        years_count = order_book_data.values("year").distinct().count()
-        avg_order_value = (
-            order_book_data.aggregate(Avg("total_order_value"))[
-                "total_order_value__avg"
-            ]
-            or 0
-        )
-        yearly_orders = order_book_data.values("year").annotate(
-            total=Sum("total_order_value")
-        )
+    def _analyze_order_book_data(profile):
+        years_count = profile.years_count(profile.order_book)
+        avg_order_value = profile.average(profile.order_book) or 0
         return {
             "valid": years_count > 1,
             "quality": {
                 "years_available": years_count,
                 "avg_order_value": avg_order_value,
                 "data_consistency": ValidationAgent._check_data_consistency(
-                    yearly_orders, "total"
+                    profile.growths(profile.order_book)
                 ),
             },
         }
 
     @staticmethod
-    def _analyze_opportunity_data(enterprise_id, five_years_ago):
-        opportunity_data = OpportunityBookView.objects.filter(
-            enterprise_id=enterprise_id, year__gte=five_years_ago
-        )
-        years_count = opportunity_data.values("year").distinct().count()
-        total_opportunities = (
-            opportunity_data.aggregate(
-                total_opportunities=Sum("total_opportunity_value")
-            )["total_opportunities"]
-            or 0
-        )
+    def _analyze_opportunity_data(profile):
+        years_count = profile.years_count(profile.opportunity)
+        total_opportunities = sum(row["total"] or 0 for row in profile.opportunity)
         conversion_rate = (
             total_opportunities  # You can define how to calculate this if needed
         )
-        yearly_opportunities = opportunity_data.values("year").annotate(
-            total=Sum("total_opportunity_value")
-        )
         return {
             "valid": years_count > 1,
             "quality": {
                 "years_available": years_count,
                 "conversion_rate": conversion_rate,
                 "data_consistency": ValidationAgent._check_data_consistency(
-                    yearly_opportunities, "total"
+                    profile.growths(profile.opportunity)
                 ),
             },
         }
 
     @staticmethod
-    def _check_monthly_data(model, enterprise_id, five_years_ago):
-        monthly_data = model.objects.filter(
-            enterprise_id=enterprise_id, year__gte=five_years_ago
-        )
+    def _check_monthly_data(monthly_rows, five_years_ago):
+        # Consider it monthly if at least 50% of months are present
+        data_points = EnterpriseDataProfile.months_count(monthly_rows)
+        total_possible_months = (datetime.now().year - five_years_ago + 1) * 12
+        return data_points / total_possible_months >= 0.5
 
-        # Check if the model has a 'month' field
-        if "month" in [f.name for f in model._meta.get_fields()]:
-            # Group by year and month, then count distinct combinations
-            data_points = monthly_data.values("year", "month").distinct().count()
-            total_possible_months = (datetime.now().year - int(five_years_ago) + 1) * 12
-            return (
-                data_points / total_possible_months >= 0.5
-            )  # Consider it monthly if at least 50% of months are present
-        else:
-            # If there's no 'month' field, check for at least one entry per year
-            years_with_data = monthly_data.values("year").distinct().count()
-            total_years = datetime.now().year - int(five_years_ago) + 1
-            return (
-                years_with_data / total_years >= 0.8
-            )  # Consider it sufficient if data is present for at least 80% of years
+    @staticmethod
+    def _check_yearly_data(yearly_rows, five_years_ago):
+        # Sources without a month: consider it sufficient if data is present
+        # for at least 80% of years
+        years_with_data = EnterpriseDataProfile.years_count(yearly_rows)
+        total_years = datetime.now().year - five_years_ago + 1
+        return years_with_data / total_years >= 0.8
 
     @staticmethod
-    def _check_data_consistency(yearly_data, value_field):
-        if len(yearly_data) < 2:
-            return None
-        variations = []
-        for i, y in enumerate(yearly_data):
-            if i > 0:
-                prev_value = yearly_data[i - 1][value_field]
-                current_value = y[value_field]
-                if prev_value and prev_value != 0:
-                    try:
-                        variation = (current_value - prev_value) / prev_value
-                        variations.append(float(variation))
-                    except (InvalidOperation, TypeError, ZeroDivisionError):
-                        continue
+    def _check_data_consistency(variations):
+        # Year-over-year variations come computed (LAG) from the database.
         if not variations:
             return None
         avg_variation = sum(variations) / len(variations)
         return 1 - abs(avg_variation)  # Higher value means more consistent data
 
     @staticmethod
-    def _calculate_avg_growth(yearly_data, value_field):
-        if len(yearly_data) < 2:
-            return None
-        growths = []
-        for i, y in enumerate(yearly_data):
-            if i > 0:
-                prev_value = yearly_data[i - 1][value_field]
-                current_value = y[value_field]
-                if prev_value and prev_value != 0:
-                    try:
-                        growth = (current_value - prev_value) / prev_value
-                        growths.append(float(growth))
-                    except (InvalidOperation, TypeError, ZeroDivisionError):
-                        continue
+    def _calculate_avg_growth(growths):
         return sum(growths) / len(growths) if growths else None
 
     @staticmethod
@@ -0,0 +1,151 @@
+import hashlib
+from collections import defaultdict
+from datetime import datetime
+
+from django.db.models import Count, IntegerField, Sum
+from django.db.models.functions import Cast
+
+from agents.models import DataVersion, ValidationSnapshot
+from financial_data.models import (
+    EnterpriseIndustryView,
+    OpportunityBookView,
+    OrderBookView,
+    RevenuesView,
+    SalesBudgetsView,
+)
+
+from .validation_agent import ValidationAgent, json_safe
+
+# (view, value field) pairs whose row counts and totals fingerprint the data
+# a validation was computed from.
+FINGERPRINT_SOURCES = [
+    (RevenuesView, "real_income"),
+    (SalesBudgetsView, "budget"),
+    (OrderBookView, "total_order_value"),
+    (OpportunityBookView, "total_opportunity_value"),
+]
+
+
+class ValidationSnapshots:
+    """Persisted ValidationAgent results.
+
+    ``get`` serves the stored snapshot while it matches the enterprise data
+    version and the current validation window, and recomputes it otherwise.
+    ``refresh`` is the periodic job: it fingerprints the source views of every
+    enterprise and recomputes only the snapshots whose data changed.
+    """
+
+    @staticmethod
+    def since_year():
+        return datetime.now().year - 5
+
+    @staticmethod
+    def get(enterprise_id):
+        version = DataVersion.current(DataVersion.ENTERPRISE, enterprise_id)
+        snapshot = ValidationSnapshot.objects.filter(enterprise_id=enterprise_id).first()
+        if (
+            snapshot is not None
+            and snapshot.data_version == version
+            and snapshot.since_year == ValidationSnapshots.since_year()
+        ):
+            return snapshot.result
+
+        fingerprint = ValidationSnapshots.fingerprints([enterprise_id]).get(
+            enterprise_id, ""
+        )
+        return ValidationSnapshots._store(enterprise_id, version, fingerprint)
+
+    @staticmethod
+    def refresh(enterprise_ids=None, full=False, processes=None):
+        """Recompute the snapshots of the given (default: all active)
+        enterprises whose source data changed. Returns the enterprise ids
+        recomputed."""
+        if enterprise_ids is None:
+            enterprise_ids = EnterpriseIndustryView.objects.filter(
+                enterprise_active=True
+            ).values_list("enterprise_id", flat=True)
+        enterprise_ids = set(enterprise_ids)
+
+        since_year = ValidationSnapshots.since_year()
+        fingerprints = ValidationSnapshots.fingerprints(enterprise_ids)
+        stored = {
+            snapshot["enterprise_id"]: snapshot
+            for snapshot in ValidationSnapshot.objects.filter(
+                enterprise_id__in=enterprise_ids
+            ).values("enterprise_id", "fingerprint", "since_year")
+        }
+
+        changed = {
+            enterprise_id
+            for enterprise_id in enterprise_ids
+            if stored.get(enterprise_id, {}).get("fingerprint")
+            != fingerprints.get(enterprise_id, "")
+        }
+        stale = {
+            enterprise_id
+            for enterprise_id in enterprise_ids
+            if full
+            or enterprise_id in changed
+            or stored[enterprise_id]["since_year"] != since_year
+        }
+
+        # Data written behind the application's back: move the version on so
+        # that everything stamped with the old one is recomputed too.
+        DataVersion.bump(DataVersion.ENTERPRISE, changed & stored.keys())
+        versions = DataVersion.current_many(DataVersion.ENTERPRISE, stale)
+        for result in ValidationAgent.execute_batch(
+            enterprise_ids=stale, processes=processes
+        ):
+            enterprise_id = result["enterprise_id"]
+            ValidationSnapshots._save(
+                enterprise_id,
+                versions[enterprise_id],
+                fingerprints.get(enterprise_id, ""),
+                result,
+            )
+        return sorted(stale)
+
+    @staticmethod
+    def fingerprints(enterprise_ids):
+        """Checksum of the row counts and totals of every source view per
+        enterprise, over the validation window. One grouped query per view."""
+        since_year = ValidationSnapshots.since_year()
+        parts = defaultdict(list)
+        for model, value_field in FINGERPRINT_SOURCES:
+            rows = (
+                model.objects.annotate(year_int=Cast("year", IntegerField()))
+                .filter(enterprise_id__in=enterprise_ids, year_int__gte=since_year)
+                .values("enterprise_id")
+                .annotate(rows=Count("enterprise"), total=Sum(value_field))
+                .order_by("enterprise_id")
+            )
+            for row in rows:
+                parts[row["enterprise_id"]].append(
+                    f"{model._meta.db_table}:{row['rows']}:{row['total']}"
+                )
+        return {
+            enterprise_id: hashlib.sha1("|".join(values).encode()).hexdigest()
+            for enterprise_id, values in parts.items()
+        }
+
+    @staticmethod
+    def _store(enterprise_id, version, fingerprint):
+        return ValidationSnapshots._save(
+            enterprise_id, version, fingerprint, ValidationAgent.execute(enterprise_id)
+        )
+
+    @staticmethod
+    def _save(enterprise_id, version, fingerprint, result):
+        result = json_safe(result)
+        if "error" in result:
+            return result
+        ValidationSnapshot.objects.update_or_create(
+            enterprise_id=enterprise_id,
+            defaults={
+                "data_version": version,
+                "since_year": ValidationSnapshots.since_year(),
+                "fingerprint": fingerprint,
+                "result": result,
+            },
+        )
+        return result
@@ -1,14 +1,13 @@
 import random
 from datetime import datetime
 from typing import Dict
-import requests
-from bs4 import BeautifulSoup
-from langchain_google_genai import GoogleGenerativeAI
 from langchain.prompts import PromptTemplate
 import os
 from dotenv import load_dotenv
-import json
-import re
+
+from .hypothesis_analyses import HypothesisAnalyses
+from .industry_intelligence import IndustryIntelligenceStore
+from .llm_clients import LLMClients
 
 load_dotenv()
 
@@ -18,9 +17,7 @@ class WebRevenuHypoAgent:
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
         if not self.google_api_key:
             raise ValueError("GOOGLE_API_KEY not found in environment variables")
-        self.llm = GoogleGenerativeAI(
-            model="gemini-1.5-pro", google_api_key=self.google_api_key
-        )
+        self.llm = LLMClients.get("gemini-1.5-pro", self.google_api_key)
 
     def execute(
         self,
@@ -28,6 +25,7 @@ class WebRevenuHypoAgent:
         growth_rate: float,
         enterprise_info: Dict,
         prediction_year: int,
+        include_analysis: bool = False,
     ) -> Dict:
         try:
             industry_data = self.fetch_industry_data(industry_type, prediction_year)
@@ -38,75 +36,32 @@ class WebRevenuHypoAgent:
                 industry_data,
                 prediction_year,
             )
-            analysis = self.generate_analysis(
-                industry_type,
-                growth_rate,
-                enterprise_info,
-                monthly_predictions,
-                industry_data,
-                prediction_year,
-            )
 
-            return {
+            result = {
                 "prediction_year": prediction_year,
                 "monthly_predictions": monthly_predictions,
                 "enterprise_info": enterprise_info,
             }
+            if include_analysis:
+                # The narrative is a second LLM round trip: it is written in
+                # the background and fetched by id.
+                result["analysis_id"] = HypothesisAnalyses.submit(
+                    self,
+                    industry_type,
+                    growth_rate,
+                    enterprise_info,
+                    monthly_predictions,
+                    industry_data,
+                    prediction_year,
+                )
+            return result
         except Exception as e:
             return {"error": f"Failed to generate predictions: {str(e)}"}
 
     def fetch_industry_data(self, industry_type: str, prediction_year: int) -> Dict:
-        query = f"{industry_type} industry trends statistics financial analysis forecast {prediction_year}"
-        url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, "html.parser")
-        snippets = [result.get_text() for result in soup.select(".g")]
-        content = " ".join(snippets[:10])
-
-        prompt = PromptTemplate(
-            input_variables=["industry_type", "prediction_year", "content"],
-            template="""
-            As a financial analyst, extract key information about the {industry_type} industry for the year {prediction_year} from the following content:
-
-            {content}
-
-            Provide the following information:
-            1. Estimated average annual revenue for a company in this industry in {prediction_year}
-            2. Projected industry growth rate for {prediction_year}
-            3. Key trends affecting the industry in {prediction_year} (comma-separated list)
-            4. Potential challenges or risks for {prediction_year} (comma-separated list)
-            5. Seasonality factors for {prediction_year} (comma-separated list of 12 numbers, one for each month, or 'N/A' if not applicable)
-
-            Format your response as a JSON object with keys: average_revenue, growth_rate, trends, challenges, seasonality.
-            Use "N/A" if you can't find specific information for any field.
-            """,
-        )
-
-        response = self.llm(
-            prompt.format(
-                industry_type=industry_type,
-                prediction_year=prediction_year,
-                content=content,
-            )
-        )
-
-        try:
-            parsed_data = json.loads(response)
-        except json.JSONDecodeError:
-            parsed_data = {}
-            patterns = {
-                "average_revenue": r'"average_revenue":\s*"([^"]+)"',
-                "growth_rate": r'"growth_rate":\s*"([^"]+)"',
-                "trends": r'"trends":\s*"([^"]+)"',
-                "challenges": r'"challenges":\s*"([^"]+)"',
-                "seasonality": r'"seasonality":\s*"([^"]+)"',
-            }
-            for key, pattern in patterns.items():
-                match = re.search(pattern, response)
-                parsed_data[key] = match.group(1) if match else "N/A"
+        parsed_data = IndustryIntelligenceStore.get(
+            industry_type, prediction_year, self.llm
+        )["data"]
 
         default_data = {
             "average_revenue": "N/A",
@@ -212,7 +167,8 @@ class WebRevenuHypoAgent:
         """,
         )
 
-        analysis = self.llm(
+        analysis = LLMClients.invoke(
+            self.llm,
             prompt.format(
                 industry_type=industry_type,
                 growth_rate=growth_rate,
@@ -220,7 +176,7 @@ class WebRevenuHypoAgent:
                 predictions=predictions,
                 industry_data=industry_data,
                 prediction_year=prediction_year,
-            )
+            ),
         )
 
         return analysis
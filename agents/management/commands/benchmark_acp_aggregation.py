@@ -0,0 +1,92 @@
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+from agents.agents.agent_acp_t_produit import AgentACP_T_produit
+from financial_data.models import EnterpriseIndustryView, RevenuesView
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the per-enterprise industry aggregation used by the ACP agent "
+        "with the single grouped query, for every industry ordered by size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("description", help="Revenue description to aggregate")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        description = options["description"]
+        repeat = options["repeat"]
+
+        industries = (
+            EnterpriseIndustryView.objects.filter(enterprise_active=True)
+            .values("industry_type_label")
+            .annotate(enterprises=Count("enterprise_id"))
+            .order_by("enterprises")
+        )
+
+        self.stdout.write(
+            f"{'industry':<30} {'size':>5} {'legacy ms':>10} {'queries':>8} "
+            f"{'grouped ms':>11} {'queries':>8} {'speedup':>8}"
+        )
+        for industry in industries:
+            related_enterprises = EnterpriseIndustryView.objects.filter(
+                industry_type_label=industry["industry_type_label"],
+                enterprise_active=True,
+            )
+            legacy_ms, legacy_queries = self._measure(
+                lambda: _legacy_aggregation(related_enterprises, description), repeat
+            )
+            grouped_ms, grouped_queries = self._measure(
+                lambda: AgentACP_T_produit._get_aggregated_data(
+                    related_enterprises, description
+                ),
+                repeat,
+            )
+            speedup = legacy_ms / grouped_ms if grouped_ms else float("inf")
+            self.stdout.write(
+                f"{industry['industry_type_label'][:30]:<30} "
+                f"{industry['enterprises']:>5} {legacy_ms:>10.2f} {legacy_queries:>8} "
+                f"{grouped_ms:>11.2f} {grouped_queries:>8} {speedup:>7.1f}x"
+            )
+
+    @staticmethod
+    def _measure(func, repeat):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                func()
+                timings.append((time.perf_counter() - start) * 1000)
+        return min(timings), len(queries)
+
+
+def _legacy_aggregation(related_enterprises, description):
+    # Reference implementation: one RevenuesView query per enterprise,
+    # averaged in Python.
+    data = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+    for enterprise in related_enterprises:
+        revenues = RevenuesView.objects.filter(
+            enterprise_id=enterprise.enterprise_id, description=description
+        )
+        for revenue in revenues:
+            data[revenue.year][revenue.month].append(
+                (revenue.real_income, revenue.expected_income)
+            )
+    return {
+        year: {
+            month: (
+                sum(real for real, _ in values if real is not None) / len(values),
+                sum(budget for _, budget in values if budget is not None)
+                / len(values),
+            )
+            for month, values in months.items()
+        }
+        for year, months in data.items()
+    }
@@ -0,0 +1,206 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from scipy import stats
+
+from agents.agents.acp_engine import ACPEngine
+from agents.agents.agent_acp_t_produit import MONTHS, safe_float
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark the vectorized ACP analytics engine against the "
+        "per-year Python loops it replaced, on synthetic history."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--years", type=int, default=15)
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        years, aggregated_data, enterprise_rows, pca_coefficients = _synthetic_history(
+            options["years"], options["seed"]
+        )
+        enterprise_real = np.array(
+            [[real for real, _ in enterprise_rows[year]] for year in years]
+        )
+        enterprise_budget = np.array(
+            [[budget for _, budget in enterprise_rows[year]] for year in years]
+        )
+
+        def vectorized():
+            industry_real, industry_budget = ACPEngine.industry_matrices(
+                aggregated_data
+            )
+            engine = ACPEngine(
+                years, industry_real, industry_budget, enterprise_real, enterprise_budget
+            )
+            result = engine.analyze(pca_coefficients)[0]
+            result["trend_analysis"] = engine.trend_analysis()
+            return result
+
+        def legacy():
+            return _legacy_analysis(aggregated_data, enterprise_rows, pca_coefficients)
+
+        legacy_ms = _best_of(legacy, options["repeat"])
+        vectorized_ms = _best_of(vectorized, options["repeat"])
+
+        self.stdout.write(f"years of history : {len(years)}")
+        self.stdout.write(f"legacy loops     : {legacy_ms:.3f} ms")
+        self.stdout.write(f"vectorized engine: {vectorized_ms:.3f} ms")
+        self.stdout.write(f"speedup          : {legacy_ms / vectorized_ms:.1f}x")
+        self.stdout.write(
+            f"outputs match    : {'yes' if _same(legacy(), vectorized()) else 'NO'}"
+        )
+
+
+def _best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def _same(a, b):
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and isinstance(b, float):
+        return bool(np.isclose(a, b, rtol=1e-9, atol=0))
+    return a == b
+
+
+def _synthetic_history(n_years, seed):
+    rng = np.random.default_rng(seed)
+    years = list(range(2024 - n_years + 1, 2025))
+    season = 1 + 0.3 * np.sin(np.arange(12) / 12 * 2 * np.pi)
+    aggregated_data = {
+        "years": years,
+        "aggregatedAverageReals": {},
+        "aggregatedAverageBudgets": {},
+    }
+    enterprise_rows = {}
+    for year in years:
+        industry_real = 10000 * season * rng.uniform(0.9, 1.1, 12)
+        industry_budget = industry_real * rng.uniform(0.95, 1.05, 12)
+        aggregated_data["aggregatedAverageReals"][year] = [
+            {"month": MONTHS[i], "value": float(v)} for i, v in enumerate(industry_real)
+        ]
+        aggregated_data["aggregatedAverageBudgets"][year] = [
+            {"month": MONTHS[i], "value": float(v)}
+            for i, v in enumerate(industry_budget)
+        ]
+        real = industry_real * rng.uniform(0.5, 1.5, 12)
+        real[rng.integers(0, 12)] *= 4
+        enterprise_rows[year] = list(zip(real.tolist(), (real * 1.1).tolist()))
+    pca_coefficients = rng.normal(size=n_years)
+    pca_coefficients = (pca_coefficients / np.abs(pca_coefficients).sum()).tolist()
+    return years, aggregated_data, enterprise_rows, pca_coefficients
+
+
+def _legacy_analysis(aggregated_data, enterprise_rows, pca_coefficients):
+    # Reference implementation: the per-year loops over lists of dicts that
+    # AgentACP_T_produit used before the vectorized engine.
+    def industry(key, year):
+        values = [safe_float(m["value"]) for m in aggregated_data[key][year]]
+        return [v for v in values if v is not None]
+
+    result = {
+        "anomalies": {},
+        "risk_assessment": {},
+        "performance_evaluation": {},
+        "adjusted_budgets": {},
+        "market_share": {},
+        "trend_analysis": {},
+    }
+    for year in aggregated_data["years"]:
+        real = [safe_float(r) for r, _ in enterprise_rows[year]]
+        real = [v for v in real if v is not None]
+        enterprise_real = sum(safe_float(r) or 0 for r, _ in enterprise_rows[year])
+        enterprise_budget = sum(safe_float(b) or 0 for _, b in enterprise_rows[year])
+        industry_real = industry("aggregatedAverageReals", year)
+        industry_budget = industry("aggregatedAverageBudgets", year)
+
+        if len(real) == 12 and len(industry_real) == 12 and any(real):
+            z_scores = stats.zscore(real)
+            result["anomalies"][year] = [i for i, z in enumerate(z_scores) if abs(z) > 2]
+        else:
+            result["anomalies"][year] = None
+
+        if len(real) == 12 and len(industry_real) == 12 and any(real) and any(
+            industry_real
+        ):
+            ev = safe_float(np.std(real) / np.mean(real) if np.mean(real) else None)
+            iv = safe_float(
+                np.std(industry_real) / np.mean(industry_real)
+                if np.mean(industry_real)
+                else None
+            )
+            result["risk_assessment"][year] = {
+                "enterprise_volatility": ev,
+                "industry_volatility": iv,
+                "relative_risk": safe_float(ev / iv if iv else None),
+            }
+        else:
+            result["risk_assessment"][year] = None
+
+        if enterprise_budget and sum(industry_budget) and sum(industry_real):
+            result["performance_evaluation"][year] = {
+                "enterprise_budget_accuracy": safe_float(
+                    enterprise_real / enterprise_budget
+                ),
+                "industry_budget_accuracy": safe_float(
+                    sum(industry_real) / sum(industry_budget)
+                ),
+                "relative_performance": safe_float(enterprise_real / sum(industry_real)),
+            }
+        else:
+            result["performance_evaluation"][year] = None
+
+        result["market_share"][year] = (
+            safe_float(enterprise_real / sum(industry_real))
+            if sum(industry_real) > 0
+            else None
+        )
+
+        sum_abs_coef = sum(abs(c) for c in pca_coefficients if c is not None)
+        if enterprise_budget > 0 and pca_coefficients and sum_abs_coef > 0:
+            result["adjusted_budgets"][year] = [
+                {
+                    "month": i + 1,
+                    "adjusted_budget": safe_float(
+                        (enterprise_budget * abs(c)) / sum_abs_coef
+                    ),
+                }
+                for i, c in enumerate(pca_coefficients)
+                if c is not None
+            ]
+        else:
+            result["adjusted_budgets"][year] = None
+
+        yoy_growth = None
+        if year > aggregated_data["years"][0]:
+            previous = industry("aggregatedAverageReals", year - 1)
+            if previous and sum(previous) != 0:
+                yoy_growth = safe_float(
+                    (sum(industry_real) - sum(previous)) / sum(previous)
+                )
+        quarterly_growth = []
+        for i in range(1, 4):
+            current_quarter = sum(industry_real[i * 3 : (i + 1) * 3])
+            previous_quarter = sum(industry_real[(i - 1) * 3 : i * 3])
+            quarterly_growth.append(
+                safe_float((current_quarter - previous_quarter) / previous_quarter)
+                if previous_quarter != 0
+                else None
+            )
+        result["trend_analysis"][year] = {
+            "year_over_year_growth": yoy_growth,
+            "quarter_over_quarter_growth": quarterly_growth,
+        }
+    return result
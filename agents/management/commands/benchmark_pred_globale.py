@@ -0,0 +1,133 @@
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from agents.agents.pred_globale_agent import PredGlobaleAgent
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark the vectorized PredGlobaleAgent forecast against the "
+        "per-description loop it replaced, on synthetic revenue lines."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--descriptions", type=int, default=500)
+        parser.add_argument("--years", type=int, default=5)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--growth-rate", type=float, default=0.05)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        prediction_year = 2025
+        monthly_income = _synthetic_income(
+            options["descriptions"], options["years"], prediction_year, options["seed"]
+        )
+        growth_rate = options["growth_rate"]
+
+        def vectorized():
+            return PredGlobaleAgent._forecast(
+                monthly_income, prediction_year, growth_rate
+            )
+
+        def legacy():
+            return _legacy_forecast(monthly_income, prediction_year, growth_rate)
+
+        legacy_ms = _best_of(legacy, options["repeat"])
+        vectorized_ms = _best_of(vectorized, options["repeat"])
+
+        self.stdout.write(f"descriptions     : {options['descriptions']}")
+        self.stdout.write(f"years of history : {options['years']}")
+        self.stdout.write(f"legacy loop      : {legacy_ms:.3f} ms")
+        self.stdout.write(f"vectorized       : {vectorized_ms:.3f} ms")
+        self.stdout.write(f"speedup          : {legacy_ms / vectorized_ms:.1f}x")
+        self.stdout.write(
+            f"outputs match    : {'yes' if _same(legacy(), vectorized()) else 'NO'}"
+        )
+
+
+def _best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def _same(a, b):
+    if isinstance(a, dict):
+        return list(a) == list(b) and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, float) and isinstance(b, float):
+        return a == b or (np.isnan(a) and np.isnan(b))
+    return type(a) is type(b) and a == b
+
+
+def _synthetic_income(n_descriptions, n_years, prediction_year, seed):
+    """Year x (Month, Description) frame shaped like the one PredGlobaleAgent
+    builds, with a share of descriptions whose last year is all zeros and a
+    few missing months."""
+    rng = np.random.default_rng(seed)
+    years = range(prediction_year - n_years, prediction_year)
+    season = 1 + 0.3 * np.sin(np.arange(12) / 12 * 2 * np.pi)
+    rows = []
+    for d in range(n_descriptions):
+        description = f"Line {d:04d}"
+        level = rng.uniform(1_000, 100_000)
+        zero_last_year = rng.random() < 0.1
+        for year in years:
+            income = level * season * rng.uniform(0.8, 1.2, 12)
+            if zero_last_year and year == prediction_year - 1:
+                income[:] = 0
+            for month in range(1, 13):
+                if year < prediction_year - 2 and rng.random() < 0.02:
+                    continue
+                rows.append((year, month, description, float(income[month - 1])))
+    data = pd.DataFrame(rows, columns=["Year", "Month", "Description", "RealIncome"])
+    return (
+        data.groupby(["Year", "Month", "Description"])["RealIncome"]
+        .sum()
+        .unstack(level=["Month", "Description"])
+    )
+
+
+def _legacy_forecast(data_before_prediction, prediction_year, growth_rate):
+    # Reference implementation: the per-description loop PredGlobaleAgent
+    # used before the vectorized forecast.
+    current_year = prediction_year - 1
+    last_year = current_year - 1
+    results = {}
+    for desc in data_before_prediction.columns.get_level_values(
+        "Description"
+    ).unique():
+        description_data = data_before_prediction.xs(desc, axis=1, level="Description")
+
+        if len(description_data) >= 2:
+            current_year_data = description_data.iloc[-1]
+            previous_year_data = description_data.iloc[-2]
+            if (current_year_data == 0).all():
+                base_prediction = previous_year_data
+            else:
+                base_prediction = current_year_data
+            predicted_distribution = base_prediction * (1 + growth_rate)
+        else:
+            predicted_distribution = description_data.iloc[-1] * (1 + growth_rate)
+
+        predicted_distribution = predicted_distribution.round().astype(int)
+
+        results[desc] = {
+            str(prediction_year): predicted_distribution.to_dict(),
+            str(current_year): (
+                description_data.iloc[-1].to_dict()
+                if not description_data.empty
+                else None
+            ),
+            str(last_year): (
+                description_data.iloc[-2].to_dict()
+                if len(description_data) > 1
+                else None
+            ),
+        }
+    return results
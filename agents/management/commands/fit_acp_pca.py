@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from agents.agents.streaming_pca import StreamingPCA
+from financial_data.models import EnterpriseIndustryView
+
+
+class Command(BaseCommand):
+    help = (
+        "Fit the streaming ACP PCA of one or every industry and persist it, so "
+        "that the ACP agent only projects onto the stored components. Models "
+        "are stamped with the industry data version; rerun after data changes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--industry-type-id", type=int)
+        parser.add_argument(
+            "--description",
+            help="Fit on this revenue description only instead of all of them.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["industry_type_id"] is not None:
+            industry_type_ids = [options["industry_type_id"]]
+        else:
+            industry_type_ids = (
+                EnterpriseIndustryView.objects.filter(enterprise_active=True)
+                .values_list("industry_type_id", flat=True)
+                .distinct()
+                .order_by("industry_type_id")
+            )
+
+        for industry_type_id in industry_type_ids:
+            model = StreamingPCA.fit(
+                industry_type_id,
+                options["description"],
+                chunk_size=options["chunk_size"],
+                batch_size=options["batch_size"],
+            )
+            if model is None:
+                self.stdout.write(f"industry {industry_type_id}: not enough data")
+                continue
+            self.stdout.write(
+                f"industry {industry_type_id}: {model.n_samples} sample(s), "
+                f"explained variance {model.explained_variance_ratio[0]:.3f}"
+            )
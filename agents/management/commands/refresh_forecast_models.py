@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from agents.agents.forecast_engine import ForecastEngine
+
+
+class Command(BaseCommand):
+    help = (
+        "Fit the Holt-Winters revenue models of new or changed enterprise "
+        "series and roll the others forward over newly arrived months."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--enterprise-id",
+            type=int,
+            action="append",
+            dest="enterprise_ids",
+            help="Limit the refresh to this enterprise (repeatable).",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Refit every series instead of rolling unchanged ones forward.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Fit the series in a pool of this many processes.",
+        )
+
+    def handle(self, *args, **options):
+        counts = ForecastEngine.refresh(
+            options["enterprise_ids"],
+            full=options["full"],
+            processes=options["processes"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "{fitted} series refitted, {updated} rolled forward, "
+                "{unchanged} unchanged.".format(**counts)
+            )
+        )
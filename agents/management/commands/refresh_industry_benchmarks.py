@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from agents.agents.industry_benchmarks import IndustryBenchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the industry benchmark table for the enterprises whose revenue "
+        "data changed since the last run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild every industry benchmark instead of only changed ones.",
+        )
+
+    def handle(self, *args, **options):
+        summary = IndustryBenchmarks.refresh(full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(summary['changed_enterprises'])} enterprise(s) changed, "
+                f"{len(summary['industries_refreshed'])} industry(ies) refreshed, "
+                f"{summary['benchmarks_written']} benchmark row(s) written."
+            )
+        )
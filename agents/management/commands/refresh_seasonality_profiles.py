@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from agents.agents.seasonality_profiles import SeasonalityProfiles
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the industry seasonality profiles from the industry benchmark "
+        "table. refresh_industry_benchmarks already keeps the profiles of the "
+        "industries it refreshes up to date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--industry-type-id", type=int)
+
+    def handle(self, *args, **options):
+        written = SeasonalityProfiles.refresh(options["industry_type_id"])
+        self.stdout.write(
+            self.style.SUCCESS(f"{written} seasonality profile(s) written.")
+        )
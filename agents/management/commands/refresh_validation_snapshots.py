@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from agents.agents.validation_snapshots import ValidationSnapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the persisted validation snapshots of the enterprises whose "
+        "revenue, sales budget, order book or opportunity data changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--enterprise-id",
+            type=int,
+            action="append",
+            dest="enterprise_ids",
+            help="Limit the refresh to this enterprise (repeatable).",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute every snapshot instead of only changed ones.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Score the enterprises in a pool of this many processes.",
+        )
+
+    def handle(self, *args, **options):
+        refreshed = ValidationSnapshots.refresh(
+            options["enterprise_ids"],
+            full=options["full"],
+            processes=options["processes"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(refreshed)} validation snapshot(s) recomputed.")
+        )
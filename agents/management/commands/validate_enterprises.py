@@ -0,0 +1,61 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from agents.agents.validation_agent import ValidationAgent, json_safe
+
+
+class Command(BaseCommand):
+    help = (
+        "Validate every enterprise (or a selection) in batch and write the "
+        "results as NDJSON or as a summary table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--enterprise-id",
+            type=int,
+            action="append",
+            dest="enterprise_ids",
+            help="Validate this enterprise (repeatable).",
+        )
+        parser.add_argument("--industry-type-id", type=int)
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Score the enterprises in a pool of this many processes.",
+        )
+        parser.add_argument(
+            "--format", choices=["ndjson", "table"], default="ndjson"
+        )
+
+    def handle(self, *args, **options):
+        results = ValidationAgent.execute_batch(
+            enterprise_ids=options["enterprise_ids"],
+            industry_type_id=options["industry_type_id"],
+            processes=options["processes"],
+        )
+
+        if options["format"] == "ndjson":
+            for result in results:
+                self.stdout.write(json.dumps(json_safe(result)))
+            return
+
+        checks = None
+        for result in results:
+            if "error" in result:
+                self.stdout.write(f"{result['enterprise_id']}\t{result['error']}")
+                continue
+            if checks is None:
+                checks = list(result["validations"])
+                self.stdout.write("\t".join(["enterprise_id", "overall", *checks]))
+            self.stdout.write(
+                "\t".join(
+                    str(value)
+                    for value in [
+                        result["enterprise_id"],
+                        result["overall_validation"],
+                        *(result["validations"][check] for check in checks),
+                    ]
+                )
+            )
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndustryBenchmark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('industry_type_id', models.BigIntegerField()),
+                ('description', models.CharField(max_length=255)),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('real_count', models.IntegerField()),
+                ('real_sum', models.FloatField(null=True)),
+                ('real_mean', models.FloatField(null=True)),
+                ('real_std', models.FloatField(null=True)),
+                ('expected_count', models.IntegerField()),
+                ('expected_sum', models.FloatField(null=True)),
+                ('expected_mean', models.FloatField(null=True)),
+                ('expected_std', models.FloatField(null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'industry_benchmarks',
+                'managed': True,
+                'unique_together': {('industry_type_id', 'description', 'year', 'month')},
+            },
+        ),
+        migrations.CreateModel(
+            name='IndustryBenchmarkSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('enterprise_id', models.BigIntegerField()),
+                ('description', models.CharField(max_length=255)),
+                ('industry_type_id', models.BigIntegerField()),
+                ('checksum', models.CharField(max_length=40)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'industry_benchmark_sources',
+                'managed': True,
+                'unique_together': {('enterprise_id', 'description')},
+            },
+        ),
+    ]
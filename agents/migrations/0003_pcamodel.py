@@ -0,0 +1,34 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0002_dataversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PCAModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('industry_type_id', models.BigIntegerField()),
+                ('description', models.CharField(blank=True, default='', max_length=255)),
+                ('data_version', models.PositiveBigIntegerField(default=0)),
+                ('n_samples', models.IntegerField()),
+                ('scaler_mean', models.JSONField()),
+                ('scaler_scale', models.JSONField()),
+                ('pca_mean', models.JSONField()),
+                ('components', models.JSONField()),
+                ('explained_variance_ratio', models.JSONField()),
+                ('fitted_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'acp_pca_models',
+                'managed': True,
+                'unique_together': {('industry_type_id', 'description')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0003_pcamodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeasonalityProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('industry_type_id', models.BigIntegerField()),
+                ('description', models.CharField(max_length=255)),
+                ('first_year', models.IntegerField()),
+                ('last_year', models.IntegerField()),
+                ('n_observations', models.IntegerField()),
+                ('seasonal_index', models.JSONField()),
+                ('seasonal_factors', models.JSONField()),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'industry_seasonality_profiles',
+                'managed': True,
+                'unique_together': {('industry_type_id', 'description')},
+            },
+        ),
+    ]
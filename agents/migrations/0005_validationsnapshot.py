@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0004_seasonalityprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ValidationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('enterprise_id', models.BigIntegerField(unique=True)),
+                ('data_version', models.PositiveBigIntegerField(default=0)),
+                ('since_year', models.IntegerField()),
+                ('fingerprint', models.CharField(max_length=40)),
+                ('result', models.JSONField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'validation_snapshots',
+                'managed': True,
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0005_validationsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('enterprise_id', models.BigIntegerField()),
+                ('description', models.CharField(max_length=255)),
+                ('n_observations', models.IntegerField()),
+                ('first_year', models.IntegerField()),
+                ('first_month', models.IntegerField()),
+                ('last_year', models.IntegerField()),
+                ('last_month', models.IntegerField()),
+                ('fingerprint', models.CharField(max_length=40)),
+                ('params', models.JSONField()),
+                ('state', models.JSONField()),
+                ('sse', models.FloatField(null=True)),
+                ('fitted_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'forecast_models',
+                'managed': True,
+                'unique_together': {('enterprise_id', 'description')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0006_forecastmodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndustryIntelligence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('industry_type', models.CharField(max_length=255)),
+                ('year', models.IntegerField()),
+                ('content', models.TextField()),
+                ('data', models.JSONField()),
+                ('researched_at', models.DateTimeField()),
+                ('refresh_started_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'db_table': 'industry_intelligence',
+                'managed': True,
+                'unique_together': {('industry_type', 'year')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0007_industryintelligence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='industrybenchmark',
+            name='data_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
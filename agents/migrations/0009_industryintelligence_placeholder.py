@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0008_industrybenchmark_data_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='industryintelligence',
+            name='researched_at',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0009_industryintelligence_placeholder'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='industryintelligence',
+            name='data',
+            field=models.JSONField(null=True),
+        ),
+    ]
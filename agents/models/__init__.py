@@ -0,0 +1,7 @@
+from .industrybenchmark import IndustryBenchmark, IndustryBenchmarkSource
+from .dataversion import DataVersion
+from .pcamodel import PCAModel
+from .seasonalityprofile import SeasonalityProfile
+from .validationsnapshot import ValidationSnapshot
+from .forecastmodel import ForecastModel
+from .industryintelligence import IndustryIntelligence
@@ -0,0 +1,68 @@
+from django.db import models
+from django.db.models import F
+
+from financial_data.models import EnterpriseIndustryView
+
+
+class DataVersion(models.Model):
+    """Monotonic counter bumped whenever the revenue data behind an enterprise
+    or an industry changes. Derived results are stamped or keyed with it so
+    that they are recomputed only after a change."""
+
+    ENTERPRISE = "enterprise"
+    INDUSTRY = "industry"
+
+    scope = models.CharField(max_length=20)
+    key = models.BigIntegerField()
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        managed = True
+        db_table = "data_versions"
+        unique_together = (("scope", "key"),)
+
+    def __str__(self):
+        return f"{self.scope} {self.key} - v{self.version}"
+
+    @staticmethod
+    def current(scope, key):
+        version = (
+            DataVersion.objects.filter(scope=scope, key=key)
+            .values_list("version", flat=True)
+            .first()
+        )
+        return version or 0
+
+    @staticmethod
+    def current_many(scope, keys):
+        """Current version of each key, 0 for keys never bumped."""
+        keys = set(keys)
+        versions = dict(
+            DataVersion.objects.filter(scope=scope, key__in=keys).values_list(
+                "key", "version"
+            )
+        )
+        return {key: versions.get(key, 0) for key in keys}
+
+    @staticmethod
+    def bump(scope, keys):
+        for key in set(keys):
+            DataVersion.objects.get_or_create(scope=scope, key=key)
+            DataVersion.objects.filter(scope=scope, key=key).update(
+                version=F("version") + 1
+            )
+
+    @staticmethod
+    def bump_enterprises(enterprise_ids):
+        """Bump the given enterprises and the industries they belong to."""
+        enterprise_ids = set(enterprise_ids)
+        if not enterprise_ids:
+            return
+        DataVersion.bump(DataVersion.ENTERPRISE, enterprise_ids)
+        DataVersion.bump(
+            DataVersion.INDUSTRY,
+            EnterpriseIndustryView.objects.filter(
+                enterprise_id__in=enterprise_ids
+            ).values_list("industry_type_id", flat=True),
+        )
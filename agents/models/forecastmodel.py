@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class ForecastModel(models.Model):
+    """Holt-Winters model fitted on the monthly real income of one enterprise
+    and description: smoothing parameters, the state after the last observed
+    month, and a fingerprint of the series it was brought up to date with."""
+
+    enterprise_id = models.BigIntegerField()
+    description = models.CharField(max_length=255)
+    n_observations = models.IntegerField()
+    first_year = models.IntegerField()
+    first_month = models.IntegerField()
+    last_year = models.IntegerField()
+    last_month = models.IntegerField()
+    fingerprint = models.CharField(max_length=40)
+    params = models.JSONField()
+    state = models.JSONField()
+    sse = models.FloatField(null=True)
+    fitted_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        managed = True
+        db_table = "forecast_models"
+        unique_together = (("enterprise_id", "description"),)
+
+    def __str__(self):
+        return f"{self.enterprise_id} - {self.description} - {self.last_year}/{self.last_month}"
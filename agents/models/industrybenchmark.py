@@ -0,0 +1,50 @@
+from django.db import models
+
+
+class IndustryBenchmark(models.Model):
+    """Monthly statistics of one industry's revenue line, stamped with the
+    industry data version they are known to be current for."""
+
+    industry_type_id = models.BigIntegerField()
+    description = models.CharField(max_length=255)
+    year = models.IntegerField()
+    month = models.IntegerField()
+    real_count = models.IntegerField()
+    real_sum = models.FloatField(null=True)
+    real_mean = models.FloatField(null=True)
+    real_std = models.FloatField(null=True)
+    expected_count = models.IntegerField()
+    expected_sum = models.FloatField(null=True)
+    expected_mean = models.FloatField(null=True)
+    expected_std = models.FloatField(null=True)
+    data_version = models.PositiveBigIntegerField(default=0)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        managed = True
+        db_table = "industry_benchmarks"
+        unique_together = (("industry_type_id", "description", "year", "month"),)
+
+    def __str__(self):
+        return (
+            f"{self.industry_type_id} - {self.description} - {self.year} - {self.month}"
+        )
+
+
+class IndustryBenchmarkSource(models.Model):
+    """Fingerprint of one enterprise's revenue line as of the last benchmark
+    refresh, used to find the enterprises whose data changed since."""
+
+    enterprise_id = models.BigIntegerField()
+    description = models.CharField(max_length=255)
+    industry_type_id = models.BigIntegerField()
+    checksum = models.CharField(max_length=40)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        managed = True
+        db_table = "industry_benchmark_sources"
+        unique_together = (("enterprise_id", "description"),)
+
+    def __str__(self):
+        return f"{self.enterprise_id} - {self.description}"
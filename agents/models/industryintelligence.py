@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class IndustryIntelligence(models.Model):
+    """Web research on an industry for one year: the search snippets it was
+    drawn from and the industry data the LLM extracted from them (average
+    revenue, growth rate, trends, challenges, seasonality). A row whose
+    ``researched_at`` is null is a placeholder claimed by the worker doing the
+    first research; ``data`` is null until the snippets have been extracted."""
+
+    industry_type = models.CharField(max_length=255)
+    year = models.IntegerField()
+    content = models.TextField()
+    data = models.JSONField(null=True)
+    researched_at = models.DateTimeField(null=True)
+    refresh_started_at = models.DateTimeField(null=True)
+
+    class Meta:
+        managed = True
+        db_table = "industry_intelligence"
+        unique_together = (("industry_type", "year"),)
+
+    def __str__(self):
+        return f"{self.industry_type} - {self.year}"
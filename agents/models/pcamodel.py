@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class PCAModel(models.Model):
+    """Scaler and principal components fitted by the streaming ACP PCA for one
+    industry, on a single description or on all of them (empty description).
+    Stamped with the industry data version it was fitted on."""
+
+    industry_type_id = models.BigIntegerField()
+    description = models.CharField(max_length=255, blank=True, default="")
+    data_version = models.PositiveBigIntegerField(default=0)
+    n_samples = models.IntegerField()
+    scaler_mean = models.JSONField()
+    scaler_scale = models.JSONField()
+    pca_mean = models.JSONField()
+    components = models.JSONField()
+    explained_variance_ratio = models.JSONField()
+    fitted_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        managed = True
+        db_table = "acp_pca_models"
+        unique_together = (("industry_type_id", "description"),)
+
+    def __str__(self):
+        return f"{self.industry_type_id} - {self.description or '*'} - v{self.data_version}"
@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class SeasonalityProfile(models.Model):
+    """Monthly seasonal index of an industry's revenue for one description,
+    from an additive decomposition of the multi-year series of industry
+    monthly means. ``seasonal_factors`` is the index relative to the series
+    level (1.0 means an average month)."""
+
+    industry_type_id = models.BigIntegerField()
+    description = models.CharField(max_length=255)
+    first_year = models.IntegerField()
+    last_year = models.IntegerField()
+    n_observations = models.IntegerField()
+    seasonal_index = models.JSONField()
+    seasonal_factors = models.JSONField()
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        managed = True
+        db_table = "industry_seasonality_profiles"
+        unique_together = (("industry_type_id", "description"),)
+
+    def __str__(self):
+        return f"{self.industry_type_id} - {self.description}"
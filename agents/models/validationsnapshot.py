@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class ValidationSnapshot(models.Model):
+    """Last ValidationAgent result of an enterprise, stamped with the
+    enterprise data version, the first year of the validation window and a
+    fingerprint of the source rows it was computed from."""
+
+    enterprise_id = models.BigIntegerField(unique=True)
+    data_version = models.PositiveBigIntegerField(default=0)
+    since_year = models.IntegerField()
+    fingerprint = models.CharField(max_length=40)
+    result = models.JSONField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        managed = True
+        db_table = "validation_snapshots"
+
+    def __str__(self):
+        return f"{self.enterprise_id} - v{self.data_version}"
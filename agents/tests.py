@@ -1,3 +1,455 @@
-from django.test import TestCase
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from agents.agents.agent_acp_t_produit import AgentACP_T_produit
+from agents.agents.forecast_engine import ForecastEngine
+from agents.agents.llm_clients import LLMClients
+from agents.agents.market_trend_analyzer import MarketTrendAnalyzer
+from agents.agents.single_flight import SingleFlight
+from agents.agents.validation_agent import ValidationAgent
+from agents.models import ForecastModel
+from financial_data.models import (
+    Enterprise,
+    EnterpriseIndustryView,
+    OpportunityBookView,
+    OrderBookView,
+    RevenuesView,
+    SalesBudgetsView,
+)
+
+UNMANAGED_VIEWS = [
+    EnterpriseIndustryView,
+    RevenuesView,
+    SalesBudgetsView,
+    OrderBookView,
+    OpportunityBookView,
+]
+
+
+class UnmanagedViewsTestCase(TestCase):
+    """The database views are unmanaged and keyed by non-unique columns, so
+    the tests create plain, constraint-free tables with the same columns."""
+
+    @classmethod
+    def setUpClass(cls):
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for model in UNMANAGED_VIEWS:
+                columns = ", ".join(
+                    "{} {}".format(
+                        quote_name(field.column),
+                        field.rel_db_type(connection)
+                        if field.primary_key
+                        else field.db_type(connection),
+                    )
+                    for field in model._meta.concrete_fields
+                )
+                cursor.execute(
+                    f"CREATE TABLE {quote_name(model._meta.db_table)} ({columns})"
+                )
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.cursor() as cursor:
+            for model in UNMANAGED_VIEWS:
+                cursor.execute(
+                    f"DROP TABLE {connection.ops.quote_name(model._meta.db_table)}"
+                )
+
+
+class ValidationAgentTests(UnmanagedViewsTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        Enterprise.objects.create(
+            id=1,
+            name="Acme",
+            business_number="1",
+            budget_range=1,
+            founding_date=now,
+            starting_date=now,
+            start_period=1,
+            supports_white_labeling=False,
+            active=True,
+        )
+        EnterpriseIndustryView.objects.create(
+            enterprise_id=1,
+            enterprise_name="Acme",
+            business_number="1",
+            budget_range=1,
+            founding_date=now,
+            starting_date=now,
+            start_period=1,
+            supports_white_labeling=False,
+            enterprise_active=True,
+            industry_type_id=1,
+            industry_type_label="Software",
+            industry_type_active=True,
+        )
+
+        current_year = datetime.now().year
+        revenues, budgets = [], []
+        for year in range(current_year - 3, current_year + 1):
+            for month in range(1, 13):
+                income = Decimal(1000 + 10 * month + 100 * (year - current_year))
+                revenues.append(
+                    RevenuesView(
+                        enterprise_id=1,
+                        revenue_id=1,
+                        description="Product",
+                        year=str(year),
+                        month=month,
+                        selling_price=Decimal(10),
+                        expected_total_units=0,
+                        real_total_units=0,
+                        total_units_performance=0,
+                        expected_total_income=0,
+                        real_total_income=0,
+                        total_income_performance=0,
+                        expected_sold_units=100,
+                        real_sold_units=100,
+                        sold_units_performance=1,
+                        expected_income=income,
+                        real_income=income,
+                        income_performance=Decimal("0.9"),
+                    )
+                )
+                budgets.append(
+                    SalesBudgetsView(
+                        enterprise_id=1,
+                        revenue_id=1,
+                        sales_budget_id=1,
+                        description="Product",
+                        year=str(year),
+                        month=month,
+                        selling_price=Decimal(10),
+                        sold_units_budget_total=0,
+                        sold_units_real_total=0,
+                        sold_units_performance_total=0,
+                        budget_total=0,
+                        real_total=0,
+                        performance_total=0,
+                        sold_units_budget=100,
+                        real_sold_units=100,
+                        sold_units_performance=1,
+                        budget=income,
+                        real=income if month != 1 else 0,
+                        performance=1,
+                    )
+                )
+        RevenuesView.objects.bulk_create(revenues)
+        SalesBudgetsView.objects.bulk_create(budgets)
+        for year in range(current_year - 3, current_year + 1):
+            OrderBookView.objects.create(
+                enterprise_id=1, year=str(year), total_order_value=Decimal(5000)
+            )
+            OpportunityBookView.objects.create(
+                enterprise_id=1, year=str(year), total_opportunity_value=Decimal(8000)
+            )
+
+    def test_profile_is_read_with_grouped_queries(self):
+        # Enterprise existence check + revenues, sales budgets, order book and
+        # opportunity book, plus the yearly growth (LAG) of revenues and sales
+        # budgets.
+        with self.assertNumQueries(7):
+            result = ValidationAgent.execute(1)
+
+        self.assertTrue(result["validations"]["revenue"])
+        self.assertEqual(result["data_quality"]["revenue"]["years_available"], 4)
+        self.assertEqual(result["data_quality"]["revenue"]["months_available"], 48)
+        self.assertEqual(result["data_quality"]["recurrent_revenue"], 1.0)
+        self.assertAlmostEqual(
+            float(result["data_quality"]["performance"]["avg_performance"]), 0.9
+        )
+        self.assertAlmostEqual(
+            result["data_quality"]["sales_budget"]["budget_accuracy"], 1.0
+        )
+        # Revenue grows by the same amount every year.
+        self.assertAlmostEqual(
+            result["data_quality"]["revenue"]["avg_yearly_growth"],
+            sum(1200 / (12 * (1065 + 100 * offset)) for offset in (-3, -2, -1)) / 3,
+        )
+        # Four of the last six years have an order book.
+        self.assertFalse(result["validations"]["monthly_order_book"])
+        self.assertTrue(result["recommendations"])
+
+    def test_unknown_enterprise_stops_after_existence_check(self):
+        with self.assertNumQueries(1):
+            result = ValidationAgent.execute(2)
+        self.assertFalse(result["overall_validation"])
+
+    def test_batch_reports_other_industries_and_unknown_ids_once(self):
+        results = list(
+            ValidationAgent.execute_batch(
+                enterprise_ids=[1, 3, 1, 3], industry_type_id=2
+            )
+        )
+        self.assertEqual([result["enterprise_id"] for result in results], [1, 3])
+        self.assertIn("does not belong to industry type 2", results[0]["error"])
+        self.assertIn("does not exist", results[1]["error"])
+
+        results = list(ValidationAgent.execute_batch(enterprise_ids=[1, 1]))
+        self.assertEqual(len(results), 1)
+        self.assertNotIn("error", results[0])
+
+
+def revenue(enterprise_id, description, year, month, income):
+    return RevenuesView(
+        enterprise_id=enterprise_id,
+        revenue_id=1,
+        description=description,
+        year=str(year),
+        month=month,
+        selling_price=Decimal(10),
+        expected_total_units=0,
+        real_total_units=0,
+        total_units_performance=0,
+        expected_total_income=0,
+        real_total_income=0,
+        total_income_performance=0,
+        expected_sold_units=100,
+        real_sold_units=100,
+        sold_units_performance=1,
+        expected_income=income,
+        real_income=income,
+        income_performance=1,
+    )
+
+
+class ForecastEngineTests(UnmanagedViewsTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        RevenuesView.objects.bulk_create(
+            revenue(1, "Product", year, month, Decimal(1000 + 50 * month + year))
+            for year in (2021, 2022, 2023)
+            for month in range(1, 13)
+        )
+
+    def test_sync_twice_upserts_one_model_per_series(self):
+        series = ForecastEngine.series([1])
+        ForecastEngine._sync(series)
+        fitted = ForecastModel.objects.get(enterprise_id=1, description="Product")
+
+        counts = {}
+        ForecastEngine._sync(series, full=True, counts=counts)
+        self.assertEqual(counts["fitted"], 1)
+        refitted = ForecastModel.objects.get(enterprise_id=1, description="Product")
+        self.assertEqual(refitted.pk, fitted.pk)
+        self.assertEqual(refitted.n_observations, 36)
+
+    def test_forecast_rolls_stored_models_forward_without_fitting(self):
+        self.assertEqual(ForecastEngine.forecast(1), {"Product": None})
+        self.assertFalse(ForecastModel.objects.exists())
+
+        self.assertEqual(ForecastEngine.refresh([1])["fitted"], 1)
+        self.assertEqual(list(ForecastEngine.forecast(1)["Product"]), ["2024"])
+
+        RevenuesView.objects.bulk_create([revenue(1, "Product", 2024, 1, 3000)])
+        forecast = ForecastEngine.forecast(1)["Product"]
+        self.assertEqual(sorted(forecast["2024"]), list(range(2, 13)))
+        model = ForecastModel.objects.get(enterprise_id=1, description="Product")
+        self.assertEqual((model.n_observations, model.last_month), (37, 1))
+
+
+class MarketTrendAnalyzerTests(SimpleTestCase):
+    def test_parts_missing_the_deadline_get_a_zero_growth_fallback(self):
+        async def slow_llm(llm, prompt):
+            await asyncio.sleep(1)
+
+        analyzer = MarketTrendAnalyzer(google_api_key="test")
+        with mock.patch.object(
+            MarketTrendAnalyzer, "_fetch_industry_data", return_value="Retail grows"
+        ), mock.patch.object(LLMClients, "ainvoke", slow_llm):
+            analysis = asyncio.run(
+                analyzer.aanalyze_market_trends("Retail", 2026, 2027, timeout=0.05)
+            )
+
+        self.assertEqual(analysis["trends"], [])
+        self.assertEqual(analysis["hypothesis"], 0.0)
+        self.assertIn("from 2026 to 2027", analysis["explanation"])
+
+
+class GrowthRateSweepTests(UnmanagedViewsTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        current_year = datetime.now().year
+        RevenuesView.objects.bulk_create(
+            revenue(1, "Product", year, month, Decimal(1000 + 10 * month))
+            for year in (current_year - 1, current_year)
+            for month in range(1, 13)
+        )
+
+    def sweep(self, **params):
+        return self.client.get(
+            reverse("growth-sweep", args=[1]), {"model": "unit", **params}
+        )
+
+    def test_invalid_growth_rates_are_rejected_before_any_query(self):
+        for params in (
+            {"growth_rates": "0.1,nan"},
+            {"growth_rates": "inf"},
+            {"growth_rates": "0.1,1.5"},
+            {"growth_rates": ",".join(["0.01"] * 202)},
+            {"start": "0", "stop": "0.1", "step": "0"},
+            {"start": "0", "stop": "nan", "step": "0.01"},
+        ):
+            with self.subTest(params=params), self.assertNumQueries(0):
+                response = self.sweep(description="Product", **params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
+    def test_unit_sweep_predicts_one_row_per_growth_rate(self):
+        response = self.sweep(
+            description="Product", start="-0.1", stop="0.1", step="0.05"
+        )
+        self.assertEqual(response.status_code, 200)
+        sweep = response.json()
+        self.assertEqual(sweep["growth_rates"], [-0.1, -0.05, 0.0, 0.05, 0.1])
+        self.assertEqual(len(sweep["predicted_income"]), 5)
+        self.assertEqual(len(sweep["predicted_income"][0]), 12)
+
+    def test_unit_sweep_errors_become_json_responses(self):
+        self.assertEqual(self.sweep(growth_rates="0.1").status_code, 400)
+        with mock.patch(
+            "agents.views.growthratesweepview.UnitBasedRevenuePrediction.sweep",
+            side_effect=RuntimeError("boom"),
+        ):
+            response = self.sweep(description="Product", growth_rates="0.1")
+        self.assertEqual(response.status_code, 500)
+        self.assertIn("boom", response.json()["error"])
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "shared": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "single-flight-tests",
+        },
+    }
+)
+class SingleFlightTests(SimpleTestCase):
+    """Threads stand in for workers: the "shared" cache is a LocMemCache,
+    which every thread of the test process sees."""
+
+    def tearDown(self):
+        caches["shared"].clear()
+
+    @staticmethod
+    def digest(key):
+        return hashlib.sha1(json.dumps(key, default=str).encode()).hexdigest()
+
+    def test_concurrent_calls_share_one_call(self):
+        started, release = threading.Event(), threading.Event()
+        calls, results = [], []
+
+        def call():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "result"
+
+        def run(ready):
+            ready.set()
+            results.append(SingleFlight.run(("test", 1), call))
+
+        ready = [threading.Event() for _ in range(5)]
+        threads = [threading.Thread(target=run, args=(event,)) for event in ready]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        for event in ready:
+            event.wait(5)
+        # Let the followers reach the leader's flight before it lands.
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 5)
+
+    def test_failure_releases_the_lock(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaisesMessage(RuntimeError, "boom"):
+            SingleFlight.run(("test", 2), fail)
+        self.assertIsNone(
+            caches["shared"].get(f"single_flight_lock_{self.digest(['test', 2])}")
+        )
+        self.assertEqual(SingleFlight.run(("test", 2), lambda: "retried"), "retried")
+
+    def test_result_published_by_another_worker_is_reused(self):
+        digest = self.digest(["test", 3])
+        caches["shared"].add(f"single_flight_lock_{digest}", "other worker", 60)
+        caches["shared"].set(f"single_flight_result_{digest}", (None,), 60)
+
+        called = mock.Mock()
+        self.assertIsNone(SingleFlight.run(("test", 3), called))
+        called.assert_not_called()
+
+
+class ACPBatchTests(UnmanagedViewsTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        EnterpriseIndustryView.objects.bulk_create(
+            EnterpriseIndustryView(
+                enterprise_id=enterprise_id,
+                enterprise_name=f"Enterprise {enterprise_id}",
+                business_number=str(enterprise_id),
+                budget_range=1,
+                founding_date=now,
+                starting_date=now,
+                start_period=1,
+                supports_white_labeling=False,
+                enterprise_active=True,
+                industry_type_id=industry_type_id,
+                industry_type_label=f"Industry {industry_type_id}",
+                industry_type_active=True,
+            )
+            for enterprise_id, industry_type_id in ((1, 1), (2, 1), (3, 2))
+        )
+
+    @mock.patch.object(
+        AgentACP_T_produit, "_analyze_industry", return_value={"error": "No data"}
+    )
+    def test_batch_reports_each_id_once_in_request_order(self, analyze_industry):
+        result = AgentACP_T_produit.execute_batch(
+            "Product", industry_type_id=1, enterprise_ids=[2, 9, 3, 2, 1]
+        )
+
+        self.assertEqual(list(result["results"]), [2, 9, 3, 1])
+        self.assertEqual(result["results"][2], {"error": "No data"})
+        self.assertEqual(result["results"][1], {"error": "No data"})
+        self.assertIn("does not exist", result["results"][9]["error"])
+        self.assertIn(
+            "does not belong to industry type 1", result["results"][3]["error"]
+        )
+        analyze_industry.assert_called_once_with(1, "Industry 1", "Product")
+
+    @mock.patch.object(
+        AgentACP_T_produit, "_analyze_industry", return_value={"error": "No data"}
+    )
+    def test_batch_without_ids_covers_the_active_enterprises_of_the_industry(
+        self, analyze_industry
+    ):
+        result = AgentACP_T_produit.execute_batch("Product", industry_type_id=1)
+        self.assertEqual(sorted(result["results"]), [1, 2])
@@ -1,12 +1,21 @@
 from django.urls import path
 
-from agents.views.acp_t_produit_view import ACP_T_ProduitView
+from agents.views.acp_t_produit_view import ACP_T_ProduitBatchView, ACP_T_ProduitView
 from agents.views.agentpredglobaleview import AgentPredGlobaleView
-from agents.views.agentvalidationview import AgentValidationView
+from agents.views.agentvalidationview import (
+    AgentValidationBatchView,
+    AgentValidationView,
+)
+from agents.views.growthratesweepview import GrowthRateSweepView
 from agents.views.historicaldataview import HistoricalDataView
+from agents.views.markettrendsview import MarketTrendsView
+from agents.views.predictionchartview import PredictionChartView
 from agents.views.system_based_redictionView import SystemBasedPredictionView
-from agents.views.unitrevenuepredictionapiview import UnitRevenuePredictionAPIView
-from agents.views.webrevenuhypoview import WebRevenuHypoView
+from agents.views.unitrevenuepredictionapiview import (
+    UnitRevenuePredictionAPIView,
+    UnitRevenueReportView,
+)
+from agents.views.webrevenuhypoview import HypothesisAnalysisView, WebRevenuHypoView
 
 
 urlpatterns = [
@@ -15,6 +24,11 @@ urlpatterns = [
         AgentValidationView.as_view(),
         name="agent-validation",
     ),
+    path(
+        "validation/batch/",
+        AgentValidationBatchView.as_view(),
+        name="agent-validation-batch",
+    ),
     path(
         "historical-data/<int:enterprise_id>/",
         HistoricalDataView.as_view(),
@@ -25,11 +39,26 @@ urlpatterns = [
         ACP_T_ProduitView.as_view(),
         name="acp-t-produit",
     ),
+    path(
+        "acp-t-produit/batch/",
+        ACP_T_ProduitBatchView.as_view(),
+        name="acp-t-produit-batch",
+    ),
     path(
         "web-revenu-hypo/<int:enterprise_id>/",
         WebRevenuHypoView.as_view(),
         name="web-revenu-hypo",
     ),
+    path(
+        "web-revenu-hypo/analyses/<str:analysis_id>/",
+        HypothesisAnalysisView.as_view(),
+        name="web-revenu-hypo-analysis",
+    ),
+    path(
+        "market-trends/<int:enterprise_id>/",
+        MarketTrendsView.as_view(),
+        name="market-trends",
+    ),
     path(
         "pred-globale/<int:enterprise_id>",
         AgentPredGlobaleView.as_view(),
@@ -40,11 +69,26 @@ urlpatterns = [
         AgentPredGlobaleView.as_view(),
         name="agent-pred-globale",
     ),
+    path(
+        "pred-globale/charts/<str:chart>",
+        PredictionChartView.as_view(),
+        name="prediction-chart",
+    ),
+    path(
+        "growth-sweep/<int:enterprise_id>/",
+        GrowthRateSweepView.as_view(),
+        name="growth-sweep",
+    ),
     path(
         "unit-pred-revenu/<int:enterprise_id>/",
         UnitRevenuePredictionAPIView.as_view(),
         name="unit-pred-revenu",
     ),
+    path(
+        "unit-pred-revenu/<int:enterprise_id>/report/",
+        UnitRevenueReportView.as_view(),
+        name="unit-pred-revenu-report",
+    ),
     path(
         "system-based-prediction/<int:enterprise_id>/",
         SystemBasedPredictionView.as_view(),
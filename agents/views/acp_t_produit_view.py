@@ -11,3 +11,40 @@ class ACP_T_ProduitView(APIView):
 
         result = AgentACP_T_produit.execute(enterprise_id, description)
         return Response(result)
+
+
+class ACP_T_ProduitBatchView(APIView):
+    def get(self, request):
+        description = request.query_params.get("description")
+        if not description:
+            return Response({"error": "Description parameter is required"}, status=400)
+
+        industry_type_id = request.query_params.get("industry_type_id")
+        enterprise_ids = request.query_params.get("enterprise_ids")
+        if not industry_type_id and not enterprise_ids:
+            return Response(
+                {"error": "industry_type_id or enterprise_ids parameter is required"},
+                status=400,
+            )
+
+        try:
+            if enterprise_ids:
+                enterprise_ids = [
+                    int(enterprise_id)
+                    for enterprise_id in enterprise_ids.split(",")
+                    if enterprise_id.strip()
+                ]
+            else:
+                enterprise_ids = None
+            industry_type_id = int(industry_type_id) if industry_type_id else None
+            result = AgentACP_T_produit.execute_batch(
+                description,
+                industry_type_id=industry_type_id,
+                enterprise_ids=enterprise_ids,
+            )
+        except ValueError:
+            return Response(
+                {"error": "industry_type_id and enterprise_ids must be integers"},
+                status=400,
+            )
+        return Response(result)
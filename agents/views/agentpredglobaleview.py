@@ -1,7 +1,9 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.urls import reverse
 from ..agents.pred_globale_agent import PredGlobaleAgent
+from ..agents.prediction_charts import FORMATS
 from urllib.parse import unquote
 import logging
 import traceback
@@ -16,6 +18,16 @@ class AgentPredGlobaleView(APIView):
             include_plot = (
                 request.query_params.get("include_plot", "false").lower() == "true"
             )
+            plot_format = request.query_params.get("plot_format", "png").lower()
+            if include_plot and plot_format not in FORMATS:
+                return Response(
+                    {"error": f"Invalid plot format: {plot_format}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            include_seasonality = (
+                request.query_params.get("include_seasonality", "false").lower()
+                == "true"
+            )
             description = request.query_params.get("description")
 
             growth_rate_param = request.query_params.get("growth_rate")
@@ -34,7 +46,9 @@ class AgentPredGlobaleView(APIView):
                 description = unquote(description.strip('"'))
 
             agent = PredGlobaleAgent()
-            result = agent.execute(enterprise_id, description, growth_rate)
+            result = agent.execute(
+                enterprise_id, description, growth_rate, include_seasonality
+            )
 
             if "error" in result:
                 logger.error(f"Error in PredGlobaleAgent: {result['error']}")
@@ -52,9 +66,14 @@ class AgentPredGlobaleView(APIView):
                 "results": result["results"],
             }
 
+            if include_seasonality:
+                response_data["seasonality"] = result["seasonality"]
+
             if include_plot:
-                plot_path = agent.plot_prediction(result)
-                response_data["plot_url"] = plot_path
+                chart = agent.plot_prediction(result, plot_format)
+                response_data["plot_url"] = request.build_absolute_uri(
+                    reverse("prediction-chart", args=[chart])
+                )
 
             return Response(response_data, status=status.HTTP_200_OK)
 
@@ -1,9 +1,53 @@
+import json
+
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from ..agents.validation_agent import ValidationAgent
+from ..agents.validation_agent import ValidationAgent, json_safe
+from ..agents.validation_snapshots import ValidationSnapshots
 
 
 class AgentValidationView(APIView):
     def get(self, request, enterprise_id):
-        result = ValidationAgent.execute(enterprise_id)
+        result = ValidationSnapshots.get(enterprise_id)
         return Response(result)
+
+
+class AgentValidationBatchView(APIView):
+    """Validation of every enterprise, or of those selected with
+    ``enterprise_ids`` (comma separated) or ``industry_type_id``. With
+    ``stream=true`` the results are streamed as NDJSON, one enterprise per
+    line, instead of a single JSON document."""
+
+    def get(self, request):
+        try:
+            enterprise_ids = request.query_params.get("enterprise_ids")
+            if enterprise_ids:
+                enterprise_ids = [
+                    int(enterprise_id)
+                    for enterprise_id in enterprise_ids.split(",")
+                    if enterprise_id.strip()
+                ]
+            else:
+                enterprise_ids = None
+            industry_type_id = request.query_params.get("industry_type_id")
+            if industry_type_id:
+                industry_type_id = int(industry_type_id)
+            else:
+                industry_type_id = None
+        except ValueError:
+            return Response(
+                {"error": "industry_type_id and enterprise_ids must be integers"},
+                status=400,
+            )
+
+        results = ValidationAgent.execute_batch(
+            enterprise_ids=enterprise_ids, industry_type_id=industry_type_id
+        )
+
+        if request.query_params.get("stream", "false").lower() == "true":
+            return StreamingHttpResponse(
+                (json.dumps(json_safe(result)) + "\n" for result in results),
+                content_type="application/x-ndjson",
+            )
+        return Response({"results": list(results)})
@@ -0,0 +1,96 @@
+import numpy as np
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from urllib.parse import unquote
+
+from ..agents.pred_globale_agent import PredGlobaleAgent
+from ..agents.unit_solde_renvenu_pred import UnitBasedRevenuePrediction
+
+MAX_GROWTH_RATES = 201
+
+
+class GrowthRateSweepView(APIView):
+    """Predictions for a range of growth rates in one response, so that the
+    frontend can interpolate between them instead of requesting every slider
+    position.
+
+    Rates are given either as ``growth_rates`` (comma separated) or as
+    ``start``, ``stop`` and ``step`` (stop included). ``model`` selects the
+    global prediction (``pred-globale``, default) or the unit-based one
+    (``unit``, which requires ``description``).
+    """
+
+    def get(self, request, enterprise_id):
+        try:
+            growth_rates = self._growth_rates(request.query_params)
+        except ValueError as e:
+            return Response(
+                {"error": f"Invalid growth rates: {str(e)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if any(rate < -1 or rate > 1 for rate in growth_rates):
+            return Response(
+                {"error": "Growth rates must be between -1 and 1"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        description = request.query_params.get("description")
+        if description:
+            description = unquote(description.strip('"'))
+
+        model = request.query_params.get("model", "pred-globale")
+        try:
+            if model == "pred-globale":
+                result = PredGlobaleAgent.sweep(enterprise_id, growth_rates, description)
+                if "error" in result:
+                    return Response(result, status=status.HTTP_400_BAD_REQUEST)
+                return Response(result, status=status.HTTP_200_OK)
+
+            if model == "unit":
+                if not description:
+                    return Response(
+                        {"error": "Description is required"},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                agent = UnitBasedRevenuePrediction(enterprise_id, description)
+                return Response(agent.sweep(growth_rates), status=status.HTTP_200_OK)
+        except ValueError as e:
+            return Response(
+                {"error": f"Invalid input: {str(e)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {"error": f"An unexpected error occurred: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        return Response(
+            {"error": f"Unknown model: {model}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    @staticmethod
+    def _growth_rates(params):
+        if params.get("growth_rates"):
+            rates = [
+                float(rate)
+                for rate in params["growth_rates"].split(",")
+                if rate.strip()
+            ]
+        else:
+            start, stop, step = (
+                float(params.get(name, "nan")) for name in ("start", "stop", "step")
+            )
+            if not np.isfinite([start, stop, step]).all() or step <= 0 or stop < start:
+                raise ValueError("start, stop and step are required, with step > 0")
+            count = int(np.floor((stop - start) / step + 1e-9)) + 1
+            if count > MAX_GROWTH_RATES:
+                raise ValueError(f"at most {MAX_GROWTH_RATES} growth rates")
+            rates = np.round(start + step * np.arange(count), 10).tolist()
+        if not rates or len(rates) > MAX_GROWTH_RATES:
+            raise ValueError(f"between 1 and {MAX_GROWTH_RATES} growth rates")
+        if not np.isfinite(rates).all():
+            raise ValueError("growth rates must be finite numbers")
+        return rates
@@ -0,0 +1,38 @@
+from asgiref.sync import async_to_sync
+from django.http import JsonResponse
+from rest_framework.views import APIView
+from datetime import datetime
+
+from ..agents.market_trend_analyzer import MarketTrendAnalyzer
+from financial_data.models import EnterpriseIndustryView
+
+
+class MarketTrendsView(APIView):  # type: ignore
+    def get(self, request, enterprise_id):
+        try:
+            current_year = int(request.GET.get("current_year", datetime.now().year))
+            next_year = int(request.GET.get("next_year", current_year + 1))
+        except ValueError as e:
+            return JsonResponse({"error": f"Invalid year: {str(e)}"}, status=400)
+
+        try:
+            enterprise = EnterpriseIndustryView.objects.get(enterprise_id=enterprise_id)
+            analyzer = MarketTrendAnalyzer()
+            result = async_to_sync(analyzer.aanalyze_market_trends)(
+                enterprise.industry_type_label, current_year, next_year
+            )
+
+            return JsonResponse(
+                {
+                    "enterprise_id": enterprise.enterprise_id,
+                    "enterprise_name": enterprise.enterprise_name,
+                    "industry_type": enterprise.industry_type_label,
+                    "current_year": current_year,
+                    "next_year": next_year,
+                    **result,
+                }
+            )
+        except EnterpriseIndustryView.DoesNotExist:
+            return JsonResponse({"error": "Enterprise not found"}, status=404)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=500)
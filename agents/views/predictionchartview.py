@@ -0,0 +1,32 @@
+import re
+
+from django.http import FileResponse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..agents.prediction_charts import FORMATS, PredictionCharts
+
+CHART_NAME = re.compile(r"^[0-9a-f]{40}\.(%s)$" % "|".join(FORMATS))
+
+
+class PredictionChartView(APIView):
+    def get(self, request, chart):
+        if not CHART_NAME.match(chart):
+            return Response(
+                {"error": f"Invalid chart name: {chart}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        path = PredictionCharts.path(chart)
+        if path.exists():
+            return FileResponse(open(path, "rb"))
+        if PredictionCharts.is_pending(chart):
+            response = Response(
+                {"status": "rendering"}, status=status.HTTP_202_ACCEPTED
+            )
+            response["Retry-After"] = "1"
+            return response
+        return Response(
+            {"error": f"Chart {chart} not found"}, status=status.HTTP_404_NOT_FOUND
+        )
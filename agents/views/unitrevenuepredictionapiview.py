@@ -1,23 +1,35 @@
+import json
+
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.http import JsonResponse
 from rest_framework import status
 from ..agents.agent_manager import AgentManager
-from ..agents.validation_agent import ValidationAgent
+from ..agents.validation_agent import ValidationAgent, json_safe
 from ..agents.historical_data_agent import HistoricalDataAgent
 from ..agents.agent_acp_t_produit import AgentACP_T_produit
 from ..agents.web_revenu_hypo_agent import WebRevenuHypoAgent
 from ..agents.pred_globale_agent import PredGlobaleAgent
 from ..agents.unit_solde_renvenu_pred import UnitBasedRevenuePrediction
+from ..agents.seasonality_profiles import SeasonalityProfiles
 from financial_data.models import EnterpriseIndustryView, Enterprise, IndustryType
 from urllib.parse import unquote
 
 
 class UnitRevenuePredictionAPIView(APIView):
+    """Unit-based prediction of one revenue line (``description``), or with
+    ``all_descriptions=true`` of every revenue line of the enterprise from a
+    single query; ``stream=true`` then streams them as NDJSON, one
+    description per line."""
+
     def get(self, request, enterprise_id):
         try:
             growth_rate = float(request.GET.get("growth_rate", 0.05))
             description = request.GET.get("description")
+            include_seasonality = (
+                request.GET.get("include_seasonality", "false").lower() == "true"
+            )
 
             if growth_rate < -1 or growth_rate > 1:
                 return Response(
@@ -25,6 +37,11 @@ class UnitRevenuePredictionAPIView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
+            if request.GET.get("all_descriptions", "false").lower() == "true":
+                return self._all_descriptions(
+                    request, enterprise_id, growth_rate, include_seasonality
+                )
+
             if not description:
                 return Response(
                     {"error": "Description is required"},
@@ -35,6 +52,8 @@ class UnitRevenuePredictionAPIView(APIView):
 
             agent = UnitBasedRevenuePrediction(enterprise_id, description, growth_rate)
             prediction_data = agent.get_prediction_data()
+            if include_seasonality:
+                prediction_data["seasonality"] = agent.get_seasonality()
 
             return Response(prediction_data, status=status.HTTP_200_OK)
 
@@ -48,3 +67,83 @@ class UnitRevenuePredictionAPIView(APIView):
                 {"error": f"An unexpected error occurred: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+    @staticmethod
+    def _all_descriptions(request, enterprise_id, growth_rate, include_seasonality):
+        # Computed before the response is built, so that a failing query or
+        # prediction is reported by ``get`` rather than cutting the stream.
+        predictions = list(
+            UnitBasedRevenuePrediction.predict_all(enterprise_id, growth_rate)
+        )
+        if include_seasonality:
+            seasonality = SeasonalityProfiles.monthly_factors(
+                enterprise_id, [prediction["description"] for prediction in predictions]
+            )
+            for prediction in predictions:
+                prediction["seasonality"] = seasonality[prediction["description"]]
+
+        if request.GET.get("stream", "false").lower() == "true":
+            return StreamingHttpResponse(
+                (
+                    json.dumps(json_safe(prediction)) + "\n"
+                    for prediction in predictions
+                ),
+                content_type="application/x-ndjson",
+            )
+        return Response(
+            {
+                "enterprise_id": enterprise_id,
+                "growth_rate": growth_rate,
+                "results": predictions,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class UnitRevenueReportView(APIView):
+    """History, next-year prediction and multi-year summary of one revenue
+    line, computed from a single fetch."""
+
+    def get(self, request, enterprise_id):
+        try:
+            growth_rate = float(request.GET.get("growth_rate", 0.05))
+            years = int(request.GET.get("years", 5))
+            description = request.GET.get("description")
+
+            if growth_rate < -1 or growth_rate > 1:
+                return Response(
+                    {"error": "Growth rate must be between -1 and 1"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            if years < 1:
+                return Response(
+                    {"error": "Years must be at least 1"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            if not description:
+                return Response(
+                    {"error": "Description is required"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            description = unquote(description.strip('"'))
+
+            agent = UnitBasedRevenuePrediction(enterprise_id, description, growth_rate)
+            report = agent.get_report(years)
+            if request.GET.get("include_seasonality", "false").lower() == "true":
+                report["seasonality"] = agent.get_seasonality()
+
+            return Response(report, status=status.HTTP_200_OK)
+
+        except ValueError as e:
+            return Response(
+                {"error": f"Invalid input: {str(e)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {"error": f"An unexpected error occurred: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
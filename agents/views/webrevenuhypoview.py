@@ -1,12 +1,14 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.http import JsonResponse
+from django.urls import reverse
 from rest_framework import status
 from ..agents.agent_manager import AgentManager
 from ..agents.validation_agent import ValidationAgent
 from ..agents.historical_data_agent import HistoricalDataAgent
 from ..agents.agent_acp_t_produit import AgentACP_T_produit
 from ..agents.web_revenu_hypo_agent import WebRevenuHypoAgent
+from ..agents.hypothesis_analyses import HypothesisAnalyses
 from ..agents.pred_globale_agent import PredGlobaleAgent
 from ..agents.unit_solde_renvenu_pred import UnitBasedRevenuePrediction
 from financial_data.models import EnterpriseIndustryView, Enterprise, IndustryType
@@ -21,6 +23,9 @@ class WebRevenuHypoView(APIView):  # type: ignore
             prediction_year = int(
                 request.GET.get("prediction_year", datetime.now().year + 1)
             )
+            include_analysis = (
+                request.GET.get("include_analysis", "false").lower() == "true"
+            )
 
             agent = WebRevenuHypoAgent()
             enterprise_info = {
@@ -37,10 +42,31 @@ class WebRevenuHypoView(APIView):  # type: ignore
                 growth_rate,
                 enterprise_info,
                 prediction_year,
+                include_analysis,
             )
+            if "analysis_id" in result:
+                result["analysis_url"] = request.build_absolute_uri(
+                    reverse("web-revenu-hypo-analysis", args=[result["analysis_id"]])
+                )
 
             return JsonResponse(result)
         except EnterpriseIndustryView.DoesNotExist:
             return JsonResponse({"error": "Enterprise not found"}, status=404)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=500)
+
+
+class HypothesisAnalysisView(APIView):  # type: ignore
+    def get(self, request, analysis_id):
+        job = HypothesisAnalyses.get(analysis_id)
+        if job is None:
+            return JsonResponse(
+                {"error": f"Analysis {analysis_id} not found"}, status=404
+            )
+        if job["status"] == HypothesisAnalyses.PENDING:
+            response = JsonResponse(job, status=202)
+            response["Retry-After"] = "2"
+            return response
+        if job["status"] == HypothesisAnalyses.FAILED:
+            return JsonResponse(job, status=500)
+        return JsonResponse(job)
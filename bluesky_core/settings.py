@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "financial_data",
+    "agents",
     "corsheaders",
 ]
 
@@ -91,9 +92,86 @@ CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         "LOCATION": "unique-snowflake",
-    }
+    },
+    # Results derived by the agents (ACP industry analyses, ...). Entries are
+    # keyed by data version, so stale ones are never read and are evicted
+    # once the cache is full.
+    "agents": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "agents",
+        "TIMEOUT": 24 * 3600,
+        "OPTIONS": {"MAX_ENTRIES": 500, "CULL_FREQUENCY": 4},
+    },
+    # State that every worker process must see (single-flight locks and
+    # results, hypothesis analysis jobs), in the database. Create its table
+    # with ``python manage.py createcachetable``.
+    "shared": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "shared_cache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
 }
 
+# Peer-group size from which the ACP agent fits its PCA by streaming enterprise
+# rows into an IncrementalPCA (see agents/agents/streaming_pca.py) instead of
+# an in-memory PCA. None disables the on-the-fly fit; models fitted with the
+# fit_acp_pca command are used regardless.
+ACP_STREAMING_PCA_MIN_ENTERPRISES = 5000
+
+# Prediction charts are rendered by a pool of worker processes and kept on
+# local disk, named after a hash of the prediction they draw. A render not
+# finished after PREDICTION_CHART_PENDING_TIMEOUT seconds is given up on.
+# Charts not requested for PREDICTION_CHART_MAX_AGE seconds are deleted, and
+# at most PREDICTION_CHART_MAX_FILES are kept; the directory is pruned at most
+# every PREDICTION_CHART_PRUNE_INTERVAL seconds per process.
+PREDICTION_CHARTS_DIR = BASE_DIR / "prediction_charts"
+PREDICTION_CHART_WORKERS = 2
+PREDICTION_CHART_PENDING_TIMEOUT = 300
+PREDICTION_CHART_MAX_AGE = 7 * 24 * 3600
+PREDICTION_CHART_MAX_FILES = 2000
+PREDICTION_CHART_PRUNE_INTERVAL = 600
+
+# LLM clients of the web agents are built once per worker process (see
+# agents/agents/llm_clients.py): at most LLM_MAX_CONCURRENCY calls to the model
+# are in flight per process, and the search pages they analyse are fetched
+# over keep-alive connections, LLM_HTTP_POOL_SIZE per host. Asynchronous calls
+# run in a pool of LLM_ASYNC_WORKERS threads, larger than the concurrency limit
+# so that calls whose caller stopped waiting do not hold up later ones.
+LLM_MAX_CONCURRENCY = 4
+LLM_HTTP_POOL_SIZE = 10
+LLM_ASYNC_WORKERS = 16
+
+# Narrative analyses of web revenue hypotheses are opt-in and written by a
+# thread pool; jobs and their text stay in the "shared" cache for the timeout
+# (seconds).
+HYPOTHESIS_ANALYSIS_WORKERS = 2
+HYPOTHESIS_ANALYSIS_TIMEOUT = 3600
+
+# Web research on an industry is stored in the database and shared by every
+# worker: it is served for INDUSTRY_INTELLIGENCE_TTL seconds, then for
+# INDUSTRY_INTELLIGENCE_STALE_TTL more while one worker refreshes it in the
+# background (its claim lapsing after INDUSTRY_INTELLIGENCE_REFRESH_LEASE).
+# Requests waiting on another worker's research poll the database every
+# INDUSTRY_INTELLIGENCE_POLL_INTERVAL seconds.
+INDUSTRY_INTELLIGENCE_TTL = 24 * 3600
+INDUSTRY_INTELLIGENCE_STALE_TTL = 7 * 24 * 3600
+INDUSTRY_INTELLIGENCE_REFRESH_LEASE = 300
+INDUSTRY_INTELLIGENCE_REFRESH_WORKERS = 2
+INDUSTRY_INTELLIGENCE_POLL_INTERVAL = 1
+
+# Identical concurrent LLM calls are coalesced (see
+# agents/agents/single_flight.py). Across workers the leader holds a lock in
+# the "shared" cache for at most SINGLE_FLIGHT_LOCK_TIMEOUT seconds; the others
+# poll that cache for its result, published for SINGLE_FLIGHT_RESULT_TIMEOUT
+# seconds.
+SINGLE_FLIGHT_LOCK_TIMEOUT = 120
+SINGLE_FLIGHT_RESULT_TIMEOUT = 60
+SINGLE_FLIGHT_POLL_INTERVAL = 0.2
+
+# Deadline (seconds) of an asynchronous market trend analysis; parts not ready
+# by then are answered with their fallback.
+MARKET_TRENDS_TIMEOUT = 30
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
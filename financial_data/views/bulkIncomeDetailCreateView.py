@@ -2,6 +2,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from financial_data.serializers import BulkIncomeDetailSerializer
+from agents.models import DataVersion
 
 
 class BulkIncomeDetailCreateView(APIView):
@@ -9,5 +10,9 @@ class BulkIncomeDetailCreateView(APIView):
         serializer = BulkIncomeDetailSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
+            DataVersion.bump_enterprises(
+                income_detail["enterpriseId"]
+                for income_detail in serializer.validated_data["income_details"]
+            )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)